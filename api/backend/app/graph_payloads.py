@@ -0,0 +1,502 @@
+"""Build and cache the encoded JSON graph payloads served by the graph endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import BackgroundTasks, HTTPException
+
+from application import service_facade
+from domain.schemas import GraphBase
+from infrastructure.graph_cache import CacheEntry, GraphCache, get_graph_cache
+from shared import compression
+from shared.singleflight import SingleFlight
+
+REQUIRED_GRAPH_KEYS = {
+    "edges_csv",
+    "points_csv",
+    "ways_properties_csv",
+    "points_properties_csv",
+    "metrics_csv",
+    "access_nodes_csv",
+    "access_edges_csv",
+}
+
+
+@dataclass(frozen=True)
+class GraphPayload:
+    """Compressed ``GraphBase`` JSON together with its coding and cache key."""
+
+    payload: bytes
+    encoding: str
+    regions_key: str  # sorted region ids, or the polygon digest for bbox requests
+    cache_key: str
+
+
+@dataclass(frozen=True)
+class GraphRows:
+    """Row lists of one graph pipeline run, before any serialization."""
+
+    points: Sequence
+    edges: Sequence
+    pprop: Sequence
+    wprop: Sequence
+    metrics: Sequence
+    access_nodes: Optional[Sequence]
+    access_edges: Optional[Sequence]
+    simplified: bool = False
+
+    def _pieces(self):
+        return (
+            self.points,
+            self.edges,
+            self.pprop,
+            self.wprop,
+            self.metrics,
+            self.access_nodes,
+            self.access_edges,
+        )
+
+    def to_scheme(self) -> GraphBase:
+        return service_facade.graph_to_scheme(
+            *self._pieces(), simplified=self.simplified
+        )
+
+    def to_tables(self):
+        return service_facade.rows_to_tables(
+            *self._pieces(), simplified=self.simplified
+        )
+
+    def iter_zip(self) -> Iterator[bytes]:
+        return service_facade.iter_rows_zip(*self._pieces())
+
+
+def decode_graph_payload(payload: bytes, encoding: str) -> GraphBase:
+    cached_data = json.loads(compression.decompress(payload, encoding))
+    if not (
+        isinstance(cached_data, dict)
+        and REQUIRED_GRAPH_KEYS.issubset(cached_data.keys())
+        and all(isinstance(cached_data.get(key), str) for key in REQUIRED_GRAPH_KEYS)
+    ):
+        raise ValueError("cached graph payload has unexpected structure")
+    return GraphBase(**cached_data)
+
+
+def encode_graph_base(graph_base: GraphBase, encoding: str) -> bytes:
+    data = (
+        graph_base.model_dump()
+        if hasattr(graph_base, "model_dump")
+        else graph_base.dict()
+    )
+    return compression.compress(
+        json.dumps(data, ensure_ascii=False).encode("utf-8"), encoding
+    )
+
+
+def encode_graph_rows(rows: GraphRows, encoding: str) -> bytes:
+    return encode_graph_base(rows.to_scheme(), encoding)
+
+
+def payload_tables(entry: CacheEntry):
+    """Typed tables parsed from a cached JSON payload; ``ValueError`` on mismatch."""
+    return service_facade.graph_to_tables(
+        decode_graph_payload(entry.payload, entry.encoding)
+    )
+
+
+def reference_tag(reference_version: str) -> str:
+    """Short cache key part for the version of ``regions.json``/``cities.csv``."""
+    if not reference_version:
+        return ""
+    digest = hashlib.sha1(reference_version.encode("utf-8")).hexdigest()
+    return f"ref{digest[:10]}"
+
+
+class GraphPayloadLoader:
+    """Resolve region and polygon graph payloads through the graph cache.
+
+    Shared by the HTTP routes and the cache warm-up so both produce the same
+    cache keys and entries. Concurrent misses on the same key are coalesced
+    so only one of them runs the graph pipeline. Encoding, decoding and disk
+    I/O run on worker threads; when ``background`` tasks are given, the disk
+    write is deferred until the response has been sent.
+    """
+
+    def __init__(self, logger, cache: Optional[GraphCache] = None) -> None:
+        self.logger = logger
+        self._cache = cache
+        self.flights = SingleFlight()
+
+    @property
+    def cache(self) -> GraphCache:
+        return self._cache if self._cache is not None else get_graph_cache()
+
+    def region_cache_key(
+        self,
+        city_id: int,
+        regions_ids: List[int],
+        simplified: bool = False,
+        reference_version: str = "",
+    ) -> Tuple[str, str]:
+        """Key of a region graph; ``reference_version`` is the region file version.
+
+        A region id only names a polygon of the loaded ``regions.json``, so the
+        key changes when that file is replaced.
+        """
+        regions_key = "_".join(map(str, sorted(regions_ids)))
+        key = self.cache.key(
+            city_id,
+            "regions",
+            regions_key,
+            "simplified" if simplified else "",
+            reference_tag(reference_version),
+        )
+        return key, regions_key
+
+    def polygon_cache_key(
+        self,
+        city_id: int,
+        polygon,
+        simplified: bool = False,
+        incremental: bool = False,
+    ) -> Tuple[str, str]:
+        polygon_key = service_facade.polygon_key(polygon)
+        key = self.cache.key(
+            city_id,
+            "bbox",
+            polygon_key,
+            "simplified" if simplified else "",
+            "incremental" if incremental else "",
+        )
+        return key, polygon_key
+
+    async def _load_entry(
+        self,
+        cache_key: str,
+        build: Callable[[], Awaitable[GraphRows]],
+        use_cache: bool,
+        background: Optional[BackgroundTasks],
+    ) -> Tuple[CacheEntry, Optional[GraphRows]]:
+        """The JSON entry, plus the rows it was built from when it was built now."""
+        cache = self.cache
+        if use_cache:
+            entry = await cache.get_async(cache_key)
+            if entry is not None:
+                return entry, None
+
+        async def flight() -> Tuple[CacheEntry, Optional[GraphRows]]:
+            if use_cache:
+                # A flight for this key may have finished since the lookup.
+                entry = cache.memory.get(cache_key)
+                if entry is not None:
+                    return entry, None
+            rows = await build()
+            encoding = compression.cache_encoding()
+            payload = await asyncio.to_thread(encode_graph_rows, rows, encoding)
+            entry = CacheEntry(payload, encoding)
+            cache.remember(cache_key, entry)
+            if background is not None:
+                background.add_task(cache.persist, cache_key, entry)
+            else:
+                await asyncio.to_thread(cache.persist, cache_key, entry)
+            return entry, rows
+
+        # Forced rebuilds must not join a flight that may return the old entry.
+        flight_key = cache_key if use_cache else (cache_key, "rebuild")
+        return await self.flights.do(flight_key, flight)
+
+    async def _load_columnar(
+        self,
+        fmt: str,
+        cache_key: str,
+        build: Callable[[], Awaitable[GraphRows]],
+        use_cache: bool,
+        background: Optional[BackgroundTasks],
+    ) -> bytes:
+        """Arrow IPC or Parquet ZIP bytes of the graph behind ``cache_key``.
+
+        Tables come from the pipeline rows when the graph is built by this
+        call and from the cached JSON otherwise. The encoded bytes are kept
+        in the memory tier, next to the JSON entry.
+        """
+        cache = self.cache
+        columnar_key = f"{cache_key}_{fmt}"
+        if use_cache:
+            entry = cache.memory.get(columnar_key)
+            if entry is not None:
+                return entry.payload
+
+        async def flight() -> bytes:
+            entry, rows = await self._load_entry(
+                cache_key, build, use_cache, background
+            )
+            tables = None
+            if rows is None:
+                try:
+                    tables = await asyncio.to_thread(payload_tables, entry)
+                except Exception as exc:
+                    self.logger.warning(
+                        "Cached graph payload is invalid, regenerating: {}", exc
+                    )
+                    _, rows = await self._load_entry(
+                        cache_key, build, False, background
+                    )
+            if tables is None:
+                tables = await asyncio.to_thread(rows.to_tables)
+            payload = await asyncio.to_thread(service_facade.encode_tables, tables, fmt)
+            cache.remember(columnar_key, CacheEntry(payload, compression.IDENTITY))
+            return payload
+
+        flight_key = columnar_key if use_cache else (columnar_key, "rebuild")
+        return await self.flights.do(flight_key, flight)
+
+    async def load(
+        self,
+        city_id: int,
+        regions_ids: List[int],
+        regions,
+        *,
+        use_cache: bool = True,
+        simplified: bool = False,
+        reference_version: str = "",
+        request_label: str = "",
+        background: Optional[BackgroundTasks] = None,
+    ) -> GraphPayload:
+        cache_key, regions_key = self.region_cache_key(
+            city_id, regions_ids, simplified, reference_version
+        )
+
+        build = self._regions_builder(
+            city_id, regions_ids, regions, simplified, reference_version, request_label
+        )
+        entry, _ = await self._load_entry(cache_key, build, use_cache, background)
+        return GraphPayload(entry.payload, entry.encoding, regions_key, cache_key)
+
+    async def load_columnar(
+        self,
+        fmt: str,
+        city_id: int,
+        regions_ids: List[int],
+        regions,
+        *,
+        use_cache: bool = True,
+        simplified: bool = False,
+        reference_version: str = "",
+        request_label: str = "",
+        background: Optional[BackgroundTasks] = None,
+    ) -> bytes:
+        """Region graph encoded as ``fmt`` (``arrow`` or ``parquet``)."""
+        cache_key, _ = self.region_cache_key(
+            city_id, regions_ids, simplified, reference_version
+        )
+        build = self._regions_builder(
+            city_id, regions_ids, regions, simplified, reference_version, request_label
+        )
+        return await self._load_columnar(fmt, cache_key, build, use_cache, background)
+
+    def _regions_builder(
+        self,
+        city_id,
+        regions_ids,
+        regions,
+        simplified,
+        reference_version,
+        request_label,
+    ) -> Callable[[], Awaitable[GraphRows]]:
+        async def build() -> GraphRows:
+            return await self._build_regions(
+                city_id,
+                regions_ids,
+                regions,
+                simplified,
+                reference_version,
+                request_label,
+            )
+
+        return build
+
+    async def load_polygon(
+        self,
+        city_id: int,
+        polygon,
+        *,
+        use_cache: bool = True,
+        simplified: bool = False,
+        incremental: bool = False,
+        request_label: str = "",
+        background: Optional[BackgroundTasks] = None,
+    ) -> GraphPayload:
+        """Payload of an arbitrary polygon, keyed by its normalized geometry.
+
+        Polygons equal up to ring orientation, start vertex and float noise
+        share one cache entry.
+        """
+        cache_key, polygon_key = self.polygon_cache_key(
+            city_id, polygon, simplified, incremental
+        )
+
+        build = self._polygon_builder(
+            city_id, polygon, simplified, incremental, request_label
+        )
+        entry, _ = await self._load_entry(cache_key, build, use_cache, background)
+        return GraphPayload(entry.payload, entry.encoding, polygon_key, cache_key)
+
+    async def load_polygon_columnar(
+        self,
+        fmt: str,
+        city_id: int,
+        polygon,
+        *,
+        use_cache: bool = True,
+        simplified: bool = False,
+        incremental: bool = False,
+        request_label: str = "",
+        background: Optional[BackgroundTasks] = None,
+    ) -> bytes:
+        """Polygon graph encoded as ``fmt`` (``arrow`` or ``parquet``)."""
+        cache_key, _ = self.polygon_cache_key(city_id, polygon, simplified, incremental)
+        build = self._polygon_builder(
+            city_id, polygon, simplified, incremental, request_label
+        )
+        return await self._load_columnar(fmt, cache_key, build, use_cache, background)
+
+    def _polygon_builder(
+        self, city_id, polygon, simplified, incremental, request_label
+    ) -> Callable[[], Awaitable[GraphRows]]:
+        async def build() -> GraphRows:
+            return await self._build_polygon(
+                city_id, polygon, simplified, incremental, request_label
+            )
+
+        return build
+
+    async def _build_regions(
+        self,
+        city_id: int,
+        regions_ids: List[int],
+        regions,
+        simplified: bool,
+        reference_version: str,
+        request_label: str,
+    ) -> GraphRows:
+        (
+            points,
+            edges,
+            pprop,
+            wprop,
+            metrics,
+            access_nodes,
+            access_edges,
+        ) = await service_facade.graph_from_ids(
+            city_id=city_id,
+            regions_ids=regions_ids,
+            regions=regions,
+            simplified=simplified,
+            reference_version=reference_version,
+        )
+
+        if points is None:
+            detail = f"Region not found or city {city_id} not downloaded. Requested regions: {regions_ids}"
+            self.logger.error(f"{request_label} 404 {detail}")
+            raise HTTPException(status_code=404, detail=detail)
+
+        if len(points) == 0 or len(edges) == 0:
+            detail = (
+                f"No road network data found for region(s) {regions_ids} in city {city_id}. "
+                "The data for this region has not been downloaded from OSM yet. Please ensure the region data is downloaded before requesting the graph."
+            )
+            self.logger.error(f"{request_label} 422 {detail}")
+            raise HTTPException(status_code=422, detail=detail)
+
+        return GraphRows(
+            points,
+            edges,
+            pprop,
+            wprop,
+            metrics,
+            access_nodes,
+            access_edges,
+            simplified=simplified,
+        )
+
+    async def _build_polygon(
+        self,
+        city_id: int,
+        polygon,
+        simplified: bool,
+        incremental: bool,
+        request_label: str,
+    ) -> GraphRows:
+        (
+            points,
+            edges,
+            pprop,
+            wprop,
+            metrics,
+            access_nodes,
+            access_edges,
+        ) = await service_facade.graph_from_poly(
+            city_id=city_id,
+            polygon=polygon,
+            simplified=simplified,
+            incremental=incremental,
+        )
+
+        if points is None:
+            self.logger.error(f"{request_label} 404 NOT FOUND")
+            raise HTTPException(status_code=404, detail="NOT FOUND")
+
+        return GraphRows(
+            points,
+            edges,
+            pprop,
+            wprop,
+            metrics,
+            access_nodes,
+            access_edges,
+            simplified=simplified,
+        )
+
+    async def load_export(
+        self,
+        city_id: int,
+        regions_ids: List[int],
+        regions,
+        *,
+        use_cache: bool = True,
+        simplified: bool = False,
+        reference_version: str = "",
+        request_label: str = "",
+        background: Optional[BackgroundTasks] = None,
+    ) -> Tuple[Iterator[bytes], str]:
+        """Export ZIP chunks of a region graph and its regions key.
+
+        A graph built by this call is written straight from the pipeline rows;
+        a cached one from its decoded CSV payload. A corrupt cache entry is
+        rebuilt once.
+        """
+        cache_key, regions_key = self.region_cache_key(
+            city_id, regions_ids, simplified, reference_version
+        )
+        build = self._regions_builder(
+            city_id, regions_ids, regions, simplified, reference_version, request_label
+        )
+        entry, rows = await self._load_entry(cache_key, build, use_cache, background)
+        if rows is None:
+            try:
+                graph_base = await asyncio.to_thread(
+                    decode_graph_payload, entry.payload, entry.encoding
+                )
+                return service_facade.iter_graph_zip(graph_base), regions_key
+            except Exception as exc:
+                if not use_cache:
+                    raise
+                self.logger.warning(
+                    "Cached graph payload is invalid, regenerating: {}", exc
+                )
+            entry, rows = await self._load_entry(cache_key, build, False, background)
+        return rows.iter_zip(), regions_key
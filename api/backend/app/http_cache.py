@@ -0,0 +1,60 @@
+"""ETag and Cache-Control helpers for conditional GET/POST requests.
+
+ETags are derived from what identifies a payload (request key, response
+format and the city data version), never from the payload itself, so a
+matching ``If-None-Match`` is answered with 304 before anything is built or
+read from the cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import Response
+
+DEFAULT_MAX_AGE = 0
+
+
+def cache_control() -> str:
+    """Clients may reuse a response for ``HTTP_CACHE_MAX_AGE`` seconds, then revalidate."""
+    try:
+        max_age = max(0, int(os.environ["HTTP_CACHE_MAX_AGE"]))
+    except (KeyError, ValueError):
+        max_age = DEFAULT_MAX_AGE
+    return f"public, max-age={max_age}, must-revalidate"
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over ``parts``; weak because the body's content coding varies."""
+    digest = hashlib.sha1("\x1f".join(str(part) for part in parts).encode("utf-8"))
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = _opaque(etag)
+    return any(_opaque(tag) == wanted for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control()}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def with_cache_headers(response: Response, etag: str) -> Response:
+    response.headers.update(cache_headers(etag))
+    return response
@@ -2,61 +2,118 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-import geopandas as gpd
-import pandas as pd
 from fastapi import FastAPI
 
+from app import reference_data
+from app.graph_payloads import GraphPayloadLoader
+from app.warmup import warm_graph_cache, warm_region_membership
 from application import service_facade
+from infrastructure import database as db
 from infrastructure.database import database
+from shared.file_lock import file_lock
+
+
+def _warmup_enabled() -> bool:
+    return os.environ.get("GRAPH_CACHE_WARMUP", "").strip().lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+
+
+def _membership_enabled() -> bool:
+    return os.environ.get("REGION_MEMBERSHIP", "1").strip().lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+
+
+async def _run_exclusive(lock_path: Path, job):
+    """Run ``job()`` unless another worker of this host already runs it."""
+    with file_lock(lock_path, blocking=False) as acquired:
+        if not acquired:
+            return None
+        return await job()
 
 
 def build_lifespan(logger):
     """Return an async lifespan context manager bound to the provided logger."""
-    data_dir = Path(os.environ.get("DATA_DIR", "./data"))
+    data_dir = reference_data.data_dir()
+    lock_dir = data_dir / ".locks"
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
-        # Startup phase — preload required data files
-        regions_file = data_dir / "regions.json"
-        if not regions_file.exists():
-            error_msg = f"Required data file not found: {regions_file.absolute()}"
-            logger.error(error_msg)
-            raise FileNotFoundError(error_msg)
+        # Startup phase — reference data, preloaded by the master in multi-worker mode
+        data = reference_data.reference_data(data_dir, logger)
+        app.state.regions_df = data.regions
+        app.state.cities_info = data.cities
+        app.state.data_version = data.version
 
-        try:
-            app.state.regions_df = gpd.read_file(regions_file)
-            logger.info("Loaded regions data from {}", regions_file)
-        except Exception as exc:
-            error_msg = f"Failed to load regions data from {regions_file}: {exc}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg) from exc
-
-        cities_file = data_dir / "cities.csv"
-        if not cities_file.exists():
-            error_msg = f"Required data file not found: {cities_file.absolute()}"
-            logger.error(error_msg)
-            raise FileNotFoundError(error_msg)
+        db.ensure_database()
+        await database.connect()
+        # Workers start together; one at a time creates the missing cities
+        with file_lock(lock_dir / "init_db.lock"):
+            service_facade.init_db(cities_info=app.state.cities_info)
+        logger.info("Database connected and initialized")
 
         try:
-            app.state.cities_info = pd.read_csv(cities_file)
-            logger.info("Loaded cities data from {}", cities_file)
+            await service_facade.city_catalog.load(app.state.cities_info)
+            logger.info(
+                "Loaded {} cities into the catalog", len(service_facade.city_catalog)
+            )
         except Exception as exc:
-            error_msg = f"Failed to load cities data from {cities_file}: {exc}"
-            logger.error(error_msg)
-            raise RuntimeError(error_msg) from exc
+            # Lookups fall back to the DB city by city
+            logger.error("Failed to load the city catalog: {}", exc)
 
-        await database.connect()
-        service_facade.init_db(cities_info=app.state.cities_info)
-        logger.info("Database connected and initialized")
+        # Warm-ups run in one worker only; the others skip them
+        background = []
+        if _membership_enabled():
+            background.append(
+                asyncio.create_task(
+                    _run_exclusive(
+                        lock_dir / "region_membership.lock",
+                        lambda: warm_region_membership(
+                            app.state.regions_df,
+                            logger,
+                            reference_version=app.state.data_version,
+                        ),
+                    )
+                )
+            )
+        if _warmup_enabled():
+            background.append(
+                asyncio.create_task(
+                    _run_exclusive(
+                        lock_dir / "graph_cache_warmup.lock",
+                        lambda: warm_graph_cache(
+                            GraphPayloadLoader(logger),
+                            app.state.regions_df,
+                            app.state.cities_info,
+                            reference_version=app.state.data_version,
+                        ),
+                    )
+                )
+            )
 
         try:
             yield
         finally:
+            for task in background:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                except Exception as exc:
+                    logger.error("Background warm-up failed: {}", exc)
             await database.disconnect()
+            db.engine.dispose()
             logger.info("Database disconnected")
 
     return lifespan
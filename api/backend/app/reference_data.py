@@ -0,0 +1,115 @@
+"""Read-only reference data (regions and cities) for the API processes.
+
+Every process used to parse its own copy of ``regions.json`` and
+``cities.csv``. In the multi-worker mode (``gunicorn.conf.py``) the master
+calls ``preload_reference_data`` before forking: the frames, the region
+index and the parsed admin levels are built once and then moved out of the
+garbage collector's reach with ``gc.freeze``, so the workers inherit them
+copy-on-write. Only untouched pages stay shared: reference counting still
+copies the pages a worker reads objects from. The regions are decoded from
+the GeoParquet store into ordinary shapely objects; nothing stays mapped.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from application.city_catalog import city_catalog
+from application.region_index import region_index
+from infrastructure import region_store
+
+PRELOAD_ENV = "PRELOAD_REFERENCE_DATA"
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    data_dir: Path
+    regions: pd.DataFrame
+    cities: pd.DataFrame
+    version: str
+
+
+def data_dir() -> Path:
+    return Path(os.environ.get("DATA_DIR", "./data"))
+
+
+def data_files_version(*paths: Path) -> str:
+    """Token that changes whenever one of the reference data files changes."""
+    parts = []
+    for path in paths:
+        stat = path.stat()
+        parts.append(f"{stat.st_mtime_ns}-{stat.st_size}")
+    return "_".join(parts)
+
+
+def load_reference_data(directory: Path, logger) -> ReferenceData:
+    """Load and index ``regions`` and ``cities.csv`` from ``directory``."""
+    regions_file = directory / "regions.json"
+    regions_store = region_store.store_path(regions_file)
+    if not (regions_file.exists() or regions_store.exists()):
+        error_msg = f"Required data file not found: {regions_file.absolute()}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+
+    try:
+        regions = region_store.load_regions(regions_file)
+        region_index(regions)
+        logger.info("Loaded regions data from {}", regions_file)
+    except Exception as exc:
+        error_msg = f"Failed to load regions data from {regions_file}: {exc}"
+        logger.error(error_msg)
+        raise RuntimeError(error_msg) from exc
+
+    cities_file = directory / "cities.csv"
+    if not cities_file.exists():
+        error_msg = f"Required data file not found: {cities_file.absolute()}"
+        logger.error(error_msg)
+        raise FileNotFoundError(error_msg)
+
+    try:
+        cities = pd.read_csv(cities_file)
+        logger.info("Loaded cities data from {}", cities_file)
+    except Exception as exc:
+        error_msg = f"Failed to load cities data from {cities_file}: {exc}"
+        logger.error(error_msg)
+        raise RuntimeError(error_msg) from exc
+
+    version = data_files_version(
+        regions_file if regions_file.exists() else regions_store, cities_file
+    )
+    return ReferenceData(directory, regions, cities, version)
+
+
+_preloaded: Optional[ReferenceData] = None
+
+
+def preload_requested() -> bool:
+    return os.environ.get(PRELOAD_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def preload_reference_data(logger, directory: Optional[Path] = None) -> ReferenceData:
+    """Load the reference data in this (master) process for its future workers."""
+    global _preloaded
+    data = load_reference_data(directory or data_dir(), logger)
+    try:
+        city_catalog.admin_levels_index(data.cities)
+    except (KeyError, ValueError):
+        pass
+    _preloaded = data
+    # Objects allocated so far are never collected, so the GC does not write
+    # to their pages in the workers and the copy-on-write sharing survives.
+    gc.freeze()
+    return data
+
+
+def reference_data(directory: Path, logger) -> ReferenceData:
+    """The preloaded reference data when it matches ``directory``, else a fresh load."""
+    if _preloaded is not None and _preloaded.data_dir == directory:
+        return _preloaded
+    return load_reference_data(directory, logger)
@@ -1,139 +1,144 @@
 """HTTP route registrations for the FastAPI presentation layer."""
 
-import json
-import os
-import tempfile
-from typing import List
+import asyncio
+from dataclasses import asdict
+from itertools import chain
+from typing import List, Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Body,
+    HTTPException,
+    Query,
+    Request,
+)
+from fastapi.responses import Response, StreamingResponse
+
+from app import http_cache
+from app.graph_payloads import GraphPayloadLoader
+from application import service_facade
+from domain.schemas import (
+    CityBase,
+    DegreeDistributionBase,
+    DualGraphBase,
+    GraphBase,
+    RegionBase,
+    RegionInfoBase,
+    SmallWorldStatsBase,
+)
+from shared import compression
+
+
+GRAPH_FORMAT_MEDIA_TYPES = {
+    "application/json": "json",
+    service_facade.ARROW_STREAM_MEDIA_TYPE: "arrow",
+    service_facade.PARQUET_MEDIA_TYPE: "parquet",
+}
+
+
+def _negotiate_graph_format(accept: Optional[str], requested: Optional[str]) -> str:
+    """Pick ``json``/``arrow``/``parquet`` from ``?format=`` or the Accept header."""
+    if requested:
+        return requested
+
+    chosen, chosen_q = "json", 0.0
+    for part in (accept or "").split(","):
+        media, *params = [piece.strip() for piece in part.split(";")]
+        fmt = GRAPH_FORMAT_MEDIA_TYPES.get(media.lower())
+        if fmt is None:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > chosen_q:
+            chosen, chosen_q = fmt, q
+    return chosen
+
+
+def _require_graph_format(fmt: str) -> None:
+    """Reject columnar formats up front when pyarrow is not installed."""
+    if fmt != "json" and not service_facade.COLUMNAR_AVAILABLE:
+        raise HTTPException(
+            status_code=406,
+            detail="Arrow and Parquet responses require pyarrow on the server",
+        )
 
-from fastapi import APIRouter, Body, HTTPException, Query, Request
-from fastapi.responses import StreamingResponse
 
-from application import service_facade
-from domain.schemas import CityBase, GraphBase, RegionBase, RegionInfoBase
+def _columnar_response(content: bytes, fmt: str, filename_stem: str) -> Response:
+    """Response carrying an Arrow IPC stream or a Parquet ZIP archive."""
+    headers = {"Vary": "Accept"}
+    if fmt == "arrow":
+        return Response(
+            content=content,
+            media_type=service_facade.ARROW_STREAM_MEDIA_TYPE,
+            headers=headers,
+        )
+
+    headers["Content-Disposition"] = (
+        f'attachment; filename="{filename_stem}_parquet.zip"'
+    )
+    return Response(content=content, media_type="application/zip", headers=headers)
 
 
 def build_router(logger) -> APIRouter:
     """Create an APIRouter wired up with the project endpoints."""
     router = APIRouter(prefix="/api")
 
-    async def _load_graph_base(
-        city_id: int,
-        regions_ids: List[int],
-        request: Request,
-        use_cache: bool,
-        request_label: str,
-    ) -> tuple[GraphBase, str]:
-        os.makedirs("./data/caches", exist_ok=True)
-
-        regions_key = "_".join(map(str, sorted(regions_ids)))
-        cache_response_file_path = f"./data/caches/{city_id}_{regions_key}.json"
-
-        if use_cache and os.path.exists(cache_response_file_path):
-            try:
-                with open(
-                    cache_response_file_path, "r", encoding="utf-8"
-                ) as cached_file:
-                    cached_data = json.load(cached_file)
-                required_keys = {
-                    "edges_csv",
-                    "points_csv",
-                    "ways_properties_csv",
-                    "points_properties_csv",
-                    "metrics_csv",
-                    "access_nodes_csv",
-                    "access_edges_csv",
-                }
-                if (
-                    isinstance(cached_data, dict)
-                    and required_keys.issubset(cached_data.keys())
-                    and all(
-                        isinstance(cached_data.get(key), str) for key in required_keys
-                    )
-                ):
-                    try:
-                        return GraphBase(**cached_data), regions_key
-                    except Exception:
-                        logger.warning(
-                            "Cached graph payload failed validation, regenerating: {}",
-                            cache_response_file_path,
-                        )
-                else:
-                    logger.warning(
-                        "Ignore invalid cache file: {}", cache_response_file_path
-                    )
-            except Exception as exc:
-                logger.warning(
-                    "Failed to read cache {}: {}",
-                    cache_response_file_path,
-                    exc,
-                )
-
-        (
-            points,
-            edges,
-            pprop,
-            wprop,
-            metrics,
-            access_nodes,
-            access_edges,
-        ) = await service_facade.graph_from_ids(
-            city_id=city_id,
-            regions_ids=regions_ids,
-            regions=request.app.state.regions_df,
-        )
-
-        if points is None:
-            detail = f"Region not found or city {city_id} not downloaded. Requested regions: {regions_ids}"
-            logger.error(f"{request_label} 404 {detail}")
-            raise HTTPException(status_code=404, detail=detail)
-
-        if len(points) == 0 or len(edges) == 0:
-            detail = (
-                f"No road network data found for region(s) {regions_ids} in city {city_id}. "
-                "The data for this region has not been downloaded from OSM yet. Please ensure the region data is downloaded before requesting the graph."
+    graph_payloads = GraphPayloadLoader(logger)
+
+    async def _json_payload_response(
+        payload: bytes, encoding: str, request: Request
+    ) -> Response:
+        """Send a compressed JSON payload as-is when the client accepts it."""
+        headers = {"Vary": "Accept-Encoding"}
+        if compression.accepts_encoding(
+            request.headers.get("accept-encoding"), encoding
+        ):
+            if encoding != compression.IDENTITY:
+                headers["Content-Encoding"] = encoding
+        else:
+            payload = await asyncio.to_thread(
+                compression.decompress, payload, encoding
             )
-            logger.error(f"{request_label} 422 {detail}")
-            raise HTTPException(status_code=422, detail=detail)
-
-        graph_base = service_facade.graph_to_scheme(
-            points,
-            edges,
-            pprop,
-            wprop,
-            metrics,
-            access_nodes,
-            access_edges,
-        )
-        data = (
-            graph_base.model_dump()
-            if hasattr(graph_base, "model_dump")
-            else graph_base.dict()
+        return Response(
+            content=payload, media_type="application/json", headers=headers
         )
 
-        try:
-            dirpath = os.path.dirname(cache_response_file_path)
-            with tempfile.NamedTemporaryFile(
-                "w", dir=dirpath, delete=False, encoding="utf-8"
-            ) as tmp:
-                json.dump(data, tmp)
-                tmp.flush()
-                os.fsync(tmp.fileno())
-                tmp_name = tmp.name
-            os.replace(tmp_name, cache_response_file_path)
-        except Exception as exc:
-            logger.warning(
-                "Failed to write cache {}: {}", cache_response_file_path, exc
-            )
+    def _not_modified(
+        request: Request, etag: str, request_label: str
+    ) -> Optional[Response]:
+        """304 response when the client already holds ``etag``."""
+        if not http_cache.etag_matches(request.headers.get("if-none-match"), etag):
+            return None
+        logger.info(f"{request_label} 304 NOT MODIFIED")
+        return http_cache.not_modified(etag)
 
-        return graph_base, regions_key
+    def _data_version(request: Request) -> str:
+        """Version of the loaded reference files (``regions.json``, ``cities.csv``)."""
+        return getattr(request.app.state, "data_version", "")
+
+    def _city_etag(request: Request, *parts) -> str:
+        """ETag tied to the city data version and the loaded reference files."""
+        return http_cache.make_etag(*parts, _data_version(request))
 
     @router.get("/city/", response_model=CityBase)
     @logger.catch(exclude=HTTPException)
-    async def get_city(city_id: int):
+    async def get_city(request: Request, response: Response, city_id: int):
         request_label = f"GET /api/city?city_id={city_id}"
         status_code = 200
         detail = "OK"
 
+        versions = graph_payloads.cache.versions
+        etag = _city_etag(request, "city", city_id, versions.get(city_id))
+        not_modified = _not_modified(request, etag, request_label)
+        if not_modified is not None:
+            return not_modified
+
         city = await service_facade.get_city(city_id=city_id)
         if city is None:
             status_code = 404
@@ -141,43 +146,75 @@ def build_router(logger) -> APIRouter:
             logger.error(f"{request_label} {status_code} {detail}")
             raise HTTPException(status_code=status_code, detail=detail)
 
+        response.headers.update(http_cache.cache_headers(etag))
         logger.info(f"{request_label} {status_code} {detail}")
         return city
 
     @router.get("/cities/", response_model=List[CityBase])
     @logger.catch(exclude=HTTPException)
-    async def get_cities(page: int = Query(ge=0), per_page: int = Query(gt=0)):
+    async def get_cities(
+        request: Request,
+        response: Response,
+        page: int = Query(ge=0),
+        per_page: int = Query(gt=0),
+    ):
         request_label = f"GET /api/cities?page={page}&per_page={per_page}/"
         status_code = 200
         detail = "OK"
 
+        versions = graph_payloads.cache.versions.total()
+        etag = _city_etag(request, "cities", page, per_page, versions)
+        not_modified = _not_modified(request, etag, request_label)
+        if not_modified is not None:
+            return not_modified
+
         cities = await service_facade.get_cities(page=page, per_page=per_page)
         if cities is None:
             cities = []
 
+        response.headers.update(http_cache.cache_headers(etag))
         logger.info(f"{request_label} {status_code} {detail}")
         return cities
 
     @router.get("/regions/city/", response_model=List[RegionBase])
     @logger.catch(exclude=HTTPException)
-    async def city_regions(request: Request, city_id: int):
+    async def city_regions(
+        request: Request,
+        city_id: int,
+        tolerance: Optional[float] = Query(None, gt=0),
+        zoom: Optional[int] = Query(None, ge=0, le=24),
+    ):
         request_label = f"GET /api/regions/city?city_id={city_id}/"
         status_code = 200
         detail = "OK"
 
-        regions = await service_facade.get_regions(
+        tolerance = service_facade.simplification_tolerance(tolerance, zoom)
+        versions = graph_payloads.cache.versions
+        etag = _city_etag(
+            request, "regions", city_id, versions.get(city_id), tolerance
+        )
+        not_modified = _not_modified(request, etag, request_label)
+        if not_modified is not None:
+            return not_modified
+
+        payload = await service_facade.get_regions_payload(
             city_id=city_id,
             regions=request.app.state.regions_df,
             cities=request.app.state.cities_info,
+            geometry=True,
+            tolerance=tolerance,
         )
-        if regions is None:
+        if payload is None:
             status_code = 404
             detail = "NOT FOUND"
             logger.error(f"{request_label} {status_code} {detail}")
             raise HTTPException(status_code=status_code, detail=detail)
 
+        response = await _json_payload_response(
+            payload.payload, payload.encoding, request
+        )
         logger.info(f"{request_label} {status_code} {detail}")
-        return regions
+        return http_cache.with_cache_headers(response, etag)
 
     @router.get("/regions/info/", response_model=List[RegionInfoBase])
     @logger.catch(exclude=HTTPException)
@@ -186,43 +223,94 @@ def build_router(logger) -> APIRouter:
         status_code = 200
         detail = "OK"
 
-        regions = await service_facade.get_regions_info(
+        versions = graph_payloads.cache.versions
+        etag = _city_etag(request, "regions_info", city_id, versions.get(city_id))
+        not_modified = _not_modified(request, etag, request_label)
+        if not_modified is not None:
+            return not_modified
+
+        payload = await service_facade.get_regions_payload(
             city_id=city_id,
             regions=request.app.state.regions_df,
             cities=request.app.state.cities_info,
+            geometry=False,
         )
-        if regions is None:
+        if payload is None:
             status_code = 404
             detail = "NOT FOUND"
             logger.error(f"{request_label} {status_code} {detail}")
             raise HTTPException(status_code=status_code, detail=detail)
 
+        response = await _json_payload_response(
+            payload.payload, payload.encoding, request
+        )
         logger.info(f"{request_label} {status_code} {detail}")
-        return regions
+        return http_cache.with_cache_headers(response, etag)
 
     @router.post("/city/graph/region/", response_model=GraphBase)
     @logger.catch(exclude=HTTPException)
     async def city_graph(
         request: Request,
+        background_tasks: BackgroundTasks,
         city_id: int,
         regions_ids: List[int] = Body(...),
         use_cache: bool = True,
+        simplified: bool = False,
+        response_format: Optional[Literal["json", "arrow", "parquet"]] = Query(
+            None, alias="format"
+        ),
     ):
         request_label = f"POST /api/city/graph/region/?city_id={city_id} regions_ids={regions_ids} (body)"
         status_code = 200
         detail = "OK"
 
         try:
-            graph_base, _ = await _load_graph_base(
-                city_id=city_id,
-                regions_ids=regions_ids,
-                request=request,
-                use_cache=use_cache,
-                request_label=request_label,
+            fmt = _negotiate_graph_format(
+                request.headers.get("accept"), response_format
+            )
+            _require_graph_format(fmt)
+            data_version = _data_version(request)
+            cache_key, regions_key = graph_payloads.region_cache_key(
+                city_id, regions_ids, simplified, data_version
             )
+            etag = http_cache.make_etag(cache_key, fmt)
+            if use_cache:
+                not_modified = _not_modified(request, etag, request_label)
+                if not_modified is not None:
+                    return not_modified
+
+            if fmt == "json":
+                loaded = await graph_payloads.load(
+                    city_id,
+                    regions_ids,
+                    request.app.state.regions_df,
+                    use_cache=use_cache,
+                    simplified=simplified,
+                    reference_version=data_version,
+                    request_label=request_label,
+                    background=background_tasks,
+                )
+                response = await _json_payload_response(
+                    loaded.payload, loaded.encoding, request
+                )
+            else:
+                content = await graph_payloads.load_columnar(
+                    fmt,
+                    city_id,
+                    regions_ids,
+                    request.app.state.regions_df,
+                    use_cache=use_cache,
+                    simplified=simplified,
+                    reference_version=data_version,
+                    request_label=request_label,
+                    background=background_tasks,
+                )
+                response = _columnar_response(
+                    content, fmt, f"city_{city_id}_{regions_key or 'all'}"
+                )
 
             logger.info(f"{request_label} {status_code} {detail}")
-            return graph_base
+            return http_cache.with_cache_headers(response, etag)
         except HTTPException:
             raise
         except Exception as exc:
@@ -240,32 +328,48 @@ def build_router(logger) -> APIRouter:
     @logger.catch(exclude=HTTPException)
     async def city_graph_export(
         request: Request,
+        background_tasks: BackgroundTasks,
         city_id: int,
         regions_ids: List[int] = Body(...),
         use_cache: bool = True,
+        simplified: bool = False,
     ):
         request_label = f"POST /api/city/graph/region/export/?city_id={city_id} regions_ids={regions_ids} (body)"
         status_code = 200
         detail = "OK"
 
         try:
-            graph_base, regions_key = await _load_graph_base(
-                city_id=city_id,
-                regions_ids=regions_ids,
-                request=request,
+            data_version = _data_version(request)
+            cache_key, _ = graph_payloads.region_cache_key(
+                city_id, regions_ids, simplified, data_version
+            )
+            etag = http_cache.make_etag(cache_key, "zip")
+            if use_cache:
+                not_modified = _not_modified(request, etag, request_label)
+                if not_modified is not None:
+                    return not_modified
+
+            archive_chunks, regions_key = await graph_payloads.load_export(
+                city_id,
+                regions_ids,
+                request.app.state.regions_df,
                 use_cache=use_cache,
+                simplified=simplified,
+                reference_version=data_version,
                 request_label=request_label,
+                background=background_tasks,
             )
-            archive_buffer = service_facade.graph_to_zip(graph_base)
-            archive_bytes = archive_buffer.getvalue()
+            # Produce the first chunk here so encoding errors still map to 500
+            first_chunk = next(archive_chunks)
             filename_suffix = regions_key or "all"
             headers = {
-                "Content-Disposition": f'attachment; filename="city_{city_id}_{filename_suffix}.zip"'
+                "Content-Disposition": f'attachment; filename="city_{city_id}_{filename_suffix}.zip"',
+                **http_cache.cache_headers(etag),
             }
 
             logger.info(f"{request_label} {status_code} {detail}")
             return StreamingResponse(
-                iter([archive_bytes]),
+                chain([first_chunk], archive_chunks),
                 media_type="application/zip",
                 headers=headers,
             )
@@ -282,39 +386,201 @@ def build_router(logger) -> APIRouter:
             logger.exception(f"{request_label} {status_code} {detail}")
             raise HTTPException(status_code=status_code, detail=detail) from exc
 
+    @router.post("/city/graph/region/reversed/", response_model=DualGraphBase)
+    @logger.catch(exclude=HTTPException)
+    async def city_dual_graph(
+        request: Request,
+        city_id: int,
+        regions_ids: List[int] = Body(...),
+        use_cache: bool = True,
+    ):
+        request_label = f"POST /api/city/graph/region/reversed/?city_id={city_id} regions_ids={regions_ids} (body)"
+        status_code = 200
+        detail = "OK"
+
+        try:
+            dual = await service_facade.dual_graph_from_ids(
+                city_id=city_id,
+                regions_ids=regions_ids,
+                regions=request.app.state.regions_df,
+                use_cache=use_cache,
+                reference_version=_data_version(request),
+            )
+            if dual is None:
+                status_code = 404
+                detail = f"Region not found or city {city_id} not downloaded. Requested regions: {regions_ids}"
+                logger.error(f"{request_label} {status_code} {detail}")
+                raise HTTPException(status_code=status_code, detail=detail)
+
+            if dual.n == 0:
+                status_code = 422
+                detail = f"No connected streets found for region(s) {regions_ids} in city {city_id}."
+                logger.error(f"{request_label} {status_code} {detail}")
+                raise HTTPException(status_code=status_code, detail=detail)
+
+            logger.info(f"{request_label} {status_code} {detail}")
+            return service_facade.dual_graph_to_scheme(dual)
+        except HTTPException:
+            raise
+        except Exception as exc:
+            status_code = 500
+            error_type = type(exc).__name__
+            error_msg = str(exc)
+            detail = (
+                f"Internal server error building street graph for city {city_id}, regions {regions_ids}. "
+                f"Error: {error_type}: {error_msg}"
+            )
+            logger.exception(f"{request_label} {status_code} {detail}")
+            raise HTTPException(status_code=status_code, detail=detail) from exc
+
+    @router.post("/city/graph/region/stats/", response_model=SmallWorldStatsBase)
+    @logger.catch(exclude=HTTPException)
+    async def city_graph_stats(
+        request: Request,
+        city_id: int,
+        regions_ids: List[int] = Body(...),
+        topology: Literal["dual", "primal"] = "dual",
+        sample_size: int = Query(256, gt=0),
+        use_cache: bool = True,
+    ):
+        request_label = f"POST /api/city/graph/region/stats/?city_id={city_id}&topology={topology} regions_ids={regions_ids} (body)"
+        status_code = 200
+        detail = "OK"
+
+        try:
+            stats = await service_facade.graph_stats_from_ids(
+                city_id=city_id,
+                regions_ids=regions_ids,
+                regions=request.app.state.regions_df,
+                topology=topology,
+                sample_size=sample_size,
+                use_cache=use_cache,
+                reference_version=_data_version(request),
+            )
+            if stats is None:
+                status_code = 404
+                detail = f"Region not found or city {city_id} not downloaded. Requested regions: {regions_ids}"
+                logger.error(f"{request_label} {status_code} {detail}")
+                raise HTTPException(status_code=status_code, detail=detail)
+
+            logger.info(f"{request_label} {status_code} {detail}")
+            return SmallWorldStatsBase(topology=topology, **stats.as_dict())
+        except HTTPException:
+            raise
+        except Exception as exc:
+            status_code = 500
+            error_type = type(exc).__name__
+            error_msg = str(exc)
+            detail = (
+                f"Internal server error computing statistics for city {city_id}, regions {regions_ids}. "
+                f"Error: {error_type}: {error_msg}"
+            )
+            logger.exception(f"{request_label} {status_code} {detail}")
+            raise HTTPException(status_code=status_code, detail=detail) from exc
+
+    @router.post("/city/graph/region/degrees/", response_model=DegreeDistributionBase)
+    @logger.catch(exclude=HTTPException)
+    async def city_graph_degrees(
+        request: Request,
+        city_id: int,
+        regions_ids: List[int] = Body(...),
+        topology: Literal["dual", "primal"] = "dual",
+        xmin: Optional[int] = Query(None, gt=0),
+        use_cache: bool = True,
+    ):
+        request_label = f"POST /api/city/graph/region/degrees/?city_id={city_id}&topology={topology} regions_ids={regions_ids} (body)"
+        status_code = 200
+        detail = "OK"
+
+        try:
+            distribution = await service_facade.degree_distribution_from_ids(
+                city_id=city_id,
+                regions_ids=regions_ids,
+                regions=request.app.state.regions_df,
+                topology=topology,
+                xmin=xmin,
+                use_cache=use_cache,
+                reference_version=_data_version(request),
+            )
+            if distribution is None:
+                status_code = 404
+                detail = f"Region not found or city {city_id} not downloaded. Requested regions: {regions_ids}"
+                logger.error(f"{request_label} {status_code} {detail}")
+                raise HTTPException(status_code=status_code, detail=detail)
+
+            logger.info(f"{request_label} {status_code} {detail}")
+            return DegreeDistributionBase(topology=topology, **asdict(distribution))
+        except HTTPException:
+            raise
+        except Exception as exc:
+            status_code = 500
+            error_type = type(exc).__name__
+            error_msg = str(exc)
+            detail = (
+                f"Internal server error computing degree distribution for city {city_id}, regions {regions_ids}. "
+                f"Error: {error_type}: {error_msg}"
+            )
+            logger.exception(f"{request_label} {status_code} {detail}")
+            raise HTTPException(status_code=status_code, detail=detail) from exc
+
     @router.post("/city/graph/bbox/{city_id}/", response_model=GraphBase)
     @logger.catch(exclude=HTTPException)
-    async def city_graph_poly(city_id: int, polygons_as_list: List[List[List[float]]]):
+    async def city_graph_poly(
+        request: Request,
+        background_tasks: BackgroundTasks,
+        city_id: int,
+        polygons_as_list: List[List[List[float]]],
+        use_cache: bool = True,
+        simplified: bool = False,
+        incremental: bool = False,
+        response_format: Optional[Literal["json", "arrow", "parquet"]] = Query(
+            None, alias="format"
+        ),
+    ):
         request_label = f"POST /api/city/graph/bbox/{city_id}/"
         status_code = 200
         detail = "OK"
 
+        fmt = _negotiate_graph_format(request.headers.get("accept"), response_format)
+        _require_graph_format(fmt)
+
         polygon = service_facade.list_to_polygon(polygons=polygons_as_list)
-        (
-            points,
-            edges,
-            pprop,
-            wprop,
-            metrics,
-            access_nodes,
-            access_edges,
-        ) = await service_facade.graph_from_poly(city_id=city_id, polygon=polygon)
-
-        if points is None:
-            status_code = 404
-            detail = "NOT FOUND"
-            logger.error(f"{request_label} {status_code} {detail}")
-            raise HTTPException(status_code=status_code, detail=detail)
+        cache_key, _ = graph_payloads.polygon_cache_key(
+            city_id, polygon, simplified, incremental
+        )
+        etag = _city_etag(request, cache_key, fmt)
+        if use_cache:
+            not_modified = _not_modified(request, etag, request_label)
+            if not_modified is not None:
+                return not_modified
+
+        if fmt == "json":
+            loaded = await graph_payloads.load_polygon(
+                city_id,
+                polygon,
+                use_cache=use_cache,
+                simplified=simplified,
+                incremental=incremental,
+                request_label=request_label,
+                background=background_tasks,
+            )
+            response = await _json_payload_response(
+                loaded.payload, loaded.encoding, request
+            )
+        else:
+            content = await graph_payloads.load_polygon_columnar(
+                fmt,
+                city_id,
+                polygon,
+                use_cache=use_cache,
+                simplified=simplified,
+                incremental=incremental,
+                request_label=request_label,
+                background=background_tasks,
+            )
+            response = _columnar_response(content, fmt, f"city_{city_id}_bbox")
 
         logger.info(f"{request_label} {status_code} {detail}")
-        return service_facade.graph_to_scheme(
-            points,
-            edges,
-            pprop,
-            wprop,
-            metrics,
-            access_nodes,
-            access_edges,
-        )
+        return http_cache.with_cache_headers(response, etag)
 
     return router
@@ -0,0 +1,252 @@
+"""Prebuild graph cache entries for every district of the downloaded cities.
+
+Run once as a command (``python -m app.warmup``) or let the API start it in
+the background with ``GRAPH_CACHE_WARMUP=1``. Entries are built through
+``GraphPayloadLoader`` so they match what the region endpoint looks up.
+
+``warm_region_membership`` assigns the points of downloaded cities to their
+regions (see ``infrastructure.region_membership``); the API runs it at startup
+unless ``REGION_MEMBERSHIP=0``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.graph_payloads import GraphPayloadLoader
+from application.region_service import get_admin_levels_info
+from infrastructure.repositories.cities import CityRepository
+from infrastructure.repositories.graph import GraphRepository
+
+DEFAULT_CONCURRENCY = 2
+PROGRESS_EVERY = 25
+
+
+@dataclass
+class WarmupReport:
+    cities: int = 0
+    regions: int = 0
+    built: int = 0
+    cached: int = 0
+    skipped: int = 0
+    failed: int = 0
+    cache: dict = field(default_factory=dict)
+
+    @property
+    def done(self) -> int:
+        return self.built + self.cached + self.skipped + self.failed
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def warmup_concurrency() -> int:
+    try:
+        return max(1, int(os.environ["GRAPH_CACHE_WARMUP_CONCURRENCY"]))
+    except (KeyError, ValueError):
+        return DEFAULT_CONCURRENCY
+
+
+def _city_regions(city_name: str, regions, cities) -> List[int]:
+    try:
+        infos = get_admin_levels_info(
+            city_name=city_name, regions=regions, cities=cities
+        )
+    except (IndexError, KeyError, ValueError, SyntaxError):
+        return []
+    return list(dict.fromkeys(info.id for info in infos))
+
+
+async def warm_graph_cache(
+    loader: GraphPayloadLoader,
+    regions,
+    cities,
+    *,
+    city_ids: Optional[Iterable[int]] = None,
+    concurrency: Optional[int] = None,
+    simplified: bool = False,
+    reference_version: str = "",
+) -> WarmupReport:
+    """Build the payload of each district of each downloaded city.
+
+    Districts already cached are counted and left alone; districts without
+    road data (404/422) are skipped. Progress goes to ``loader.logger``.
+    ``reference_version`` must be the API's data version so the entries land
+    under the keys the region endpoint looks up.
+    """
+    logger = loader.logger
+    report = WarmupReport()
+    wanted = set(city_ids) if city_ids is not None else None
+
+    jobs: List[Tuple[int, int]] = []
+    for city in await CityRepository().list_downloaded():
+        if wanted is not None and city["id"] not in wanted:
+            continue
+        region_ids = _city_regions(city["city_name"], regions, cities)
+        report.cities += 1
+        jobs.extend((city["id"], region_id) for region_id in region_ids)
+    report.regions = len(jobs)
+    logger.info(
+        "Cache warm-up: {} districts in {} cities", report.regions, report.cities
+    )
+
+    semaphore = asyncio.Semaphore(concurrency or warmup_concurrency())
+
+    async def warm(city_id: int, region_id: int) -> None:
+        async with semaphore:
+            cache_key, _ = loader.region_cache_key(
+                city_id, [region_id], simplified, reference_version
+            )
+            try:
+                if await loader.cache.get_async(cache_key) is not None:
+                    report.cached += 1
+                else:
+                    await loader.load(
+                        city_id,
+                        [region_id],
+                        regions,
+                        simplified=simplified,
+                        reference_version=reference_version,
+                        request_label=f"warm-up city {city_id} region {region_id}",
+                    )
+                    report.built += 1
+            except HTTPException:
+                report.skipped += 1
+            except Exception as exc:
+                report.failed += 1
+                logger.warning(
+                    "Cache warm-up failed for city {} region {}: {}",
+                    city_id,
+                    region_id,
+                    exc,
+                )
+            if report.done % PROGRESS_EVERY == 0 or report.done == report.regions:
+                stats = loader.cache.stats()
+                logger.info(
+                    "Cache warm-up {}/{}: built {}, cached {}, skipped {}, failed {};"
+                    " disk {} entries / {} bytes",
+                    report.done,
+                    report.regions,
+                    report.built,
+                    report.cached,
+                    report.skipped,
+                    report.failed,
+                    stats["disk_entries"],
+                    stats["disk_bytes"],
+                )
+
+    await asyncio.gather(*(warm(city_id, region_id) for city_id, region_id in jobs))
+    report.cache = loader.cache.stats()
+    return report
+
+
+async def warm_region_membership(
+    regions,
+    logger,
+    *,
+    city_ids: Optional[Iterable[int]] = None,
+    rebuild: bool = False,
+    reference_version: str = "",
+) -> int:
+    """Store region membership for downloaded cities that lack a current one.
+
+    A membership built from another ``reference_version`` of ``regions.json``
+    is reassigned; with ``rebuild`` every city is. Returns the number of
+    cities assigned by this call.
+    """
+    from application.ingestion.utils import add_region_membership_to_db
+
+    wanted = set(city_ids) if city_ids is not None else None
+    assigned = 0
+    for city in await CityRepository().list_downloaded():
+        city_id = city["id"]
+        if wanted is not None and city_id not in wanted:
+            continue
+        if not rebuild and (
+            await GraphRepository().region_membership_version(city_id)
+            == reference_version
+        ):
+            continue
+        try:
+            if await asyncio.to_thread(
+                add_region_membership_to_db,
+                city_id,
+                regions,
+                not rebuild,
+                reference_version,
+            ):
+                assigned += 1
+                logger.info("Assigned region membership for city {}", city_id)
+        except Exception as exc:
+            logger.warning("Region membership failed for city {}: {}", city_id, exc)
+    return assigned
+
+
+async def _run(args) -> WarmupReport:
+    from app.reference_data import load_reference_data
+    from infrastructure import logging as logging_config
+    from infrastructure.database import database
+
+    logger = logging_config.init()
+    # Same loader as the API, so regions come from the GeoParquet store
+    data = load_reference_data(Path(args.data_dir), logger)
+    regions, cities = data.regions, data.cities
+
+    await database.connect()
+    try:
+        if args.membership or args.rebuild_membership:
+            await warm_region_membership(
+                regions,
+                logger,
+                city_ids=args.city or None,
+                rebuild=args.rebuild_membership,
+                reference_version=data.version,
+            )
+        return await warm_graph_cache(
+            GraphPayloadLoader(logger),
+            regions,
+            cities,
+            city_ids=args.city or None,
+            concurrency=args.concurrency,
+            simplified=args.simplified,
+            reference_version=data.version,
+        )
+    finally:
+        await database.disconnect()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--data-dir", default=os.environ.get("DATA_DIR", "./data"), type=str
+    )
+    parser.add_argument(
+        "--city", type=int, action="append", help="Only warm this city id"
+    )
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--simplified", action="store_true")
+    parser.add_argument(
+        "--membership",
+        action="store_true",
+        help="Assign region membership of cities lacking it first",
+    )
+    parser.add_argument(
+        "--rebuild-membership",
+        action="store_true",
+        help="Reassign region membership of every city first",
+    )
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_run(args))
+    print(report.as_dict())
+
+
+if __name__ == "__main__":
+    main()
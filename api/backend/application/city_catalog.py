@@ -0,0 +1,167 @@
+"""In-memory catalog of cities, loaded at startup and kept fresh by events.
+
+Graph and region requests used to start with a ``Cities`` query, and the
+admin levels of a city were found with a boolean mask over ``cities.csv``
+plus an ``ast.literal_eval``. The catalog answers both from dictionaries:
+cities by id (with their ``downloaded`` flag and property columns)
+and the parsed admin levels of every row of ``cities.csv``.
+
+Ingestion publishes ``city_changed`` after an import; the catalog then drops
+that city and re-reads it on the next lookup. Every entry also remembers the
+city's data version (``versions.json``), so an import done by another worker
+or by the CLI, which bumps that version, makes the entry stale here too.
+"""
+
+from __future__ import annotations
+
+import ast
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+from pandas import DataFrame
+
+from infrastructure.graph_cache import get_graph_cache
+from infrastructure.repositories.cities import CityRepository
+from shared import events
+
+PROPERTY_COLUMNS = (
+    "population",
+    "population_density",
+    "time_zone",
+    "time_created",
+    "c_latitude",
+    "c_longitude",
+)
+
+
+@dataclass(frozen=True)
+class CatalogCity:
+    id: int
+    city_name: str
+    downloaded: bool
+    id_property: Optional[int] = None
+    property: Optional[Dict[str, Any]] = None
+    version: int = 0
+
+    @classmethod
+    def from_row(
+        cls,
+        row: Mapping[str, Any],
+        city_id: Optional[int] = None,
+        version: int = 0,
+    ):
+        data = dict(row)
+        prop = None
+        # c_latitude is NOT NULL in CityProperties, so NULL means no property row
+        if data.get("c_latitude") is not None:
+            prop = {column: data.get(column) for column in PROPERTY_COLUMNS}
+        return cls(
+            id=int(data.get("id", city_id)),
+            city_name=data.get("city_name"),
+            downloaded=bool(data.get("downloaded")),
+            id_property=data.get("id_property"),
+            property=prop,
+            version=version,
+        )
+
+
+def _data_version(city_id: int) -> int:
+    return get_graph_cache().versions.get(city_id)
+
+
+class CityCatalog:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, CatalogCity] = {}
+        self._levels_source: Optional[DataFrame] = None
+        self._levels: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    async def load(self, cities_info: Optional[DataFrame] = None) -> None:
+        """Read every city (with properties) and index ``cities_info``."""
+        # Versions are read before the rows: a row can only be newer than its
+        # version, and a newer row just gets re-read once more.
+        versions = get_graph_cache().versions.snapshot()
+        rows = await CityRepository().list_all()
+        entries = [
+            CatalogCity.from_row(row, version=versions.get(str(row["id"]), 0))
+            for row in rows
+        ]
+        with self._lock:
+            self._by_id = {entry.id: entry for entry in entries}
+        if cities_info is not None:
+            self.admin_levels_index(cities_info)
+
+    def _remember(self, entry: CatalogCity) -> None:
+        with self._lock:
+            self._by_id[entry.id] = entry
+
+    async def refresh(self, city_id: int) -> Optional[CatalogCity]:
+        """Re-read one city from the DB."""
+        version = _data_version(city_id)
+        row = await CityRepository().by_id_with_property(city_id)
+        if row is None:
+            self.forget(city_id)
+            return None
+        entry = CatalogCity.from_row(row, city_id, version)
+        self._remember(entry)
+        return entry
+
+    def cached(self, city_id: int) -> Optional[CatalogCity]:
+        """The entry of ``city_id``, or ``None`` when missing or outdated."""
+        entry = self._by_id.get(city_id)
+        if entry is None or entry.version != _data_version(city_id):
+            return None
+        return entry
+
+    async def get(self, city_id: int) -> Optional[CatalogCity]:
+        entry = self.cached(city_id)
+        if entry is not None:
+            return entry
+        return await self.refresh(city_id)
+
+    def forget(self, city_id: int) -> None:
+        with self._lock:
+            self._by_id.pop(city_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._by_id.clear()
+            self._levels_source = None
+            self._levels = {}
+
+    def admin_levels_index(self, cities_info: DataFrame) -> Dict[str, List[int]]:
+        """City name -> admin levels of ``cities_info``, parsed once per frame."""
+        with self._lock:
+            if self._levels_source is cities_info:
+                return self._levels
+        levels: Dict[str, List[int]] = {}
+        for name, value in zip(cities_info["Город"], cities_info["admin_levels"]):
+            # The first row of a name wins, as with the former mask lookup
+            if name in levels:
+                continue
+            try:
+                levels[name] = list(ast.literal_eval(str(value)))
+            except (ValueError, SyntaxError, TypeError):
+                continue
+        with self._lock:
+            self._levels_source, self._levels = cities_info, levels
+        return levels
+
+    def admin_levels(self, city_name: str, cities_info: DataFrame) -> List[int]:
+        """Admin levels of ``city_name``; ``IndexError`` when it is not listed."""
+        levels = self.admin_levels_index(cities_info).get(city_name)
+        if levels is None:
+            raise IndexError(f"no admin levels for {city_name!r}")
+        return levels
+
+
+city_catalog = CityCatalog()
+
+
+@events.on_city_changed
+def _forget_changed_city(city_id: int, version: int) -> None:
+    city_catalog.forget(city_id)
@@ -1,10 +1,20 @@
 """Helpers that load cities from the repository and convert them to schemas."""
 
-from typing import List, Optional, Mapping, Any
+from typing import List, Optional, Mapping, Any, Tuple
 
+from application.city_catalog import city_catalog
 from domain.schemas import CityBase, PropertyBase
-from infrastructure.models import City, CityProperty
+from infrastructure.graph_cache import get_graph_cache
 from infrastructure.repositories.cities import CityRepository
+from shared import events
+from shared.lru import LruCache
+
+city_list_cache: "LruCache[Tuple[int, List[CityBase]]]" = LruCache(64)
+
+
+@events.on_city_changed
+def _drop_city_lists(city_id: int, version: int) -> None:
+    city_list_cache.clear()
 
 
 async def property_to_scheme(
@@ -26,32 +36,42 @@ async def property_to_scheme(
     )
 
 
-async def city_to_scheme(city: Optional[Mapping[str, Any]]) -> Optional[CityBase]:
-    """Attach property data to the city DTO and return a CityBase."""
-    if city is None:
-        return None
-
+async def joined_city_to_scheme(row: Mapping[str, Any]) -> CityBase:
+    """Build a CityBase from a ``CityRepository.list`` row (city + property columns)."""
     city_base = CityBase(
-        id=city["id"], city_name=city["city_name"], downloaded=city["downloaded"]
+        id=row["id"], city_name=row["city_name"], downloaded=row["downloaded"]
     )
-    repo = CityRepository()
-    prop = await repo.property_by_city(city["id_property"])
-    city_base.property = await property_to_scheme(prop=prop)
+    # c_latitude is NOT NULL in CityProperties, so NULL means no property row
+    if row["c_latitude"] is not None:
+        city_base.property = await property_to_scheme(prop=row)
     return city_base
 
 
-async def cities_to_scheme_list(cities: List[City]) -> List[CityBase]:
-    """Convert every city in the list into its schema representation."""
-    return [await city_to_scheme(city=city) for city in cities]
+async def get_cities(page: int, per_page: int) -> List[CityBase]:
+    """Page of cities, kept in memory until a city's data version changes.
 
+    Each page remembers the sum of the city data versions it was read at, so
+    an import finished by another worker is seen here as well.
+    """
+    versions = get_graph_cache().versions.total()
+    cache_key = (page, per_page)
+    cached = city_list_cache.get(cache_key)
+    if cached is not None and cached[0] == versions:
+        return cached[1]
 
-async def get_cities(page: int, per_page: int) -> List[CityBase]:
     repo = CityRepository()
     rows = await repo.list(page=page, per_page=per_page)
-    return await cities_to_scheme_list(rows)
+    cities = [await joined_city_to_scheme(row) for row in rows]
+    city_list_cache.put(cache_key, (versions, cities))
+    return cities
 
 
 async def get_city(city_id: int) -> Optional[CityBase]:
-    repo = CityRepository()
-    city = await repo.by_id(city_id)
-    return await city_to_scheme(city=city)
+    city = await city_catalog.get(city_id)
+    if city is None:
+        return None
+    city_base = CityBase(
+        id=city.id, city_name=city.city_name, downloaded=city.downloaded
+    )
+    city_base.property = await property_to_scheme(prop=city.property)
+    return city_base
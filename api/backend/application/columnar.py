@@ -0,0 +1,232 @@
+"""Typed columnar encodings (Arrow IPC, Parquet) of the graph payload.
+
+The tables are built from the row lists of the graph pipeline
+(``rows_to_tables``), before any CSV is written. ``graph_to_tables`` parses
+the CSV fields of an already cached ``GraphBase`` instead. Both raise
+``ValueError`` when a value does not fit the declared column type.
+
+``pyarrow`` is optional: when it is missing ``COLUMNAR_AVAILABLE`` is false and
+the API keeps answering with the CSV-in-JSON ``GraphBase`` only.
+"""
+
+from __future__ import annotations
+
+import io
+import zipfile
+from typing import Dict, List, Optional, Sequence
+
+from application.converters import EDGE_COLUMNS, SIMPLIFIED_EDGE_COLUMNS
+from domain.schemas import GraphBase
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional serialization dependency
+    pa = None
+    pa_csv = None
+    pq = None
+
+COLUMNAR_AVAILABLE = pa is not None
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+# Schema metadata key carrying the GraphBase field name of every IPC stream
+TABLE_NAME_KEY = b"table"
+
+
+def _column_types() -> Dict[str, Dict[str, "pa.DataType"]]:
+    int64, float64, string = pa.int64(), pa.float64(), pa.string()
+    props = {"id": int64, "property": string, "value": string}
+    return {
+        "edges_csv": {
+            "id": int64,
+            "id_way": int64,
+            "source": int64,
+            "target": int64,
+            "name": string,
+            "length_m": float64,
+            "geometry": string,
+        },
+        "points_csv": {"id": int64, "longitude": float64, "latitude": float64},
+        "ways_properties_csv": props,
+        "points_properties_csv": props,
+        "metrics_csv": {
+            "id": int64,
+            "degree": int64,
+            "in_degree": float64,
+            "out_degree": float64,
+            "eigenvector": float64,
+            "betweenness": float64,
+            "radius": float64,
+            "color": string,
+        },
+        "access_nodes_csv": {
+            "id": int64,
+            "node_type": string,
+            "longitude": float64,
+            "latitude": float64,
+            "source_type": string,
+            "source_id": int64,
+            "name": string,
+        },
+        "access_edges_csv": {
+            "id": int64,
+            "source": int64,
+            "target": int64,
+            "source_way_id": int64,
+            "road_type": string,
+            "length_m": float64,
+            "is_building_link": pa.bool_(),
+            "name": string,
+        },
+    }
+
+
+def _read_table(name: str, csv_text: str, column_types) -> "pa.Table":
+    data = io.BytesIO(csv_text.encode("utf-8"))
+    convert = pa_csv.ConvertOptions(
+        column_types=column_types,
+        strings_can_be_null=True,
+        true_values=["True", "true"],
+        false_values=["False", "false"],
+    )
+    try:
+        table = pa_csv.read_csv(data, convert_options=convert)
+    except pa.ArrowInvalid as exc:
+        raise ValueError(f"{name} does not match its column types: {exc}") from exc
+    return table.replace_schema_metadata({TABLE_NAME_KEY: name.encode("utf-8")})
+
+
+def _require_pyarrow() -> None:
+    if not COLUMNAR_AVAILABLE:
+        raise RuntimeError("pyarrow is not installed")
+
+
+def graph_to_tables(graph: GraphBase) -> Dict[str, "pa.Table"]:
+    """Parse every non-empty CSV field of ``graph`` into a typed Arrow table."""
+    _require_pyarrow()
+
+    data = graph.model_dump() if hasattr(graph, "model_dump") else graph.dict()
+    tables: Dict[str, "pa.Table"] = {}
+    for name, column_types in _column_types().items():
+        csv_text: Optional[str] = data.get(name)
+        if not csv_text or not csv_text.strip():
+            continue
+        tables[name] = _read_table(name, csv_text, column_types)
+    return tables
+
+
+def _rows_table(
+    name: str, rows: Sequence[Sequence], columns: List[str], column_types
+) -> "pa.Table":
+    values: List[list] = [[] for _ in columns]
+    for row in rows:
+        if len(row) != len(columns):
+            raise ValueError(
+                f"{name} row has {len(row)} values, expected {len(columns)}"
+            )
+        for column, value in zip(values, row):
+            column.append(value)
+    try:
+        arrays = [
+            pa.array(column, type=column_types[field])
+            for column, field in zip(values, columns)
+        ]
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as exc:
+        raise ValueError(f"{name} does not match its column types: {exc}") from exc
+    schema = pa.schema(
+        [(field, column_types[field]) for field in columns],
+        metadata={TABLE_NAME_KEY: name.encode("utf-8")},
+    )
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def rows_to_tables(
+    points,
+    edges,
+    pprop,
+    wprop,
+    metrics,
+    access_nodes: Optional[List[List]] = None,
+    access_edges: Optional[List[List]] = None,
+    simplified: bool = False,
+) -> Dict[str, "pa.Table"]:
+    """Typed Arrow tables of the graph pieces ``graph_to_scheme`` takes."""
+    _require_pyarrow()
+
+    column_types = _column_types()
+    pieces = {
+        "edges_csv": edges,
+        "points_csv": points,
+        "ways_properties_csv": wprop,
+        "points_properties_csv": pprop,
+        "metrics_csv": metrics,
+        "access_nodes_csv": access_nodes,
+        "access_edges_csv": access_edges,
+    }
+    tables: Dict[str, "pa.Table"] = {}
+    for name, rows in pieces.items():
+        if rows is None:
+            continue
+        if name == "edges_csv":
+            columns = SIMPLIFIED_EDGE_COLUMNS if simplified else EDGE_COLUMNS
+        else:
+            columns = list(column_types[name])
+        tables[name] = _rows_table(name, rows, columns, column_types[name])
+    return tables
+
+
+def tables_to_arrow_ipc(tables: Dict[str, "pa.Table"]) -> bytes:
+    """Encode the tables as consecutive Arrow IPC streams, one per table.
+
+    Each stream's schema metadata holds the table name under ``table``;
+    ``RecordBatchReader.readAll`` in Arrow JS iterates such concatenated
+    streams, and ``read_arrow_ipc`` below does the same in Python.
+    """
+    sink = pa.BufferOutputStream()
+    for table in tables.values():
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def graph_to_arrow_ipc(graph: GraphBase) -> bytes:
+    return tables_to_arrow_ipc(graph_to_tables(graph))
+
+
+def read_arrow_ipc(payload: bytes) -> Dict[str, "pa.Table"]:
+    """Decode the output of ``graph_to_arrow_ipc`` back into named tables."""
+    source = pa.BufferReader(payload)
+    tables: Dict[str, "pa.Table"] = {}
+    while source.tell() < source.size():
+        table = pa.ipc.open_stream(source).read_all()
+        tables[table.schema.metadata[TABLE_NAME_KEY].decode("utf-8")] = table
+    return tables
+
+
+def tables_to_parquet_zip(tables: Dict[str, "pa.Table"]) -> bytes:
+    """Pack one Parquet file per table (``edges.parquet`` …) into a ZIP archive."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for name, table in tables.items():
+            part = pa.BufferOutputStream()
+            pq.write_table(table, part, compression="zstd")
+            archive.writestr(
+                f"{name.removesuffix('_csv')}.parquet", part.getvalue().to_pybytes()
+            )
+    return buffer.getvalue()
+
+
+def graph_to_parquet_zip(graph: GraphBase) -> bytes:
+    return tables_to_parquet_zip(graph_to_tables(graph))
+
+
+def encode_tables(tables: Dict[str, "pa.Table"], fmt: str) -> bytes:
+    """``tables`` as an Arrow IPC stream (``arrow``) or Parquet ZIP (``parquet``)."""
+    if fmt == "arrow":
+        return tables_to_arrow_ipc(tables)
+    if fmt == "parquet":
+        return tables_to_parquet_zip(tables)
+    raise ValueError(f"unknown columnar format {fmt!r}")
@@ -1,10 +1,10 @@
 """Convert database objects and metrics into convenient schema/CSV payloads."""
 
+import csv
 import io
 import zipfile
-from typing import Iterable, List, Sequence, Optional
-
-import pandas as pd
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Sequence, Optional
 
 from domain.schemas import GraphBase, PointBase
 
@@ -34,12 +34,85 @@ EDGE_EXPORT_COLUMNS = [
 ]
 
 
-def list_to_csv_str(data: Iterable[Sequence], columns: List[str]):
-    """Return a CSV string and DataFrame for the given rows."""
+EDGE_COLUMNS = ["id", "id_way", "source", "target", "name"]
+
+SIMPLIFIED_EDGE_COLUMNS = EDGE_COLUMNS + ["length_m", "geometry"]
+
+POINT_COLUMNS = ["id", "longitude", "latitude"]
+
+PROPERTY_COLUMNS = ["id", "property", "value"]
+
+METRIC_COLUMNS = [
+    "id",
+    "degree",
+    "in_degree",
+    "out_degree",
+    "eigenvector",
+    "betweenness",
+    "radius",
+    "color",
+]
+
+ACCESS_NODE_COLUMNS = [
+    "id",
+    "node_type",
+    "longitude",
+    "latitude",
+    "source_type",
+    "source_id",
+    "name",
+]
+
+ACCESS_EDGE_COLUMNS = [
+    "id",
+    "source",
+    "target",
+    "source_way_id",
+    "road_type",
+    "length_m",
+    "is_building_link",
+    "name",
+]
+
+
+CSV_CHUNK_ROWS = 4096
+
+
+def list_to_csv_str(data: Iterable[Sequence], columns: List[str]) -> str:
+    """Return the rows as a CSV string with a header line.
+
+    Values are written with ``str`` (``None`` becomes an empty field), the
+    same text pandas produced for these tables, minus the int-to-float
+    promotion pandas applied to integer columns containing gaps.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows(data)
+    return buffer.getvalue()
+
+
+def iter_csv_chunks(
+    data: Iterable[Sequence], columns: List[str], chunk_rows: int = CSV_CHUNK_ROWS
+) -> Iterator[str]:
+    """Yield the CSV text of ``data`` in pieces of at most ``chunk_rows`` rows.
+
+    The first piece starts with the header; joining all pieces gives exactly
+    ``list_to_csv_str(data, columns)``.
+    """
     buffer = io.StringIO()
-    df = pd.DataFrame(data, columns=columns)
-    df.to_csv(buffer, index=False)
-    return buffer.getvalue(), df
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    rows = iter(data)
+    batch = list(islice(rows, chunk_rows))
+    while True:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        batch = list(islice(rows, chunk_rows))
+        if not batch:
+            return
 
 
 def graph_to_scheme(
@@ -50,55 +123,23 @@ def graph_to_scheme(
     metrics,
     access_nodes: Optional[List[List]] = None,
     access_edges: Optional[List[List]] = None,
+    simplified: bool = False,
 ) -> GraphBase:
     """Convert graph pieces into CSV blobs ready for GraphBase."""
-    edges_str, _ = list_to_csv_str(edges, ["id", "id_way", "source", "target", "name"])
-    points_str, _ = list_to_csv_str(points, ["id", "longitude", "latitude"])
-    pprop_str, _ = list_to_csv_str(pprop, ["id", "property", "value"])
-    wprop_str, _ = list_to_csv_str(wprop, ["id", "property", "value"])
-    metrics_str, _ = list_to_csv_str(
-        metrics,
-        [
-            "id",
-            "degree",
-            "in_degree",
-            "out_degree",
-            "eigenvector",
-            "betweenness",
-            "radius",
-            "color",
-        ],
+    edges_str = list_to_csv_str(
+        edges, SIMPLIFIED_EDGE_COLUMNS if simplified else EDGE_COLUMNS
     )
+    points_str = list_to_csv_str(points, POINT_COLUMNS)
+    pprop_str = list_to_csv_str(pprop, PROPERTY_COLUMNS)
+    wprop_str = list_to_csv_str(wprop, PROPERTY_COLUMNS)
+    metrics_str = list_to_csv_str(metrics, METRIC_COLUMNS)
 
     access_nodes_str = None
     access_edges_str = None
     if access_nodes is not None:
-        access_nodes_str, _ = list_to_csv_str(
-            access_nodes,
-            [
-                "id",
-                "node_type",
-                "longitude",
-                "latitude",
-                "source_type",
-                "source_id",
-                "name",
-            ],
-        )
+        access_nodes_str = list_to_csv_str(access_nodes, ACCESS_NODE_COLUMNS)
     if access_edges is not None:
-        access_edges_str, _ = list_to_csv_str(
-            access_edges,
-            [
-                "id",
-                "source",
-                "target",
-                "source_way_id",
-                "road_type",
-                "length_m",
-                "is_building_link",
-                "name",
-            ],
-        )
+        access_edges_str = list_to_csv_str(access_edges, ACCESS_EDGE_COLUMNS)
 
     return GraphBase(
         edges_csv=edges_str,
@@ -127,6 +168,19 @@ def edge_obj_to_list(db_record) -> List:
     ]
 
 
+def simplified_edge_obj_to_list(db_record) -> List:
+    """Return the contracted edge record with its length and polyline."""
+    return [
+        db_record.id,
+        db_record.id_way,
+        db_record.id_src,
+        db_record.id_dist,
+        db_record.name,
+        db_record.length_m,
+        db_record.geometry,
+    ]
+
+
 def record_obj_to_wprop(record) -> List:
     """Convert a way property record into a serializable list."""
     return [record.id_way, record.property, record.value]
@@ -172,107 +226,214 @@ def point_to_scheme(point) -> Optional[PointBase]:
     return PointBase(latitude=point.latitude, longitude=point.longitude)
 
 
-def _csv_to_dataframe(csv_content: Optional[str]) -> Optional[pd.DataFrame]:
-    """Return a DataFrame for a CSV string, if content is present."""
-    if not csv_content:
-        return None
+def _csv_rows(csv_content: Optional[str]) -> Iterator[Dict[str, str]]:
+    """Yield non-blank CSV rows as dicts keyed by the header line."""
+    if not csv_content or not csv_content.strip():
+        return
+    reader = csv.reader(io.StringIO(csv_content.strip()))
+    header = next(reader, None)
+    if header is None:
+        return
+    for values in reader:
+        if values:
+            yield dict(zip(header, values))
+
+
+def _layer_rows(
+    csv_content: Optional[str], columns: List[str], overrides: Dict[str, str]
+) -> Iterator[List[str]]:
+    """Project CSV rows onto ``columns``, forcing the ``overrides`` values."""
+    for row in _csv_rows(csv_content):
+        row.update(overrides)
+        yield [row.get(column, "") for column in columns]
+
+
+def iter_export_nodes(
+    points_csv: str, access_nodes_csv: Optional[str]
+) -> Iterator[List[str]]:
+    """Rows of the merged node file: base graph points, then access nodes."""
+    yield from _layer_rows(
+        points_csv,
+        NODE_EXPORT_COLUMNS,
+        {
+            "node_type": "graph",
+            "source_type": "point",
+            "source_id": "",
+            "name": "",
+            "layer": "base",
+        },
+    )
+    yield from _layer_rows(access_nodes_csv, NODE_EXPORT_COLUMNS, {"layer": "access"})
+
+
+def iter_export_edges(
+    edges_csv: str, access_edges_csv: Optional[str]
+) -> Iterator[List[str]]:
+    """Rows of the merged edge file: base graph edges, then access edges."""
+    yield from _layer_rows(
+        edges_csv,
+        EDGE_EXPORT_COLUMNS,
+        {
+            "source_way_id": "",
+            "road_type": "",
+            "is_building_link": "False",
+            "layer": "base",
+        },
+    )
+    yield from _layer_rows(access_edges_csv, EDGE_EXPORT_COLUMNS, {"layer": "access"})
 
-    stripped = csv_content.strip()
-    if not stripped:
-        return None
 
-    return pd.read_csv(io.StringIO(stripped), dtype=str)
+def iter_export_node_rows(
+    points: Iterable[Sequence], access_nodes: Optional[Iterable[Sequence]]
+) -> Iterator[List]:
+    """``iter_export_nodes`` over the pipeline rows instead of the payload CSV."""
+    for point_id, longitude, latitude in points:
+        yield [point_id, longitude, latitude, "graph", "point", "", "", "base"]
+    for node_id, node_type, longitude, latitude, *source in access_nodes or ():
+        yield [node_id, longitude, latitude, node_type, *source, "access"]
 
 
-def _export_csv_from_frames(frames: List[pd.DataFrame]) -> str:
-    """Serialize concatenated frames into a CSV string."""
-    valid_frames: List[pd.DataFrame] = []
-    for frame in frames:
-        if frame is None or frame.empty:
-            continue
-        if frame.dropna(how="all").empty:
-            continue
-        valid_frames.append(frame)
+def iter_export_edge_rows(
+    edges: Iterable[Sequence], access_edges: Optional[Iterable[Sequence]]
+) -> Iterator[List]:
+    """``iter_export_edges`` over the pipeline rows instead of the payload CSV.
 
-    if not valid_frames:
-        return ""
+    Simplified edges carry ``length_m`` after the base columns; their
+    geometry is not exported.
+    """
+    for edge in edges:
+        edge_id, way_id, source, target, name = edge[:5]
+        length_m = edge[5] if len(edge) > 5 else ""
+        yield [edge_id, source, target, way_id, "", "", length_m, "False", name, "base"]
+    for row in access_edges or ():
+        # The access layer has no ``id_way``; the rest keeps its order
+        edge_id, source, target, source_way_id = row[:4]
+        yield [edge_id, source, target, "", source_way_id, *row[4:], "access"]
 
-    merged = pd.concat(valid_frames, ignore_index=True, copy=False)
-    buffer = io.StringIO()
-    merged.to_csv(buffer, index=False)
-    return buffer.getvalue()
+
+def _iter_export_csv(rows: Iterator[List[str]], columns: List[str]) -> Iterator[str]:
+    """CSV chunks of ``rows``; nothing at all (not even a header) when empty."""
+    first = next(rows, None)
+    if first is None:
+        return
+    yield from iter_csv_chunks(chain([first], rows), columns)
 
 
 def merge_nodes_csv(points_csv: str, access_nodes_csv: Optional[str]) -> str:
     """Combine base graph nodes with optional access-layer nodes."""
-    frames: List[pd.DataFrame] = []
-
-    base_df = _csv_to_dataframe(points_csv)
-    if base_df is not None and not base_df.empty:
-        base_df = base_df.copy()
-        for column in NODE_EXPORT_COLUMNS:
-            if column not in base_df.columns:
-                base_df[column] = pd.NA
-        base_df["node_type"] = "graph"
-        base_df["source_type"] = "point"
-        base_df["source_id"] = pd.NA
-        base_df["name"] = pd.NA
-        base_df["layer"] = "base"
-        frames.append(base_df[NODE_EXPORT_COLUMNS])
-
-    access_df = _csv_to_dataframe(access_nodes_csv)
-    if access_df is not None and not access_df.empty:
-        access_df = access_df.copy()
-        for column in NODE_EXPORT_COLUMNS:
-            if column not in access_df.columns:
-                access_df[column] = pd.NA
-        access_df["layer"] = "access"
-        frames.append(access_df[NODE_EXPORT_COLUMNS])
-
-    return _export_csv_from_frames(frames)
+    rows = iter_export_nodes(points_csv, access_nodes_csv)
+    return "".join(_iter_export_csv(rows, NODE_EXPORT_COLUMNS))
 
 
 def merge_edges_csv(edges_csv: str, access_edges_csv: Optional[str]) -> str:
     """Combine base edges with optional access-layer edges."""
-    frames: List[pd.DataFrame] = []
-
-    base_df = _csv_to_dataframe(edges_csv)
-    if base_df is not None and not base_df.empty:
-        base_df = base_df.copy()
-        for column in EDGE_EXPORT_COLUMNS:
-            if column not in base_df.columns:
-                base_df[column] = pd.NA
-        base_df["source_way_id"] = pd.NA
-        base_df["road_type"] = pd.NA
-        base_df["length_m"] = pd.NA
-        base_df["is_building_link"] = False
-        base_df["layer"] = "base"
-        frames.append(base_df[EDGE_EXPORT_COLUMNS])
-
-    access_df = _csv_to_dataframe(access_edges_csv)
-    if access_df is not None and not access_df.empty:
-        access_df = access_df.copy()
-        for column in EDGE_EXPORT_COLUMNS:
-            if column not in access_df.columns:
-                access_df[column] = pd.NA
-        access_df["layer"] = "access"
-        frames.append(access_df[EDGE_EXPORT_COLUMNS])
-
-    return _export_csv_from_frames(frames)
+    rows = iter_export_edges(edges_csv, access_edges_csv)
+    return "".join(_iter_export_csv(rows, EDGE_EXPORT_COLUMNS))
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink collecting the bytes ``ZipFile`` emits."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_graph_zip(graph: GraphBase) -> Iterator[bytes]:
+    """Stream the export ZIP archive, file by file, without buffering it whole.
+
+    Merged node and edge files are produced row by row from the payload CSV;
+    since the sink is not seekable, ``zipfile`` writes sizes and CRCs into data
+    descriptors after each member.
+    """
+    return _iter_zip(
+        (
+            (
+                "nodes.csv",
+                _iter_export_csv(
+                    iter_export_nodes(graph.points_csv, graph.access_nodes_csv),
+                    NODE_EXPORT_COLUMNS,
+                ),
+            ),
+            (
+                "edges.csv",
+                _iter_export_csv(
+                    iter_export_edges(graph.edges_csv, graph.access_edges_csv),
+                    EDGE_EXPORT_COLUMNS,
+                ),
+            ),
+            ("points_properties.csv", [graph.points_properties_csv or ""]),
+            ("ways_properties.csv", [graph.ways_properties_csv or ""]),
+            ("metrics.csv", [graph.metrics_csv or ""]),
+        )
+    )
 
 
-def graph_to_zip_archive(graph: GraphBase) -> io.BytesIO:
-    """Pack merged CSV payloads into an in-memory ZIP archive."""
-    buffer = io.BytesIO()
-    nodes_csv = merge_nodes_csv(graph.points_csv, graph.access_nodes_csv)
-    edges_csv = merge_edges_csv(graph.edges_csv, graph.access_edges_csv)
+def iter_rows_zip(
+    points,
+    edges,
+    pprop,
+    wprop,
+    metrics,
+    access_nodes: Optional[List[List]] = None,
+    access_edges: Optional[List[List]] = None,
+) -> Iterator[bytes]:
+    """``iter_graph_zip`` fed from the pipeline rows, without a CSV round trip.
+
+    Takes the same pieces as ``graph_to_scheme`` and writes the same archive.
+    """
+    return _iter_zip(
+        (
+            (
+                "nodes.csv",
+                _iter_export_csv(
+                    iter_export_node_rows(points, access_nodes), NODE_EXPORT_COLUMNS
+                ),
+            ),
+            (
+                "edges.csv",
+                _iter_export_csv(
+                    iter_export_edge_rows(edges, access_edges), EDGE_EXPORT_COLUMNS
+                ),
+            ),
+            ("points_properties.csv", iter_csv_chunks(pprop, PROPERTY_COLUMNS)),
+            ("ways_properties.csv", iter_csv_chunks(wprop, PROPERTY_COLUMNS)),
+            ("metrics.csv", iter_csv_chunks(metrics, METRIC_COLUMNS)),
+        )
+    )
 
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
-        archive.writestr("nodes.csv", nodes_csv)
-        archive.writestr("edges.csv", edges_csv)
-        archive.writestr("points_properties.csv", graph.points_properties_csv or "")
-        archive.writestr("ways_properties.csv", graph.ways_properties_csv or "")
-        archive.writestr("metrics.csv", graph.metrics_csv or "")
 
+def _iter_zip(members) -> Iterator[bytes]:
+    """ZIP bytes of ``(name, text chunks)`` members, yielded as they are written."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, chunks in members:
+            with archive.open(name, "w") as member:
+                for text in chunks:
+                    member.write(text.encode("utf-8"))
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def graph_to_zip_archive(graph: GraphBase) -> io.BytesIO:
+    """Pack merged CSV payloads into an in-memory ZIP archive."""
+    buffer = io.BytesIO(b"".join(iter_graph_zip(graph)))
     buffer.seek(0)
     return buffer
@@ -0,0 +1,99 @@
+"""Compressed sparse row (CSR) view of the road graph used by metric engines."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class CsrGraph:
+    """Directed graph stored as NumPy CSR arrays plus the OSM id mapping.
+
+    ``node_ids[i]`` is the point id of vertex ``i``; the out-neighbours of
+    vertex ``i`` are ``indices[indptr[i]:indptr[i + 1]]``.
+    """
+
+    node_ids: np.ndarray
+    index: Dict[int, int]
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    @property
+    def n(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def m(self) -> int:
+        return len(self.indices)
+
+    def sources(self) -> np.ndarray:
+        """Return the tail vertex of every arc, aligned with ``indices``."""
+        return np.repeat(np.arange(self.n, dtype=np.int64), np.diff(self.indptr))
+
+    def arc_set(self) -> Set[Tuple[int, int]]:
+        """Return arcs as ``(src_id, dst_id)`` pairs of point ids."""
+        ids = self.node_ids
+        return set(zip(ids[self.sources()].tolist(), ids[self.indices].tolist()))
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        return np.bincount(self.indices, minlength=self.n)
+
+    def to_scipy(self):
+        """Return the adjacency matrix as ``scipy.sparse.csr_matrix``."""
+        from scipy.sparse import csr_matrix
+
+        data = np.ones(self.m, dtype=np.float64)
+        return csr_matrix((data, self.indices, self.indptr), shape=(self.n, self.n))
+
+
+def csr_from_arcs(node_ids: Sequence[int], arcs: Iterable[Tuple[int, int]]) -> CsrGraph:
+    """Build a CSR graph from point ids and ``(src, dst)`` arcs between them."""
+    index: Dict[int, int] = {}
+    for node_id in node_ids:
+        index.setdefault(node_id, len(index))
+
+    src: List[int] = []
+    dst: List[int] = []
+    for u, v in arcs:
+        src.append(index[u])
+        dst.append(index[v])
+
+    n = len(index)
+    src_arr = np.asarray(src, dtype=np.int64)
+    dst_arr = np.asarray(dst, dtype=np.int64)
+    order = np.argsort(src_arr, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src_arr, minlength=n), out=indptr[1:])
+
+    return CsrGraph(
+        node_ids=np.fromiter(index.keys(), dtype=np.int64, count=n),
+        index=index,
+        indptr=indptr,
+        indices=dst_arr[order],
+    )
+
+
+def build_csr(points, edges, oneway_ids) -> CsrGraph:
+    """Build the same directed graph that ``calc_metrics`` feeds to networkx.
+
+    Vertices are the points in their original order followed by edge endpoints
+    missing from ``points``; every edge is added forward and, unless its way is
+    one-way, backward. Duplicate arcs collapse as they do in ``nx.DiGraph``.
+    """
+    oneway = set(oneway_ids or ())
+    node_ids: List[int] = [point[0] for point in points]
+    arcs: Dict[Tuple[int, int], None] = {}
+    for edge in edges:
+        node_ids.append(edge[2])
+        node_ids.append(edge[3])
+        arcs[(edge[2], edge[3])] = None
+    for edge in edges:
+        if edge[1] not in oneway:
+            arcs[(edge[3], edge[2])] = None
+    return csr_from_arcs(node_ids, arcs)
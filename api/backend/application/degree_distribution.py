@@ -0,0 +1,89 @@
+"""Degree distribution summary and power-law fits, as in ``degrees.ipynb``.
+
+Degrees are out-degrees of the CSR graph with isolated vertices removed. The
+log-log fits regress ``log P(X >= k)`` on ``log k`` over the sorted sample
+(the notebook's ``ecdf(..., log_scale=True)``), so the coefficients match its
+``LinearRegression`` and quadratic ``PolynomialFeatures`` models. The discrete
+maximum-likelihood exponent uses the Clauset–Shalizi–Newman approximation.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from application.csr_graph import CsrGraph
+
+
+@dataclass
+class PowerLawFit:
+    alpha: Optional[float]
+    alpha_stderr: Optional[float]
+    xmin: int
+    n_tail: int
+
+
+@dataclass
+class DegreeDistribution:
+    n: int
+    degrees: List[int]
+    counts: List[int]
+    ccdf: List[float]
+    power_law: PowerLawFit
+    loglog_linear: Optional[List[float]]
+    loglog_quadratic: Optional[List[float]]
+
+
+def log_ecdf(sample: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(log k, log P(X >= k))`` for every element of the sorted sample."""
+    xs = np.sort(sample).astype(np.float64)
+    size = len(xs)
+    ys = np.arange(1, size + 1, dtype=np.float64) / size
+    return np.log(xs), np.log(ys[::-1])
+
+
+def discrete_power_law_mle(sample: np.ndarray, xmin: Optional[int] = None) -> PowerLawFit:
+    """Approximate discrete MLE ``1 + n / sum(ln(x / (xmin - 1/2)))`` for ``x >= xmin``."""
+    if xmin is None:
+        xmin = int(sample.min()) if len(sample) else 1
+    tail = sample[sample >= xmin].astype(np.float64)
+    n_tail = len(tail)
+    if n_tail == 0:
+        return PowerLawFit(None, None, xmin, 0)
+    log_sum = float(np.log(tail / (xmin - 0.5)).sum())
+    if log_sum <= 0:
+        return PowerLawFit(None, None, xmin, n_tail)
+    alpha = 1.0 + n_tail / log_sum
+    return PowerLawFit(alpha, (alpha - 1.0) / math.sqrt(n_tail), xmin, n_tail)
+
+
+def degree_distribution(graph: CsrGraph, xmin: Optional[int] = None) -> DegreeDistribution:
+    sample = graph.out_degree()
+    sample = sample[sample > 0]
+    if len(sample) == 0:
+        return DegreeDistribution(0, [], [], [], PowerLawFit(None, None, 1, 0), None, None)
+
+    degrees, counts = np.unique(sample, return_counts=True)
+    # P(X >= k) for each distinct degree k
+    ccdf = np.cumsum(counts[::-1])[::-1] / len(sample)
+
+    log_x, log_y = log_ecdf(sample)
+    linear = quadratic = None
+    distinct = len(degrees)
+    if distinct >= 2:
+        linear = np.polyfit(log_x, log_y, 1).tolist()
+    if distinct >= 3:
+        quadratic = np.polyfit(log_x, log_y, 2).tolist()
+
+    return DegreeDistribution(
+        n=len(sample),
+        degrees=degrees.tolist(),
+        counts=counts.tolist(),
+        ccdf=ccdf.tolist(),
+        power_law=discrete_power_law_mle(sample, xmin),
+        loglog_linear=linear,
+        loglog_quadratic=quadratic,
+    )
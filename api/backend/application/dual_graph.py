@@ -0,0 +1,126 @@
+"""Street-as-node ("reversed") dual graph of a region's road network.
+
+Each street is a vertex: named edges are merged by way name, unnamed edges by
+their ``id_way``. Two streets are adjacent when they share an intersection
+point. Vertices are numbered ``0..n-1`` so the edge list can be passed to
+``graph_tool.Graph.add_edge_list`` directly, as the analysis notebooks do.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from application.csr_graph import CsrGraph, csr_from_arcs
+from shared import events
+from shared.lru import LruCache
+
+DUAL_NODE_COLUMNS = ["index", "street_name", "id_way", "ways"]
+DUAL_EDGE_COLUMNS = ["src_index", "dest_index"]
+DEFAULT_CACHE_SIZE = 32
+
+
+@dataclass(frozen=True)
+class DualGraph:
+    """Street vertices and symmetric street adjacency as two data frames."""
+
+    nodes: pd.DataFrame
+    edges: pd.DataFrame
+
+    @property
+    def n(self) -> int:
+        return len(self.nodes)
+
+    def nodes_csv(self) -> str:
+        return self.nodes.to_csv(index=False)
+
+    def edges_csv(self) -> str:
+        return self.edges.to_csv(index=False)
+
+    def to_csr(self) -> CsrGraph:
+        """Return the dual graph as a CSR graph keyed by street index."""
+        arcs = zip(
+            self.edges["src_index"].tolist(), self.edges["dest_index"].tolist()
+        )
+        return csr_from_arcs(range(self.n), arcs)
+
+
+def _empty_dual_graph() -> DualGraph:
+    return DualGraph(
+        nodes=pd.DataFrame(columns=DUAL_NODE_COLUMNS),
+        edges=pd.DataFrame(columns=DUAL_EDGE_COLUMNS),
+    )
+
+
+def build_dual_graph(edges) -> DualGraph:
+    """Build the street graph from ``[id, id_way, id_src, id_dist, name, ...]`` rows.
+
+    Streets that do not touch any other street are dropped so that vertex
+    indices stay dense for ``add_edge_list``; the notebooks discard
+    zero-degree streets anyway. Every adjacency is emitted in both directions.
+    """
+    if not edges:
+        return _empty_dual_graph()
+
+    frame = pd.DataFrame(
+        [edge[1:5] for edge in edges], columns=["id_way", "src", "dst", "name"]
+    )
+    names = frame["name"].astype("string").str.strip()
+    named = names.notna() & (names != "")
+    street_key = np.where(
+        named, "n:" + names.fillna(""), "w:" + frame["id_way"].astype(str)
+    )
+    frame["street"], _ = pd.factorize(street_key)
+
+    incidence = pd.DataFrame(
+        {
+            "node": np.concatenate([frame["src"].to_numpy(), frame["dst"].to_numpy()]),
+            "street": np.concatenate([frame["street"].to_numpy()] * 2),
+        }
+    ).drop_duplicates()
+    pairs = incidence.merge(incidence, on="node", suffixes=("_src", "_dest"))
+    pairs = pairs.loc[
+        pairs["street_src"] != pairs["street_dest"], ["street_src", "street_dest"]
+    ].drop_duplicates()
+    if pairs.empty:
+        return _empty_dual_graph()
+
+    # Renumber the connected streets densely, keeping first-seen order
+    connected = np.unique(pairs["street_src"].to_numpy())
+    remap = np.full(frame["street"].max() + 1, -1, dtype=np.int64)
+    remap[connected] = np.arange(len(connected))
+
+    frame["street_name"] = names.where(named)
+    streets = (
+        frame.groupby("street", sort=True)
+        .agg(
+            street_name=("street_name", "first"),
+            id_way=("id_way", "min"),
+            ways=("id_way", "nunique"),
+        )
+        .loc[connected]
+    )
+    nodes = streets.reset_index(drop=True)
+    nodes.insert(0, "index", np.arange(len(nodes)))
+
+    dual_edges = (
+        pd.DataFrame(
+            {
+                "src_index": remap[pairs["street_src"].to_numpy()],
+                "dest_index": remap[pairs["street_dest"].to_numpy()],
+            }
+        )
+        .sort_values(DUAL_EDGE_COLUMNS)
+        .reset_index(drop=True)
+    )
+    return DualGraph(nodes=nodes[DUAL_NODE_COLUMNS], edges=dual_edges)
+
+
+dual_graph_cache: "LruCache[DualGraph]" = LruCache(DEFAULT_CACHE_SIZE)
+
+
+@events.on_city_changed
+def _drop_city_dual_graphs(city_id: int, version: int) -> None:
+    dual_graph_cache.discard_where(lambda key: key[0] == city_id)
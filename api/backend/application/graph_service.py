@@ -2,10 +2,9 @@
 
 import asyncio
 import logging
-from typing import List
-
-import networkx as nx
+from typing import List, Optional, Sequence, Set, Tuple
 
+from application.city_catalog import city_catalog
 from application.converters import (
     point_obj_to_list,
     edge_obj_to_list,
@@ -13,68 +12,183 @@ from application.converters import (
     record_obj_to_pprop,
     access_node_obj_to_list,
     access_edge_obj_to_list,
+    simplified_edge_obj_to_list,
 )
-from application.ingestion.utils import add_graph_to_db
-from infrastructure.repositories.cities import CityRepository
+from application.incremental_metrics import incremental_engine
+from application.region_service import geometry_wkt
+from infrastructure.graph_cache import get_graph_cache
 from infrastructure.repositories.graph import GraphRepository
 from shared.paths import city_pbf_path
 
-
 logger = logging.getLogger(__name__)
 
 
-async def graph_from_poly(city_id, polygon):
-    repo_city = CityRepository()
-    city = await repo_city.by_id(city_id)
+# The ingestion stack (osmium, osmosis helpers) is only needed for on-demand
+# imports, so it is loaded by the first of them rather than at API startup.
+def add_graph_to_db(city_id: int, file_path: str, city_name: str) -> None:
+    from application.ingestion import utils
+
+    utils.add_graph_to_db(city_id, file_path, city_name)
+
+
+def add_simplified_graph_to_db(city_id: int) -> None:
+    from application.ingestion import utils
+
+    utils.add_simplified_graph_to_db(city_id)
+
+
+def add_region_membership_to_db(
+    city_id: int, regions, only_missing: bool, reference_version: str
+) -> bool:
+    from application.ingestion import utils
+
+    return utils.add_region_membership_to_db(
+        city_id, regions, only_missing, reference_version
+    )
+
+
+async def _assign_region_membership(city_id, regions, reference_version) -> None:
+    try:
+        if await asyncio.to_thread(
+            add_region_membership_to_db, city_id, regions, True, reference_version
+        ):
+            logger.info("Assigned region membership for city %s", city_id)
+    except Exception:
+        logger.exception("Failed to assign region membership for city %s", city_id)
+
+
+# (city_id, data version, reference version) whose membership this process
+# already started
+_membership_started: Set[Tuple[int, int, str]] = set()
+
+
+def _schedule_region_membership(city_id, regions, reference_version) -> None:
+    """Assign the city's membership in the background, once per version pair."""
+    key = (city_id, get_graph_cache().versions.get(city_id), reference_version)
+    if key in _membership_started:
+        return
+    _membership_started.add(key)
+    asyncio.get_running_loop().create_task(
+        _assign_region_membership(city_id, regions, reference_version)
+    )
+
+
+async def _ensure_city_graph(city_id, regions=None, reference_version="") -> bool:
+    """Make sure the base graph of the city is in the DB, importing it if needed.
+
+    Given the ``regions`` frame, a city imported here also gets its region
+    membership before the first query runs.
+    """
+    city = city_catalog.cached(city_id)
+    if city is None or not city.downloaded:
+        # Another worker may have imported the city since it was cataloged
+        city = await city_catalog.refresh(city_id)
     if city is None:
-        return None, None, None, None, None, None, None
+        return False
 
-    if not city.downloaded:
-        city_name = city["city_name"]
-        pbf_path = city_pbf_path(city_name)
+    if city.downloaded:
+        return True
 
-        if not pbf_path.exists():
-            logger.warning(
-                "Graph for city %s is requested but PBF is missing at %s",
-                city_id,
-                pbf_path,
-            )
-            return None, None, None, None, None, None, None
+    city_name = city.city_name
+    pbf_path = city_pbf_path(city_name)
 
-        logger.info(
-            "City %s graph not in DB; attempting on-demand import from %s",
+    if not pbf_path.exists():
+        logger.warning(
+            "Graph for city %s is requested but PBF is missing at %s",
             city_id,
             pbf_path,
         )
+        return False
 
-        loop = asyncio.get_running_loop()
-        try:
-            await loop.run_in_executor(
-                None,
-                add_graph_to_db,
-                city_id,
-                str(pbf_path),
-                city_name,
-            )
-        except Exception:
-            logger.exception(
-                "Failed to import graph for city %s from %s",
-                city_id,
-                pbf_path,
-            )
-            return None, None, None, None, None, None, None
+    logger.info(
+        "City %s graph not in DB; attempting on-demand import from %s",
+        city_id,
+        pbf_path,
+    )
 
-        city = await repo_city.by_id(city_id)
-        if city is None or not city.downloaded:
-            logger.error(
-                "Graph import for city %s completed but city still not marked as downloaded",
-                city_id,
-            )
-            return None, None, None, None, None, None, None
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(
+            None,
+            add_graph_to_db,
+            city_id,
+            str(pbf_path),
+            city_name,
+        )
+    except Exception:
+        logger.exception(
+            "Failed to import graph for city %s from %s",
+            city_id,
+            pbf_path,
+        )
+        return False
 
-    polygon_wkt = polygon.wkt
+    city = await city_catalog.refresh(city_id)
+    if city is None or not city.downloaded:
+        logger.error(
+            "Graph import for city %s completed but city still not marked as downloaded",
+            city_id,
+        )
+        return False
+    if regions is not None:
+        await _assign_region_membership(city_id, regions, reference_version)
+    return True
+
+
+async def _membership_region_ids(
+    repo_graph: GraphRepository,
+    city_id,
+    region_ids: Optional[Sequence[int]],
+    regions=None,
+    reference_version: str = "",
+) -> Optional[List[int]]:
+    """Sorted ``region_ids`` when the city's stored membership is current.
+
+    Queries then filter on the membership tables and PostGIS evaluates no
+    geometry predicate. ``None`` falls back to the polygon queries: when the
+    city has no membership, or one built from another ``regions.json`` than
+    ``reference_version``. It is then (re)assigned in the background when
+    ``regions`` is given.
+    """
+    if not region_ids:
+        return None
+    stored = await repo_graph.region_membership_version(city_id)
+    if stored != reference_version:
+        if regions is not None:
+            _schedule_region_membership(city_id, regions, reference_version)
+        return None
+    return sorted({int(region_id) for region_id in region_ids})
+
+
+async def road_network_from_poly(
+    city_id,
+    polygon,
+    simplified: bool = False,
+    region_ids: Optional[Sequence[int]] = None,
+    regions=None,
+    reference_version: str = "",
+):
+    """Return ``(points, edges, oneway_ids)`` of the road graph inside ``polygon``.
+
+    This is the metric-free part of ``graph_from_poly``; ``(None, None, None)``
+    means the city is unknown or its graph could not be loaded. Pass the ids
+    of the regions ``polygon`` was built from as ``region_ids`` to use the
+    stored region membership when the city has a current one, and the
+    ``regions`` frame with its ``reference_version`` to have a missing or
+    outdated membership assigned.
+    """
+    if not await _ensure_city_graph(city_id, regions, reference_version):
+        return None, None, None
 
     repo_graph = GraphRepository()
+    region_ids = await _membership_region_ids(
+        repo_graph, city_id, region_ids, regions, reference_version
+    )
+    return await _road_network(repo_graph, city_id, polygon, simplified, region_ids)
+
+
+async def _road_network(repo_graph, city_id, polygon, simplified, region_ids):
+    polygon_wkt = None if region_ids else geometry_wkt(polygon)
 
     # Fetch property identifiers required for graph queries
     prop_id_name = await repo_graph.property_id("name")
@@ -85,17 +199,37 @@ async def graph_from_poly(city_id, polygon):
             "Missing property id for 'name' (city_id=%s); graph build aborted",
             city_id,
         )
-        return None, None, None, None, None, None, None
+        return None, None, None
 
     if prop_id_highway is None:
         logger.error(
             "Missing property id for 'highway' (city_id=%s); graph build aborted",
             city_id,
         )
-        return None, None, None, None, None, None, None
+        return None, None, None
 
-    # Retrieve points inside the polygon (PostGIS)
-    res_points = await repo_graph.points_in_polygon(city_id, polygon_wkt)
+    if simplified and not await repo_graph.has_simplified_edges(city_id):
+        logger.info(
+            "Simplified topology for city %s is missing; building it now", city_id
+        )
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, add_simplified_graph_to_db, city_id)
+        except Exception:
+            logger.exception(
+                "Failed to build simplified topology for city %s", city_id
+            )
+            return None, None, None
+
+    # Retrieve points inside the regions (membership) or the polygon (PostGIS)
+    if region_ids and simplified:
+        res_points = await repo_graph.simplified_points_in_regions(city_id, region_ids)
+    elif region_ids:
+        res_points = await repo_graph.points_in_regions(city_id, region_ids)
+    elif simplified:
+        res_points = await repo_graph.simplified_points_in_polygon(city_id, polygon_wkt)
+    else:
+        res_points = await repo_graph.points_in_polygon(city_id, polygon_wkt)
     points = list(map(point_obj_to_list, res_points))
 
     # Filter edges by polygon bounds and road types (PostGIS)
@@ -111,16 +245,70 @@ async def graph_from_poly(city_id, polygon):
         "secondary_link",
         "tertiary_link",
     )
-    res_edges = await repo_graph.edges_in_polygon(
-        city_id=city_id,
-        polygon_wkt=polygon_wkt,
-        prop_id_name=prop_id_name,
-        prop_id_highway=prop_id_highway,
-        highway_types=road_types,
-        require_both_endpoints=True,
-        use_midpoint=False,
+    if region_ids and simplified:
+        res_edges = await repo_graph.simplified_edges_in_regions(
+            city_id=city_id,
+            region_ids=region_ids,
+            prop_id_name=prop_id_name,
+            prop_id_highway=prop_id_highway,
+            highway_types=road_types,
+        )
+        edges = list(map(simplified_edge_obj_to_list, res_edges))
+    elif region_ids:
+        res_edges = await repo_graph.edges_in_regions(
+            city_id=city_id,
+            region_ids=region_ids,
+            prop_id_name=prop_id_name,
+            prop_id_highway=prop_id_highway,
+            highway_types=road_types,
+        )
+        edges = list(map(edge_obj_to_list, res_edges))
+    elif simplified:
+        res_edges = await repo_graph.simplified_edges_in_polygon(
+            city_id=city_id,
+            polygon_wkt=polygon_wkt,
+            prop_id_name=prop_id_name,
+            prop_id_highway=prop_id_highway,
+            highway_types=road_types,
+        )
+        edges = list(map(simplified_edge_obj_to_list, res_edges))
+    else:
+        res_edges = await repo_graph.edges_in_polygon(
+            city_id=city_id,
+            polygon_wkt=polygon_wkt,
+            prop_id_name=prop_id_name,
+            prop_id_highway=prop_id_highway,
+            highway_types=road_types,
+            require_both_endpoints=True,
+            use_midpoint=False,
+        )
+        edges = list(map(edge_obj_to_list, res_edges))
+
+    oneway_ids = await repo_graph.oneway_ids(city_id=city_id)
+    return points, edges, oneway_ids
+
+
+async def graph_from_poly(
+    city_id,
+    polygon,
+    simplified: bool = False,
+    incremental: bool = False,
+    region_ids: Optional[Sequence[int]] = None,
+    regions=None,
+    reference_version: str = "",
+):
+    if not await _ensure_city_graph(city_id, regions, reference_version):
+        return None, None, None, None, None, None, None
+
+    repo_graph = GraphRepository()
+    region_ids = await _membership_region_ids(
+        repo_graph, city_id, region_ids, regions, reference_version
+    )
+    points, edges, oneway_ids = await _road_network(
+        repo_graph, city_id, polygon, simplified, region_ids
     )
-    edges = list(map(edge_obj_to_list, res_edges))
+    if points is None:
+        return None, None, None, None, None, None, None
 
     # Collect property identifiers from selected entities
     ways_prop_ids = {e[1] for e in edges}
@@ -132,15 +320,28 @@ async def graph_from_poly(city_id, polygon):
     res = repo_graph.point_props_via_temp(points_prop_ids)
     points_prop = list(map(record_obj_to_pprop, res))
 
-    oneway_ids = await repo_graph.oneway_ids(city_id=city_id)
-    metrics = await calc_metrics(points, edges, oneway_ids)
+    if incremental:
+        metrics = await calc_metrics_incremental(
+            (city_id, simplified), points, edges, oneway_ids
+        )
+    else:
+        metrics = await calc_metrics(points, edges, oneway_ids)
 
-    access_nodes_raw = await repo_graph.access_nodes_in_polygon(
-        city_id=city_id, polygon_wkt=polygon_wkt
-    )
-    access_edges_raw = await repo_graph.access_edges_in_polygon(
-        city_id=city_id, polygon_wkt=polygon_wkt
-    )
+    if region_ids:
+        access_nodes_raw = await repo_graph.access_nodes_in_regions(
+            city_id=city_id, region_ids=region_ids
+        )
+        access_edges_raw = await repo_graph.access_edges_in_regions(
+            city_id=city_id, region_ids=region_ids
+        )
+    else:
+        polygon_wkt = geometry_wkt(polygon)
+        access_nodes_raw = await repo_graph.access_nodes_in_polygon(
+            city_id=city_id, polygon_wkt=polygon_wkt
+        )
+        access_edges_raw = await repo_graph.access_edges_in_polygon(
+            city_id=city_id, polygon_wkt=polygon_wkt
+        )
     access_nodes = list(map(access_node_obj_to_list, access_nodes_raw))
     access_edges = list(map(access_edge_obj_to_list, access_edges_raw))
 
@@ -159,13 +360,19 @@ async def calc_metrics(points, edges, oneway_ids):
     # Empty graph means no metrics to compute
     if not points:
         return []
+    # networkx centralities take seconds on a whole city; keep the loop free
+    return await asyncio.to_thread(_networkx_metrics, points, edges, oneway_ids)
+
 
+def _networkx_metrics(points, edges, oneway_ids):
     points_list = [point[0] for point in points]
     edges_list = [(edge[2], edge[3]) for edge in edges]
     reversed_edges_list = [
         (edge[3], edge[2]) for edge in edges if edge[1] not in oneway_ids
     ]
 
+    import networkx as nx
+
     G = nx.DiGraph()
     G.add_nodes_from(points_list)
     G.add_edges_from(edges_list)
@@ -186,10 +393,49 @@ async def calc_metrics(points, edges, oneway_ids):
     except Exception:
         betweenness_dict = {n: 0.0 for n in G.nodes}
 
-    betweenness_values = betweenness_dict.values()
-    if betweenness_values:
-        max_betweenness = max(betweenness_values)
-        min_betweenness = min(betweenness_values)
+    node_ids = list(in_degree_dict)
+    return _metrics_rows(
+        node_ids,
+        [degree_dict[node_id] for node_id in node_ids],
+        [in_degree_dict[node_id] for node_id in node_ids],
+        [out_degree_dict[node_id] for node_id in node_ids],
+        [eigenvector_dict[node_id] for node_id in node_ids],
+        [betweenness_dict[node_id] for node_id in node_ids],
+    )
+
+
+async def calc_metrics_incremental(state_key, points, edges, oneway_ids):
+    """Same metrics as ``calc_metrics`` but reusing state from the previous call.
+
+    Intended for repeated polygon edits: the engine keeps the last graph per
+    ``state_key`` and only recomputes what the added/removed nodes and edges can
+    affect, falling back to a full computation past its change threshold.
+    Like ``calc_metrics`` it runs on a worker thread.
+    """
+    if not points:
+        return []
+
+    return await asyncio.to_thread(
+        _incremental_metrics, state_key, points, edges, oneway_ids
+    )
+
+
+def _incremental_metrics(state_key, points, edges, oneway_ids):
+    arrays = incremental_engine.compute(state_key, points, edges, oneway_ids)
+    return _metrics_rows(
+        arrays.graph.node_ids.tolist(),
+        arrays.degree.tolist(),
+        arrays.in_degree.tolist(),
+        arrays.out_degree.tolist(),
+        arrays.eigenvector.tolist(),
+        arrays.betweenness.tolist(),
+    )
+
+
+def _metrics_rows(node_ids, degree, in_degree, out_degree, eigenvector, betweenness):
+    if betweenness:
+        max_betweenness = max(betweenness)
+        min_betweenness = min(betweenness)
     else:
         max_betweenness = 0.0
         min_betweenness = 0.0
@@ -197,8 +443,8 @@ async def calc_metrics(points, edges, oneway_ids):
     adjusted_max_betweenness = 1 if max_betweenness == 0 else max_betweenness
 
     metrics_list = []
-    for node_id in in_degree_dict:
-        node_betweenness = betweenness_dict[node_id]
+    for i, node_id in enumerate(node_ids):
+        node_betweenness = betweenness[i]
         normalized_betweenness = node_betweenness / adjusted_max_betweenness
         radius = get_radius_based_on_metric(normalized_betweenness)
         color = get_color_from_blue_to_red(
@@ -208,10 +454,10 @@ async def calc_metrics(points, edges, oneway_ids):
         metrics_list.append(
             [
                 node_id,
-                degree_dict[node_id],
-                in_degree_dict[node_id],
-                out_degree_dict[node_id],
-                eigenvector_dict[node_id],
+                degree[i],
+                in_degree[i],
+                out_degree[i],
+                eigenvector[i],
                 node_betweenness,
                 radius,
                 color,
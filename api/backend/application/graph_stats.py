@@ -0,0 +1,129 @@
+"""Global graph statistics (small-world summary) computed on CSR graphs.
+
+The numbers follow ``analytics/centrality.ipynb``: average shortest path over
+reachable ordered pairs, mean of the directed local clustering, mean out
+degree and the Erdős–Rényi baselines ``ln n / ln k`` and ``k / n``. Shortest
+paths come from BFS over a sample of sources instead of an all-pairs matrix,
+and triangles are counted with sparse matrix products.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+
+from application.csr_graph import CsrGraph
+from shared import events
+from shared.lru import LruCache
+
+DEFAULT_PATH_SAMPLE_SIZE = 256
+# Sources per ``shortest_path`` call; each call holds a batch x n distance matrix
+PATH_BATCH_SIZE = 16
+
+csr_graph_cache: "LruCache[CsrGraph]" = LruCache(32)
+
+
+@events.on_city_changed
+def _drop_city_csr_graphs(city_id: int, version: int) -> None:
+    csr_graph_cache.discard_where(lambda key: key[0] == city_id)
+
+
+@dataclass
+class SmallWorldStats:
+    n: int
+    mean_degree: float
+    avg_shortest_path: Optional[float]
+    clustering: float
+    l_random: Optional[float]
+    c_random: Optional[float]
+    sampled_sources: int
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def average_shortest_path(
+    graph: CsrGraph, sample_size: int = DEFAULT_PATH_SAMPLE_SIZE, seed=None
+) -> tuple[Optional[float], int]:
+    """Mean hop distance over reachable ``(source, target)`` pairs.
+
+    Uses every vertex as a source when ``sample_size >= n`` (exact result),
+    otherwise a uniform sample. Returns ``(value, sources_used)``. Sources
+    are searched ``PATH_BATCH_SIZE`` at a time so memory stays linear in ``n``.
+    """
+    from scipy.sparse.csgraph import shortest_path
+
+    n = graph.n
+    if n < 2:
+        return None, 0
+    if sample_size >= n:
+        sources = np.arange(n)
+    else:
+        sources = np.asarray(random.Random(seed).sample(range(n), sample_size))
+
+    adjacency = graph.to_scipy()
+    total = 0.0
+    pairs = -len(sources)
+    for start in range(0, len(sources), PATH_BATCH_SIZE):
+        dist = shortest_path(
+            adjacency,
+            method="D",
+            directed=True,
+            unweighted=True,
+            indices=sources[start : start + PATH_BATCH_SIZE],
+        )
+        reachable = np.isfinite(dist)
+        total += float(dist[reachable].sum())
+        pairs += int(reachable.sum())
+    if pairs <= 0:
+        return None, len(sources)
+    return total / pairs, len(sources)
+
+
+def local_clustering(graph: CsrGraph) -> np.ndarray:
+    """Directed local clustering over out-neighbourhoods, like graph-tool's.
+
+    ``c_i`` is the number of arcs between out-neighbours of ``i`` divided by
+    ``k_i (k_i - 1)``; vertices with fewer than two neighbours get 0.
+    """
+    adjacency = graph.to_scipy()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    adjacency.data[:] = 1.0
+    closed = np.asarray((adjacency @ adjacency).multiply(adjacency).sum(axis=1))
+    closed = closed.ravel()
+    k = np.diff(adjacency.indptr).astype(np.float64)
+    possible = k * (k - 1)
+    result = np.zeros(graph.n)
+    mask = possible > 0
+    result[mask] = closed[mask] / possible[mask]
+    return result
+
+
+def small_world_stats(
+    graph: CsrGraph, sample_size: int = DEFAULT_PATH_SAMPLE_SIZE, seed=None
+) -> SmallWorldStats:
+    n = graph.n
+    if n == 0:
+        return SmallWorldStats(0, 0.0, None, 0.0, None, None, 0)
+
+    mean_degree = float(graph.out_degree().sum()) / n
+    avg_path, used = average_shortest_path(graph, sample_size, seed)
+    clustering = float(local_clustering(graph).sum()) / n
+
+    l_random = None
+    if mean_degree > 1 and n > 1:
+        l_random = math.log(n) / math.log(mean_degree)
+    return SmallWorldStats(
+        n=n,
+        mean_degree=mean_degree,
+        avg_shortest_path=avg_path,
+        clustering=clustering,
+        l_random=l_random,
+        c_random=mean_degree / n,
+        sampled_sources=used,
+    )
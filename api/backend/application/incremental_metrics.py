@@ -0,0 +1,325 @@
+"""Incremental centrality metrics for repeated, slightly edited polygon requests.
+
+The engine keeps, per state key (city and topology), the CSR graph of the last
+request together with the per-source Brandes dependencies used for sampled
+betweenness and the converged eigenvector. On the next request only sources
+whose shortest-path trees can see a changed vertex are recomputed, and the
+eigenvector power iteration is warm-started from the previous solution.
+
+The states live in the memory of one worker process. Under gunicorn with
+several workers, consecutive requests of one client usually reach different
+workers, so most of them find no state and compute from scratch; the results
+are the same either way, only the speed-up is lost. Run a single worker (or
+route a client's requests to the same worker) where the speed-up matters.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from application.csr_graph import CsrGraph, build_csr
+from shared import events
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_SIZE = 100
+DEFAULT_CHANGE_THRESHOLD = 0.25
+DEFAULT_MAX_STATES = 8
+EIGENVECTOR_MAX_ITER = 1000
+EIGENVECTOR_TOL = 1.0e-6
+
+
+@dataclass
+class MetricArrays:
+    """Raw per-vertex metrics aligned with ``graph.node_ids``."""
+
+    graph: CsrGraph
+    degree: np.ndarray
+    in_degree: np.ndarray
+    out_degree: np.ndarray
+    eigenvector: np.ndarray
+    betweenness: np.ndarray
+
+
+@dataclass
+class _SourceResult:
+    dependency: np.ndarray
+    reached: np.ndarray
+
+
+@dataclass
+class _MetricsState:
+    graph: CsrGraph
+    arcs: Set[Tuple[int, int]]
+    sources: List[int]
+    results: Dict[int, _SourceResult]
+    eigenvector: Optional[np.ndarray]
+
+
+@dataclass
+class RunStats:
+    mode: str
+    recomputed_sources: int
+    reused_sources: int
+    change_ratio: float
+
+
+def _single_source_dependency(
+    indptr: List[int], indices: List[int], source: int, n: int
+) -> _SourceResult:
+    """Brandes accumulation for one BFS source (unweighted, directed)."""
+    sigma = [0] * n
+    dist = [-1] * n
+    preds: List[List[int]] = [[] for _ in range(n)]
+    sigma[source] = 1
+    dist[source] = 0
+    order: List[int] = []
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        order.append(v)
+        next_dist = dist[v] + 1
+        sigma_v = sigma[v]
+        for w in indices[indptr[v] : indptr[v + 1]]:
+            if dist[w] < 0:
+                dist[w] = next_dist
+                queue.append(w)
+            if dist[w] == next_dist:
+                sigma[w] += sigma_v
+                preds[w].append(v)
+
+    delta = [0.0] * n
+    for w in reversed(order):
+        coeff = (1.0 + delta[w]) / sigma[w]
+        for v in preds[w]:
+            delta[v] += sigma[v] * coeff
+    delta[source] = 0.0
+
+    reached = np.zeros(n, dtype=bool)
+    reached[order] = True
+    return _SourceResult(dependency=np.asarray(delta), reached=reached)
+
+
+def _power_iteration(graph: CsrGraph, start: np.ndarray) -> np.ndarray:
+    """Eigenvector centrality with the same (A + I) iteration as networkx."""
+    n = graph.n
+    tails = graph.sources()
+    x = start
+    for _ in range(EIGENVECTOR_MAX_ITER):
+        xlast = x
+        x = xlast + np.bincount(graph.indices, weights=xlast[tails], minlength=n)
+        norm = float(np.sqrt(np.dot(x, x))) or 1.0
+        x = x / norm
+        if float(np.abs(x - xlast).sum()) < n * EIGENVECTOR_TOL:
+            return x
+    raise RuntimeError("eigenvector power iteration did not converge")
+
+
+class IncrementalMetricsEngine:
+    """Compute degree, eigenvector and sampled betweenness reusing prior state.
+
+    The engine is shared by requests running in worker threads; one lock
+    serializes ``compute`` and ``reset`` so a state is never read while
+    another call replaces it.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        change_threshold: float = DEFAULT_CHANGE_THRESHOLD,
+        max_states: int = DEFAULT_MAX_STATES,
+    ) -> None:
+        self.sample_size = sample_size
+        self.change_threshold = change_threshold
+        self.max_states = max_states
+        self._states: "OrderedDict[Hashable, _MetricsState]" = OrderedDict()
+        self.last_run: Optional[RunStats] = None
+        self._lock = threading.Lock()
+
+    def reset(self, key: Optional[Hashable] = None) -> None:
+        """Drop the stored state for ``key`` (or for every key)."""
+        with self._lock:
+            if key is None:
+                self._states.clear()
+            else:
+                self._states.pop(key, None)
+
+    def compute(self, key: Hashable, points, edges, oneway_ids) -> MetricArrays:
+        with self._lock:
+            return self._compute(key, points, edges, oneway_ids)
+
+    def _compute(self, key: Hashable, points, edges, oneway_ids) -> MetricArrays:
+        graph = build_csr(points, edges, oneway_ids)
+        arcs = graph.arc_set()
+        previous = self._states.get(key)
+
+        change_ratio = 1.0
+        changed: Set[int] = set()
+        if previous is not None:
+            changed, change_ratio = self._diff(previous, graph, arcs)
+
+        if previous is None or change_ratio > self.change_threshold:
+            state = self._full_state(graph, arcs)
+            reused = 0
+            mode = "full"
+        else:
+            state, reused = self._incremental_state(previous, graph, arcs, changed)
+            mode = "incremental"
+        self.last_run = RunStats(
+            mode=mode,
+            recomputed_sources=len(state.sources) - reused,
+            reused_sources=reused,
+            change_ratio=change_ratio,
+        )
+
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_states:
+            self._states.popitem(last=False)
+
+        logger.debug("Metrics for %s computed: %s", key, self.last_run)
+        return self._arrays(state)
+
+    @staticmethod
+    def _diff(
+        previous: _MetricsState, graph: CsrGraph, arcs: Set[Tuple[int, int]]
+    ) -> Tuple[Set[int], float]:
+        old_nodes = previous.graph.index.keys()
+        new_nodes = graph.index.keys()
+        added_nodes = new_nodes - old_nodes
+        removed_nodes = old_nodes - new_nodes
+        changed_arcs = arcs ^ previous.arcs
+
+        changed: Set[int] = set(added_nodes) | set(removed_nodes)
+        for u, v in changed_arcs:
+            changed.add(u)
+            changed.add(v)
+
+        old_size = previous.graph.n + len(previous.arcs)
+        ratio = (len(added_nodes) + len(removed_nodes) + len(changed_arcs)) / max(
+            1, old_size
+        )
+        return changed, ratio
+
+    def _sample_count(self, graph: CsrGraph) -> int:
+        return min(self.sample_size, max(1, graph.n))
+
+    def _full_state(self, graph: CsrGraph, arcs: Set[Tuple[int, int]]) -> _MetricsState:
+        node_ids = graph.node_ids.tolist()
+        sources = random.sample(node_ids, self._sample_count(graph)) if node_ids else []
+        indptr = graph.indptr.tolist()
+        indices = graph.indices.tolist()
+        results = {
+            source: _single_source_dependency(
+                indptr, indices, graph.index[source], graph.n
+            )
+            for source in sources
+        }
+        eigenvector = None
+        if graph.n:
+            eigenvector = self._eigenvector(graph, np.full(graph.n, 1.0 / graph.n))
+        return _MetricsState(graph, arcs, sources, results, eigenvector)
+
+    def _incremental_state(
+        self,
+        previous: _MetricsState,
+        graph: CsrGraph,
+        arcs: Set[Tuple[int, int]],
+        changed: Set[int],
+    ) -> Tuple[_MetricsState, int]:
+        old_graph = previous.graph
+        old_pos = np.fromiter(
+            (old_graph.index.get(node_id, -1) for node_id in graph.node_ids.tolist()),
+            dtype=np.int64,
+            count=graph.n,
+        )
+        kept = old_pos >= 0
+        changed_old = np.fromiter(
+            (old_graph.index[c] for c in changed if c in old_graph.index),
+            dtype=np.int64,
+        )
+
+        k = self._sample_count(graph)
+        sources = [s for s in previous.sources if s in graph.index][:k]
+        if len(sources) < k:
+            chosen = set(sources)
+            candidates = [n for n in graph.node_ids.tolist() if n not in chosen]
+            sources.extend(random.sample(candidates, k - len(sources)))
+
+        indptr = graph.indptr.tolist()
+        indices = graph.indices.tolist()
+        results: Dict[int, _SourceResult] = {}
+        reused = 0
+        for source in sources:
+            old = previous.results.get(source)
+            if old is not None and not old.reached[changed_old].any():
+                dependency = np.zeros(graph.n)
+                dependency[kept] = old.dependency[old_pos[kept]]
+                reached = np.zeros(graph.n, dtype=bool)
+                reached[kept] = old.reached[old_pos[kept]]
+                results[source] = _SourceResult(dependency, reached)
+                reused += 1
+            else:
+                results[source] = _single_source_dependency(
+                    indptr, indices, graph.index[source], graph.n
+                )
+
+        eigenvector = None
+        if graph.n:
+            start = np.full(graph.n, 1.0 / graph.n)
+            if previous.eigenvector is not None and kept.any():
+                start[kept] = previous.eigenvector[old_pos[kept]]
+                start[~kept] = previous.eigenvector.mean()
+                start = start / (float(np.sqrt(np.dot(start, start))) or 1.0)
+            eigenvector = self._eigenvector(graph, start)
+
+        return _MetricsState(graph, arcs, sources, results, eigenvector), reused
+
+    @staticmethod
+    def _eigenvector(graph: CsrGraph, start: np.ndarray) -> Optional[np.ndarray]:
+        try:
+            return _power_iteration(graph, start)
+        except RuntimeError:
+            return None
+
+    @staticmethod
+    def _arrays(state: _MetricsState) -> MetricArrays:
+        graph = state.graph
+        n = graph.n
+        out_deg = graph.out_degree()
+        in_deg = graph.in_degree()
+
+        betweenness = np.zeros(n)
+        for result in state.results.values():
+            betweenness += result.dependency
+        if n > 2 and state.sources:
+            betweenness *= n / (len(state.sources) * (n - 1) * (n - 2))
+
+        eigenvector = (
+            state.eigenvector if state.eigenvector is not None else np.zeros(n)
+        )
+        return MetricArrays(
+            graph=graph,
+            degree=out_deg + in_deg,
+            in_degree=in_deg / (n - 1) if n > 1 else np.ones(n),
+            out_degree=out_deg / (n - 1) if n > 1 else np.ones(n),
+            eigenvector=eigenvector,
+            betweenness=betweenness,
+        )
+
+
+incremental_engine = IncrementalMetricsEngine()
+
+
+@events.on_city_changed
+def _drop_city_metric_states(city_id: int, version: int) -> None:
+    for simplified in (False, True):
+        incremental_engine.reset((city_id, simplified))
@@ -7,6 +7,7 @@ from pandas.core.frame import DataFrame
 from application.ingestion.service import IngestionService, REQUIRED_ROAD_TYPES
 from infrastructure.models import City, CityProperty, Point
 from infrastructure.database import SessionLocal
+from infrastructure.region_membership import region_geometries
 
 
 AUTH_FILE_PATH = "./data/db.properties"
@@ -30,6 +31,33 @@ def add_graph_to_db(city_id: int, file_path: str, city_name: str) -> None:
     )
 
 
+def add_simplified_graph_to_db(city_id: int) -> None:
+    """Build the contracted (intersection-only) topology for an imported city."""
+    ingestion = IngestionService(auth_file_path=AUTH_FILE_PATH)
+    ingestion.repo.populate_simplified_graph(city_id=city_id)
+
+
+def add_region_membership_to_db(
+    city_id: int,
+    regions: DataFrame,
+    only_missing: bool = False,
+    reference_version: str = "",
+) -> bool:
+    """Assign the city's points and access nodes to the regions containing them.
+
+    ``reference_version`` is the version of the loaded ``regions.json``.
+    """
+    region_ids, geometries = region_geometries(regions)
+    ingestion = IngestionService(auth_file_path=AUTH_FILE_PATH)
+    return ingestion.repo.populate_region_membership(
+        city_id=city_id,
+        region_ids=region_ids,
+        geometries=geometries,
+        only_missing=only_missing,
+        reference_version=reference_version,
+    )
+
+
 def add_point_to_db(df: DataFrame) -> int:
     """Persist a point of interest and return its identifier."""
     with SessionLocal.begin() as session:
@@ -0,0 +1,116 @@
+"""Lookup tables over the regions GeoDataFrame, built once per frame.
+
+``parents`` holds the ancestor osm ids of each region as text (``"[101]"``,
+``"101,404"``). Parsing it once into ``(parent_id, admin_level) -> rows``
+turns the per-request hierarchy walk into dictionary lookups and matches
+whole ids only, so ``101`` no longer matches ``1010``.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import weakref
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pandas import DataFrame
+
+from shared.lru import LruCache
+
+_ID_PATTERN = re.compile(r"-?\d+")
+
+# Payloads per city: a few detail levels each for the most requested cities
+MEMO_ENTRIES = 256
+
+
+def parse_parents(parents) -> List[int]:
+    if parents is None or (isinstance(parents, float) and parents != parents):
+        return []
+    if isinstance(parents, (list, tuple)):
+        return [int(parent) for parent in parents]
+    return [int(token) for token in _ID_PATTERN.findall(str(parents))]
+
+
+class RegionIndex:
+    """Row positions of a regions frame keyed by id, name and (parent, level).
+
+    ``memo`` holds results derived from the same frame (serialized region
+    payloads), so they live and die with it. It keeps the ``MEMO_ENTRIES``
+    most recently used ones.
+    """
+
+    def __init__(self, regions: DataFrame) -> None:
+        self.memo: "LruCache[Any]" = LruCache(MEMO_ENTRIES)
+        self.positions: Dict[int, List[int]] = defaultdict(list)
+        self.by_name: Dict[str, List[Tuple[float, int]]] = defaultdict(list)
+        self.children: Dict[Tuple[int, float], List[int]] = defaultdict(list)
+
+        osm_ids = regions["osm_id"].tolist()
+        self.osm_ids = osm_ids
+        levels = regions["admin_level"].tolist()
+        names = regions["local_name"].tolist()
+        parents = regions["parents"].tolist()
+        for position, (osm_id, level, name, parent_ids) in enumerate(
+            zip(osm_ids, levels, names, parents)
+        ):
+            self.positions[int(osm_id)].append(position)
+            self.by_name[name].append((level, position))
+            for parent_id in dict.fromkeys(parse_parents(parent_ids)):
+                self.children[(parent_id, level)].append(position)
+
+        self.positions = dict(self.positions)
+        self.by_name = dict(self.by_name)
+        self.children = dict(self.children)
+
+    def rows(self, ids: Iterable[int]) -> List[int]:
+        """Positions of the regions with the given ids, in frame order."""
+        found = set()
+        for osm_id in ids:
+            found.update(self.positions.get(int(osm_id), ()))
+        return sorted(found)
+
+    def child_rows(self, ids: Iterable[int], admin_level) -> List[int]:
+        """Positions of regions at ``admin_level`` listing any of ``ids`` as parent."""
+        found = set()
+        for osm_id in ids:
+            found.update(self.children.get((int(osm_id), admin_level), ()))
+        return sorted(found)
+
+    def child_ids(self, ids: Iterable[int], admin_level) -> List[int]:
+        return [self.osm_ids[pos] for pos in self.child_rows(ids, admin_level)]
+
+    def top_level_id(self, name: str) -> Optional[int]:
+        """Id of the region called ``name`` with the lowest admin level."""
+        candidates = self.by_name.get(name)
+        if not candidates:
+            return None
+        _, position = min(candidates, key=lambda item: item[0])
+        return self.osm_ids[position]
+
+
+_indexes: Dict[int, Tuple["weakref.ref[DataFrame]", RegionIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def _forget(key: int) -> None:
+    with _indexes_lock:
+        _indexes.pop(key, None)
+
+
+def region_index(regions: DataFrame) -> RegionIndex:
+    """Index of ``regions``, built on first use and kept while the frame lives.
+
+    The frame is treated as read-only once indexed, as the one loaded at
+    startup is.
+    """
+    key = id(regions)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0]() is regions:
+            return cached[1]
+    index = RegionIndex(regions)
+    with _indexes_lock:
+        _indexes[key] = (weakref.ref(regions), index)
+    weakref.finalize(regions, _forget, key)
+    return index
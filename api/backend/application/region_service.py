@@ -2,18 +2,39 @@
 
 from __future__ import annotations
 
-import ast
-from typing import List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import math
+import weakref
+from functools import cached_property
+from typing import List, Optional, Tuple, TYPE_CHECKING
 
-from geopandas.geodataframe import GeoDataFrame
 from pandas.core.frame import DataFrame
+import shapely
 from shapely.geometry.linestring import LineString
 from shapely.geometry.multilinestring import MultiLineString
 from shapely.geometry.polygon import Polygon
 from shapely.ops import unary_union
 
+from application.city_catalog import city_catalog
+from application.region_index import region_index
 from domain.schemas import RegionBase, RegionInfoBase
-from infrastructure.repositories.cities import CityRepository
+from infrastructure.graph_cache import CacheEntry
+from shared import compression
+from shared.lru import LruCache
+
+if TYPE_CHECKING:
+    from geopandas import GeoDataFrame
+
+# ~0.1 m at city latitudes; coordinates closer than this map to the same key
+POLYGON_KEY_GRID = 1e-6
+# Web map tiles are 256 px wide and cover 360 degrees at zoom 0
+TILE_SIZE = 256
+# One pixel at zoom 24 (~6 mm); finer tolerances return the full boundaries
+MIN_TOLERANCE = 2.0**-24
+# One pixel at zoom 0; coarser ones would erase whole districts
+MAX_TOLERANCE = 1.0
 
 
 def to_list(polygon: LineString) -> List[List[float]]:
@@ -36,15 +57,58 @@ def to_json_array(polygon) -> List[List[List[float]]]:
     return coordinates_list
 
 
+def simplification_tolerance(
+    tolerance: Optional[float] = None, zoom: Optional[int] = None
+) -> Optional[float]:
+    """Tolerance in degrees for a request, snapped to a power of two.
+
+    ``zoom`` maps to the width of one map pixel at that zoom level. Snapping
+    and clamping to ``MAX_TOLERANCE`` keep the number of distinct cached
+    simplifications small; below ``MIN_TOLERANCE`` nothing is simplified.
+    """
+    if zoom is not None:
+        tolerance = 360.0 / (TILE_SIZE * 2**zoom)
+    if tolerance is None or not tolerance >= MIN_TOLERANCE:
+        return None
+    return min(MAX_TOLERANCE, 2.0 ** math.floor(math.log2(tolerance)))
+
+
+def simplify_level(geometries, tolerance: Optional[float]):
+    """Simplify the polygons of one admin level without opening gaps.
+
+    Districts of a level tile their parent, so they are simplified together
+    as a coverage (Visvalingam–Whyatt on shared edges). Overlapping inputs
+    fall back to per-polygon topology-preserving Douglas–Peucker.
+    """
+    geometries = list(geometries)
+    if not tolerance or not geometries:
+        return geometries
+    try:
+        if shapely.coverage_is_valid(geometries):
+            simplified = shapely.coverage_simplify(geometries, tolerance)
+        else:
+            simplified = shapely.simplify(geometries, tolerance, preserve_topology=True)
+    except (AttributeError, shapely.errors.GEOSException):
+        simplified = shapely.simplify(geometries, tolerance, preserve_topology=True)
+    return [
+        original if simple is None or simple.is_empty else simple
+        for original, simple in zip(geometries, simplified)
+    ]
+
+
 def region_to_schemas(
-    regions: GeoDataFrame, ids_list: List[int], admin_level: int
+    regions: GeoDataFrame,
+    ids_list: List[int],
+    admin_level: int,
+    tolerance: Optional[float] = None,
 ) -> List[RegionBase]:
     regions_list = []
-    polygons = regions[regions["osm_id"].isin(ids_list)]
-    for _, row in polygons.iterrows():
+    polygons = regions.iloc[region_index(regions).rows(ids_list)]
+    geometries = simplify_level(polygons["geometry"], tolerance)
+    for (_, row), geometry in zip(polygons.iterrows(), geometries):
         id = row["osm_id"]
         name = row["local_name"]
-        regions_array = to_json_array(row["geometry"].boundary)
+        regions_array = to_json_array(geometry.boundary)
         base = RegionBase(
             id=id, name=name, admin_level=admin_level, regions=regions_array
         )
@@ -57,7 +121,7 @@ def region_to_info_schemas(
     regions: GeoDataFrame, ids_list: List[int], admin_level: int
 ) -> List[RegionInfoBase]:
     regions_list: List[RegionInfoBase] = []
-    polygons = regions[regions["osm_id"].isin(ids_list)]
+    polygons = regions.iloc[region_index(regions).rows(ids_list)]
     for _, row in polygons.iterrows():
         base = RegionInfoBase(
             id=int(row["osm_id"]),
@@ -69,29 +133,32 @@ def region_to_info_schemas(
 
 
 def children(ids_list: List[int], admin_level: int, regions: GeoDataFrame):
-    area = regions[
-        regions["parents"].str.contains("|".join(str(x) for x in ids_list), na=False)
-    ]
-    area = area[area["admin_level"] == admin_level]
-    lst = area["osm_id"].to_list()
+    lst = region_index(regions).child_ids(ids_list, admin_level)
     if len(lst) == 0:
         return ids_list, False
     return lst, True
 
 
 def get_admin_levels(
-    city_name: str, regions: GeoDataFrame, cities: DataFrame
+    city_name: str,
+    regions: GeoDataFrame,
+    cities: DataFrame,
+    tolerance: Optional[float] = None,
 ) -> List[RegionBase]:
     regions_list = []
 
-    levels_str = cities[cities["Город"] == city_name]["admin_levels"].values[0]
-    levels = ast.literal_eval(levels_str)
+    levels = city_catalog.admin_levels(city_name, cities)
 
-    info = regions[regions["local_name"] == city_name].sort_values(by="admin_level")
-    ids_list = [info["osm_id"].to_list()[0]]
+    city_region_id = region_index(regions).top_level_id(city_name)
+    if city_region_id is None:
+        raise IndexError(f"no region named {city_name!r}")
+    ids_list = [city_region_id]
 
     schemas = region_to_schemas(
-        regions=regions, ids_list=ids_list, admin_level=levels[0]
+        regions=regions,
+        ids_list=ids_list,
+        admin_level=levels[0],
+        tolerance=tolerance,
     )
     regions_list.extend(schemas)
     for level in levels:
@@ -100,7 +167,10 @@ def get_admin_levels(
         )
         if data_valid:
             schemas = region_to_schemas(
-                regions=regions, ids_list=ids_list, admin_level=level
+                regions=regions,
+                ids_list=ids_list,
+                admin_level=level,
+                tolerance=tolerance,
             )
             regions_list.extend(schemas)
 
@@ -112,11 +182,12 @@ def get_admin_levels_info(
 ) -> List[RegionInfoBase]:
     regions_list: List[RegionInfoBase] = []
 
-    levels_str = cities[cities["Город"] == city_name]["admin_levels"].values[0]
-    levels = ast.literal_eval(levels_str)
+    levels = city_catalog.admin_levels(city_name, cities)
 
-    info = regions[regions["local_name"] == city_name].sort_values(by="admin_level")
-    ids_list = [info["osm_id"].to_list()[0]]
+    city_region_id = region_index(regions).top_level_id(city_name)
+    if city_region_id is None:
+        raise IndexError(f"no region named {city_name!r}")
+    ids_list = [city_region_id]
 
     schemas = region_to_info_schemas(
         regions=regions, ids_list=ids_list, admin_level=levels[0]
@@ -135,18 +206,104 @@ def get_admin_levels_info(
     return regions_list
 
 
+def _schema_data(schema) -> dict:
+    return schema.model_dump() if hasattr(schema, "model_dump") else schema.dict()
+
+
+def admin_levels_payload(
+    city_name: str,
+    regions: GeoDataFrame,
+    cities: DataFrame,
+    *,
+    geometry: bool = True,
+    tolerance: Optional[float] = None,
+) -> CacheEntry:
+    """Compressed JSON of ``get_admin_levels`` (or ``_info``), built once per city.
+
+    Memoized on the region index of ``regions`` per simplification
+    ``tolerance``, so boundaries are converted and serialized only on the
+    first request for a city and level of detail.
+    """
+    encoding = compression.cache_encoding()
+    memo = region_index(regions).memo
+    if geometry:
+        memo_key = ("regions", city_name, tolerance, encoding)
+    else:
+        memo_key = ("regions_info", city_name, encoding)
+    entry = memo.get(memo_key)
+    if entry is None:
+        if geometry:
+            schemas = get_admin_levels(
+                city_name=city_name,
+                regions=regions,
+                cities=cities,
+                tolerance=tolerance,
+            )
+        else:
+            schemas = get_admin_levels_info(
+                city_name=city_name, regions=regions, cities=cities
+            )
+        data = json.dumps(
+            [_schema_data(schema) for schema in schemas],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        entry = CacheEntry(compression.compress(data, encoding), encoding)
+        memo.put(memo_key, entry)
+    return entry
+
+
 def list_to_polygon(polygons: List[List[List[float]]]):
     return unary_union([Polygon(polygon) for polygon in polygons])
 
 
-def polygons_from_region(regions_ids: List[int], regions: GeoDataFrame):
+def polygon_key(polygon) -> str:
+    """Stable digest of a polygon, independent of ring orientation and start.
+
+    Coordinates are snapped to ``POLYGON_KEY_GRID`` first so requests that
+    differ only by float noise share a key.
+    """
+    canonical = shapely.normalize(shapely.set_precision(polygon, POLYGON_KEY_GRID))
+    return hashlib.sha1(shapely.to_wkb(canonical)).hexdigest()
+
+
+class RegionUnion:
+    """Union of a set of regions with its WKT, prepared for predicates."""
+
+    def __init__(self, geometry) -> None:
+        shapely.prepare(geometry)
+        self.geometry = geometry
+        self.wkt = geometry.wkt
+
+    @cached_property
+    def wkb(self) -> bytes:
+        return shapely.to_wkb(self.geometry)
+
+
+region_union_cache: "LruCache[RegionUnion]" = LruCache(64)
+# id(geometry) -> union, so callers holding only the geometry reuse its WKT
+_unions_by_geometry: "weakref.WeakValueDictionary[int, RegionUnion]" = (
+    weakref.WeakValueDictionary()
+)
+
+
+def region_union(
+    regions_ids: List[int], regions: GeoDataFrame
+) -> Optional[RegionUnion]:
+    """Memoized union of ``regions_ids``; ``None`` when nothing usable is selected."""
     if len(regions_ids) == 0:
         return None
-    polygons = regions[regions["osm_id"].isin(regions_ids)]
-    if polygons is None or len(polygons) == 0:
+    index = region_index(regions)
+    cache_key = (index, tuple(sorted(set(int(x) for x in regions_ids))))
+    union = region_union_cache.get(cache_key)
+    if union is not None:
+        return union
+
+    rows = index.rows(cache_key[1])
+    if len(rows) == 0:
         return None
     try:
-        union_geom = unary_union([geom for geom in polygons["geometry"].values])
+        union_geom = unary_union(list(regions["geometry"].iloc[rows].values))
     except Exception:
         return None
     try:
@@ -154,21 +311,36 @@ def polygons_from_region(regions_ids: List[int], regions: GeoDataFrame):
             return None
     except Exception:
         return None
-    return union_geom
+
+    union = RegionUnion(union_geom)
+    region_union_cache.put(cache_key, union)
+    _unions_by_geometry[id(union_geom)] = union
+    return union
+
+
+def polygons_from_region(regions_ids: List[int], regions: GeoDataFrame):
+    union = region_union(regions_ids, regions)
+    return union.geometry if union is not None else None
+
+
+def geometry_wkt(geometry) -> str:
+    """WKT of ``geometry``, reusing the precomputed text of region unions."""
+    union = _unions_by_geometry.get(id(geometry))
+    if union is not None and union.geometry is geometry:
+        return union.wkt
+    return geometry.wkt
+
+
+async def _city_name(city_id: int) -> Optional[str]:
+    city = await city_catalog.get(city_id)
+    return None if city is None else city.city_name
 
 
 async def get_regions(
     city_id: int, regions: GeoDataFrame, cities: DataFrame
 ) -> Optional[List[RegionBase]]:
     """Find the city and assemble polygons for every administrative level."""
-    repo = CityRepository()
-    city = await repo.by_id(city_id)
-    if city is None:
-        return None
-
-    city_name = (
-        city["city_name"] if "city_name" in city else getattr(city, "city_name", None)
-    )
+    city_name = await _city_name(city_id)
     if city_name is None:
         return None
 
@@ -179,15 +351,30 @@ async def get_regions_info(
     city_id: int, regions: GeoDataFrame, cities: DataFrame
 ) -> Optional[List[RegionInfoBase]]:
     """Return district metadata without geometry for the specified city."""
-    repo = CityRepository()
-    city = await repo.by_id(city_id)
-    if city is None:
+    city_name = await _city_name(city_id)
+    if city_name is None:
         return None
 
-    city_name = (
-        city["city_name"] if "city_name" in city else getattr(city, "city_name", None)
-    )
+    return get_admin_levels_info(city_name=city_name, regions=regions, cities=cities)
+
+
+async def get_regions_payload(
+    city_id: int,
+    regions: GeoDataFrame,
+    cities: DataFrame,
+    geometry: bool = True,
+    tolerance: Optional[float] = None,
+) -> Optional[CacheEntry]:
+    """Memoized ``get_regions``/``get_regions_info`` response as encoded JSON."""
+    city_name = await _city_name(city_id)
     if city_name is None:
         return None
 
-    return get_admin_levels_info(city_name=city_name, regions=regions, cities=cities)
+    return await asyncio.to_thread(
+        admin_levels_payload,
+        city_name,
+        regions,
+        cities,
+        geometry=geometry,
+        tolerance=tolerance,
+    )
@@ -1,30 +1,55 @@
 """Facade that gathers application services and re-exports them for the API layer."""
 
-import logging
-from typing import List, TYPE_CHECKING
+from __future__ import annotations
 
-from geopandas.geodataframe import GeoDataFrame
+import asyncio
+import logging
+from typing import List, Optional, TYPE_CHECKING
 
-from application.converters import graph_to_scheme, graph_to_zip_archive
+from application.columnar import (
+    ARROW_STREAM_MEDIA_TYPE,
+    COLUMNAR_AVAILABLE,
+    PARQUET_MEDIA_TYPE,
+    encode_tables,
+    graph_to_arrow_ipc,
+    graph_to_parquet_zip,
+    graph_to_tables,
+    rows_to_tables,
+)
+from application.city_catalog import city_catalog
+from application.converters import (
+    graph_to_scheme,
+    graph_to_zip_archive,
+    iter_graph_zip,
+    iter_rows_zip,
+)
 from application.city_service import get_city, get_cities
-from application.graph_service import graph_from_poly
+from application.dual_graph import build_dual_graph, dual_graph_cache
+from application.csr_graph import CsrGraph, build_csr
+from application.degree_distribution import DegreeDistribution, degree_distribution
+from application.graph_service import graph_from_poly, road_network_from_poly
+from application.graph_stats import (
+    DEFAULT_PATH_SAMPLE_SIZE,
+    SmallWorldStats,
+    csr_graph_cache,
+    small_world_stats,
+)
+from application.region_index import region_index
 from application.region_service import (
     list_to_polygon,
+    polygon_key,
     polygons_from_region,
     get_regions,
     get_regions_info,
+    get_regions_payload,
+    simplification_tolerance,
 )
-from application.ingestion.utils import (
-    AUTH_FILE_PATH,
-    add_city_to_db,
-    add_graph_to_db,
-    add_info_to_db,
-    add_point_to_db,
-    add_property_to_db,
-    init_db,
-)
-from domain.schemas import GraphBase
+from domain.schemas import DualGraphBase, GraphBase
 from infrastructure.database import SessionLocal
+from infrastructure.graph_cache import get_graph_cache
+
+if TYPE_CHECKING:
+    from geopandas import GeoDataFrame
 
 # Public API surface preserved for compatibility with the legacy imports
 __all__ = [
@@ -35,18 +60,59 @@ __all__ = [
     "add_point_to_db",
     "add_property_to_db",
     "get_db",
+    "city_catalog",
     "get_city",
     "get_cities",
     "get_regions",
     "get_regions_info",
+    "get_regions_payload",
+    "dual_graph_from_ids",
+    "graph_stats_from_ids",
+    "degree_distribution_from_ids",
     "graph_from_ids",
     "graph_to_scheme",
+    "graph_to_arrow_ipc",
+    "graph_to_parquet_zip",
+    "encode_tables",
+    "graph_to_tables",
+    "rows_to_tables",
+    "dual_graph_to_scheme",
     "graph_to_zip",
+    "iter_graph_zip",
+    "iter_rows_zip",
     "init_db",
     "list_to_polygon",
+    "polygon_key",
     "polygons_from_region",
+    "region_index",
+    "simplification_tolerance",
 ]
 
+# Ingestion helpers are re-exported lazily: importing them pulls in the import
+# pipeline, which the read-only request paths never need.
+_INGESTION_EXPORTS = frozenset(
+    {
+        "AUTH_FILE_PATH",
+        "add_city_to_db",
+        "add_graph_to_db",
+        "add_info_to_db",
+        "add_point_to_db",
+        "add_property_to_db",
+        "init_db",
+    }
+)
+
+
+def __getattr__(name: str):
+    if name in _INGESTION_EXPORTS:
+        from application.ingestion import utils
+
+        value = getattr(utils, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Configure the root SQLAlchemy logger so it stays quiet by default
 log = logging.getLogger("sqlalchemy.engine")
 log.setLevel(logging.WARNING)
@@ -59,9 +125,6 @@ if log.hasHandlers():
 log.addHandler(logging.NullHandler())
 
 
-if TYPE_CHECKING:
-    from sqlalchemy.orm import Session
-
 
 def get_db():
     """FastAPI dependency that yields a database session."""
@@ -72,16 +135,187 @@ def get_db():
         db.close()
 
 
-async def graph_from_ids(city_id: int, regions_ids: List[int], regions: GeoDataFrame):
-    """Resolve region polygons by id list and delegate graph building to core services."""
+async def graph_from_ids(
+    city_id: int,
+    regions_ids: List[int],
+    regions: GeoDataFrame,
+    simplified: bool = False,
+    reference_version: str = "",
+):
+    """Resolve region polygons by id list and delegate graph building to core services.
+
+    ``reference_version`` is the version of the loaded ``regions.json``; the
+    stored region membership is only used when it was built from it.
+    """
     polygon = polygons_from_region(regions_ids=regions_ids, regions=regions)
     if polygon is None:
         return None, None, None, None, None, None, None
 
-    gfp = await graph_from_poly(city_id=city_id, polygon=polygon)
+    gfp = await graph_from_poly(
+        city_id=city_id,
+        polygon=polygon,
+        simplified=simplified,
+        region_ids=regions_ids,
+        regions=regions,
+        reference_version=reference_version,
+    )
     return gfp
 
 
+def _city_version(city_id: int) -> int:
+    """Data version of the city, so in-memory results die with re-imports."""
+    return get_graph_cache().versions.get(city_id)
+
+
+async def dual_graph_from_ids(
+    city_id: int,
+    regions_ids: List[int],
+    regions: GeoDataFrame,
+    use_cache: bool = True,
+    reference_version: str = "",
+):
+    """Build (or reuse) the street-as-node dual graph of the selected regions.
+
+    Returns ``None`` when the regions or the city graph are unavailable.
+    """
+    cache_key = (
+        city_id,
+        _city_version(city_id),
+        reference_version,
+        tuple(sorted(set(regions_ids))),
+    )
+    if use_cache:
+        cached = dual_graph_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    polygon = polygons_from_region(regions_ids=regions_ids, regions=regions)
+    if polygon is None:
+        return None
+
+    points, edges, _ = await road_network_from_poly(
+        city_id=city_id,
+        polygon=polygon,
+        region_ids=regions_ids,
+        regions=regions,
+        reference_version=reference_version,
+    )
+    if points is None:
+        return None
+
+    dual = build_dual_graph(edges)
+    if use_cache:
+        dual_graph_cache.put(cache_key, dual)
+    return dual
+
+
+def dual_graph_to_scheme(dual) -> DualGraphBase:
+    """Serialize a dual graph into the CSV payload read by the notebooks."""
+    return DualGraphBase(
+        reversed_nodes_csv=dual.nodes_csv(),
+        reversed_edges_csv=dual.edges_csv(),
+    )
+
+
+async def csr_graph_from_ids(
+    city_id: int,
+    regions_ids: List[int],
+    regions: GeoDataFrame,
+    topology: str = "dual",
+    use_cache: bool = True,
+    reference_version: str = "",
+) -> Optional[CsrGraph]:
+    """Return the street (``dual``) or road (``primal``) graph as CSR arrays."""
+    region_key = tuple(sorted(set(regions_ids)))
+    cache_key = (
+        city_id,
+        _city_version(city_id),
+        reference_version,
+        region_key,
+        topology,
+    )
+    if use_cache:
+        cached = csr_graph_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    if topology == "dual":
+        dual = await dual_graph_from_ids(
+            city_id=city_id,
+            regions_ids=regions_ids,
+            regions=regions,
+            use_cache=use_cache,
+            reference_version=reference_version,
+        )
+        if dual is None:
+            return None
+        graph = dual.to_csr()
+    else:
+        polygon = polygons_from_region(regions_ids=regions_ids, regions=regions)
+        if polygon is None:
+            return None
+        points, edges, oneway_ids = await road_network_from_poly(
+            city_id=city_id,
+            polygon=polygon,
+            region_ids=regions_ids,
+            regions=regions,
+            reference_version=reference_version,
+        )
+        if points is None:
+            return None
+        graph = build_csr(points, edges, oneway_ids)
+
+    if use_cache:
+        csr_graph_cache.put(cache_key, graph)
+    return graph
+
+
+async def graph_stats_from_ids(
+    city_id: int,
+    regions_ids: List[int],
+    regions: GeoDataFrame,
+    topology: str = "dual",
+    sample_size: int = DEFAULT_PATH_SAMPLE_SIZE,
+    use_cache: bool = True,
+    reference_version: str = "",
+) -> Optional[SmallWorldStats]:
+    """Small-world summary of the selected regions (see ``graph_stats``)."""
+    graph = await csr_graph_from_ids(
+        city_id=city_id,
+        regions_ids=regions_ids,
+        regions=regions,
+        topology=topology,
+        use_cache=use_cache,
+        reference_version=reference_version,
+    )
+    if graph is None:
+        return None
+    return await asyncio.to_thread(small_world_stats, graph, sample_size=sample_size)
+
+
+async def degree_distribution_from_ids(
+    city_id: int,
+    regions_ids: List[int],
+    regions: GeoDataFrame,
+    topology: str = "dual",
+    xmin: Optional[int] = None,
+    use_cache: bool = True,
+    reference_version: str = "",
+) -> Optional[DegreeDistribution]:
+    """Degree histogram, CCDF and power-law fits of the selected regions."""
+    graph = await csr_graph_from_ids(
+        city_id=city_id,
+        regions_ids=regions_ids,
+        regions=regions,
+        topology=topology,
+        use_cache=use_cache,
+        reference_version=reference_version,
+    )
+    if graph is None:
+        return None
+    return await asyncio.to_thread(degree_distribution, graph, xmin=xmin)
+
+
 def graph_to_zip(graph_base: GraphBase):
     """Wrap the graph CSV payloads into a downloadable ZIP archive."""
     return graph_to_zip_archive(graph_base)
@@ -44,3 +44,38 @@ class GraphBase(BaseModel):
     metrics_csv: str
     access_nodes_csv: Optional[str] = None
     access_edges_csv: Optional[str] = None
+
+
+class DualGraphBase(BaseModel):
+    reversed_nodes_csv: str
+    reversed_edges_csv: str
+
+
+class SmallWorldStatsBase(BaseModel):
+    topology: str
+    n: int
+    mean_degree: float
+    avg_shortest_path: Optional[float] = None
+    clustering: float
+    l_random: Optional[float] = None
+    c_random: Optional[float] = None
+    sampled_sources: int
+
+
+class PowerLawBase(BaseModel):
+    alpha: Optional[float] = None
+    alpha_stderr: Optional[float] = None
+    xmin: int
+    n_tail: int
+
+
+class DegreeDistributionBase(BaseModel):
+    topology: str
+    n: int
+    degrees: List[int]
+    counts: List[int]
+    ccdf: List[float]
+    power_law: PowerLawBase
+    # np.polyfit coefficients of log P(X >= k) on log k, highest power first
+    loglog_linear: Optional[List[float]] = None
+    loglog_quadratic: Optional[List[float]] = None
@@ -0,0 +1,35 @@
+"""Production server: ``gunicorn -c gunicorn.conf.py main:app``.
+
+The master imports the app once (``preload_app``), loads the reference data
+and forks ``WEB_CONCURRENCY`` uvicorn workers that inherit it copy-on-write
+(pages a worker touches are still copied; see ``app.reference_data``).
+Each worker opens its own database pools, sized by ``pool_sizes``.
+"""
+
+import os
+
+os.environ.setdefault("WEB_CONCURRENCY", str(min(4, os.cpu_count() or 1)))
+os.environ.setdefault("PRELOAD_REFERENCE_DATA", "1")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8901')}"
+workers = int(os.environ["WEB_CONCURRENCY"])
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Region graphs of large cities can take minutes on a cold cache
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "600"))
+# Time a worker gets to finish in-flight requests and run the lifespan shutdown
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "60"))
+keepalive = 5
+
+
+def on_starting(server):
+    from infrastructure.database import engine, metadata
+
+    metadata.create_all(engine)
+
+
+def post_fork(server, worker):
+    # Connections opened by the master must not be shared with the workers
+    from infrastructure.database import engine
+
+    engine.dispose(close=False)
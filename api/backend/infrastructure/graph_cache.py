@@ -0,0 +1,392 @@
+"""Two-tier (memory + disk) cache for encoded graph payloads.
+
+Keys start with the city id and its data version, which ingestion bumps via
+``city_data_changed`` after every (re)import, so stale payloads stop matching
+immediately and are purged from both tiers. Each tier has a byte budget and
+evicts the least recently used entries; disk recency survives restarts
+through file modification times. Both tiers and their indexes belong to one
+worker process, so the disk budget is split between the ``WEB_CONCURRENCY``
+workers sharing the directory. Disk access from request handlers goes
+through ``get_async``/``persist`` on a worker thread so the event loop never
+waits on the filesystem.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from infrastructure.database import web_concurrency
+from shared import compression, events
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "./data/caches"
+DEFAULT_MEMORY_BYTES = 256 * 2**20
+DEFAULT_DISK_BYTES = 4 * 2**30
+VERSIONS_FILE = "versions.json"
+# How long a read of versions.json is trusted before its mtime is checked again
+VERSIONS_CHECK_SECONDS = 1.0
+# Entries at least this large are read through a memory map
+MMAP_THRESHOLD = 1 * 2**20
+
+
+def cache_dir() -> Path:
+    return Path(os.environ.get("GRAPH_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+
+def _env_bytes(name: str, default: int) -> int:
+    try:
+        return int(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, delete=False) as tmp:
+        tmp.write(data)
+        tmp.flush()
+        os.fsync(tmp.fileno())
+        tmp_name = tmp.name
+    os.replace(tmp_name, path)
+
+
+def _read_file(path: Path) -> bytes:
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return fh.read()
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:]
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    payload: bytes
+    encoding: str
+
+    @property
+    def size(self) -> int:
+        return len(self.payload)
+
+
+class CityDataVersions:
+    """Per-city data version counters persisted in a small JSON file.
+
+    The file is re-read when its mtime changes, so a bump made by another
+    worker or by a CLI import is picked up by every process. The mtime is
+    checked at most once per ``check_interval`` seconds, so such a bump may
+    take that long to reach this process; a bump made here is seen at once.
+    """
+
+    def __init__(
+        self, path: Path, check_interval: float = VERSIONS_CHECK_SECONDS
+    ) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._mtime_ns: Optional[int] = None
+        self._checked_at: Optional[float] = None
+
+    def _refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if (
+            not force
+            and self._checked_at is not None
+            and now - self._checked_at < self.check_interval
+        ):
+            return
+        self._checked_at = now
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._versions, self._mtime_ns = {}, None
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        try:
+            loaded = json.loads(self.path.read_text(encoding="utf-8"))
+            self._versions = {str(k): int(v) for k, v in loaded.items()}
+        except (OSError, ValueError, AttributeError):
+            logger.warning("Ignoring unreadable cache versions file %s", self.path)
+            self._versions = {}
+        self._mtime_ns = mtime_ns
+
+    def get(self, city_id: int) -> int:
+        with self._lock:
+            self._refresh()
+            return self._versions.get(str(city_id), 0)
+
+    def total(self) -> int:
+        """Sum of all versions; every bump of any city changes it."""
+        with self._lock:
+            self._refresh()
+            return sum(self._versions.values())
+
+    def snapshot(self) -> Dict[str, int]:
+        """Versions of every city that has been re-imported at least once."""
+        with self._lock:
+            self._refresh()
+            return dict(self._versions)
+
+    def bump(self, city_id: int) -> int:
+        with self._lock:
+            self._refresh(force=True)
+            version = self._versions.get(str(city_id), 0) + 1
+            self._versions[str(city_id)] = version
+            _atomic_write(
+                self.path, json.dumps(self._versions, sort_keys=True).encode("utf-8")
+            )
+            self._mtime_ns = self.path.stat().st_mtime_ns
+            return version
+
+
+class MemoryTier:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous.size
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+
+    def discard_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self.bytes -= self._entries.pop(key).size
+
+
+class DiskTier:
+    """Files named ``<key>.json<suffix>`` with an LRU index rebuilt from mtimes."""
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._index: Optional["OrderedDict[str, Tuple[str, int]]"] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _parse_name(name: str) -> Optional[Tuple[str, str]]:
+        for encoding, suffix in compression.FILE_SUFFIXES.items():
+            ending = f".json{suffix}"
+            if suffix and name.endswith(ending):
+                return name[: -len(ending)], encoding
+        if name.endswith(".json") and name != VERSIONS_FILE:
+            return name[: -len(".json")], compression.IDENTITY
+        return None
+
+    def _path(self, key: str, encoding: str) -> Path:
+        return self.directory / f"{key}.json{compression.FILE_SUFFIXES[encoding]}"
+
+    def _ensure_index(self) -> "OrderedDict[str, Tuple[str, int]]":
+        if self._index is None:
+            found = []
+            if self.directory.is_dir():
+                for path in self.directory.iterdir():
+                    parsed = self._parse_name(path.name)
+                    if parsed is None or not path.is_file():
+                        continue
+                    stat = path.stat()
+                    found.append((stat.st_mtime_ns, parsed[0], parsed[1], stat.st_size))
+            found.sort()
+            self._index = OrderedDict(
+                (key, (encoding, size)) for _, key, encoding, size in found
+            )
+            self.bytes = sum(size for _, size in self._index.values())
+        return self._index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._ensure_index())
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            meta = self._ensure_index().get(key)
+            if meta is None:
+                return None
+            self._index.move_to_end(key)
+        encoding = meta[0]
+        path = self._path(key, encoding)
+        try:
+            payload = _read_file(path)
+            os.utime(path)
+        except OSError:
+            self.discard(key)
+            return None
+        return CacheEntry(payload, encoding)
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        _atomic_write(self._path(key, entry.encoding), entry.payload)
+        with self._lock:
+            index = self._ensure_index()
+            previous = index.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+                if previous[0] != entry.encoding:
+                    self._unlink(key, previous[0])
+            index[key] = (entry.encoding, entry.size)
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes:
+                evicted_key, (encoding, size) = index.popitem(last=False)
+                self.bytes -= size
+                self._unlink(evicted_key, encoding)
+
+    def _unlink(self, key: str, encoding: str) -> None:
+        try:
+            self._path(key, encoding).unlink()
+        except FileNotFoundError:
+            pass
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            meta = self._ensure_index().pop(key, None)
+            if meta is not None:
+                self.bytes -= meta[1]
+                self._unlink(key, meta[0])
+
+    def discard_prefix(self, prefix: str) -> None:
+        with self._lock:
+            index = self._ensure_index()
+            for key in [k for k in index if k.startswith(prefix)]:
+                encoding, size = index.pop(key)
+                self.bytes -= size
+                self._unlink(key, encoding)
+
+
+class GraphCache:
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        *,
+        memory_bytes: Optional[int] = None,
+        disk_bytes: Optional[int] = None,
+        versions: Optional[CityDataVersions] = None,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else cache_dir()
+        self.memory = MemoryTier(
+            memory_bytes
+            if memory_bytes is not None
+            else _env_bytes("GRAPH_CACHE_MEMORY_BYTES", DEFAULT_MEMORY_BYTES)
+        )
+        self.disk = DiskTier(
+            self.directory,
+            disk_bytes
+            if disk_bytes is not None
+            else _env_bytes("GRAPH_CACHE_DISK_BYTES", DEFAULT_DISK_BYTES)
+            // web_concurrency(),
+        )
+        self.versions = versions or CityDataVersions(self.directory / VERSIONS_FILE)
+
+    def key(self, city_id: int, *parts) -> str:
+        """Cache key for a request on the current data version of ``city_id``."""
+        suffix = "_".join(str(part) for part in parts if part not in (None, ""))
+        return f"{city_id}_v{self.versions.get(city_id)}_{suffix}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+        entry = self.disk.get(key)
+        if entry is not None:
+            self.memory.put(key, entry)
+        return entry
+
+    async def get_async(self, key: str) -> Optional[CacheEntry]:
+        """``get`` that reads the disk tier on a worker thread."""
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+        entry = await asyncio.to_thread(self.disk.get, key)
+        if entry is not None:
+            self.memory.put(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        self.remember(key, entry)
+        self.persist(key, entry)
+
+    def remember(self, key: str, entry: CacheEntry) -> None:
+        """Put ``entry`` in the memory tier only."""
+        self.memory.put(key, entry)
+
+    def persist(self, key: str, entry: CacheEntry) -> None:
+        """Write ``entry`` to the disk tier only (blocking; call off-loop)."""
+        try:
+            self.disk.put(key, entry)
+        except OSError as exc:
+            logger.warning("Failed to write cache entry %s: %s", key, exc)
+
+    def invalidate_city(self, city_id: int, version: Optional[int] = None) -> None:
+        """Drop every entry of ``city_id`` from both tiers."""
+        prefix = f"{city_id}_v"
+        self.memory.discard_prefix(prefix)
+        self.disk.discard_prefix(prefix)
+
+    def stats(self) -> dict:
+        return {
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.bytes,
+            "disk_entries": len(self.disk),
+            "disk_bytes": self.disk.bytes,
+        }
+
+
+_caches: Dict[str, GraphCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_graph_cache() -> GraphCache:
+    """Process-wide cache for the configured ``GRAPH_CACHE_DIR``."""
+    directory = cache_dir()
+    key = str(directory.resolve())
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = GraphCache(directory)
+            events.on_city_changed(cache.invalidate_city)
+            _caches[key] = cache
+        return cache
+
+
+def city_data_changed(city_id: int) -> int:
+    """Bump the data version of ``city_id`` and notify cache subscribers."""
+    version = get_graph_cache().versions.bump(city_id)
+    logger.info("City %s data changed; cache version is now %s", city_id, version)
+    events.city_changed(city_id, version)
+    return version
@@ -0,0 +1,134 @@
+"""Contract degree-2 chains of the base road graph into single polyline edges."""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from haversine import haversine, Unit
+
+
+Coordinate = Tuple[float, float]
+
+
+def _junction_ids(
+    neighbors: Dict[int, Set[int]], node_ways: Dict[int, Set[int]]
+) -> Set[int]:
+    """Nodes that must survive contraction (same rule as the access graph)."""
+    junctions: Set[int] = set()
+    for node_id, adjacent in neighbors.items():
+        if len(adjacent) != 2 or len(node_ways[node_id]) > 1:
+            junctions.add(node_id)
+    return junctions
+
+
+def _path_length(path: List[int], coords: Dict[int, Coordinate]) -> float:
+    length = 0.0
+    for src, dst in zip(path, path[1:]):
+        lon_a, lat_a = coords[src]
+        lon_b, lat_b = coords[dst]
+        length += haversine((lat_a, lon_a), (lat_b, lon_b), unit=Unit.METERS)
+    return length
+
+
+def _linestring_wkt(path: List[int], coords: Dict[int, Coordinate]) -> str:
+    parts = ", ".join(f"{coords[n][0]!r} {coords[n][1]!r}" for n in path)
+    return f"LINESTRING({parts})"
+
+
+def contract_degree_two_chains(
+    edges: Iterable[Tuple[int, int, int]],
+    coords: Dict[int, Coordinate],
+) -> List[dict]:
+    """Collapse chains of shape nodes into edges between real intersections.
+
+    ``edges`` are directed ``(id_way, id_src, id_dist)`` rows as stored in the
+    ``Edges`` table; ``coords`` maps point ids to ``(longitude, latitude)``.
+    A node is kept when it does not have exactly two neighbours or when it is
+    shared by several ways, so every contracted edge belongs to a single way
+    and request-time filters on way properties stay exact. Directions are
+    preserved: a chain is emitted forward and/or backward depending on which
+    directed segments exist in the source table.
+    """
+    directed: Set[Tuple[int, int]] = set()
+    neighbors: Dict[int, Set[int]] = defaultdict(set)
+    node_ways: Dict[int, Set[int]] = defaultdict(set)
+    segment_way: Dict[Tuple[int, int], int] = {}
+
+    for id_way, src, dst in edges:
+        if src == dst or src not in coords or dst not in coords:
+            continue
+        directed.add((src, dst))
+        neighbors[src].add(dst)
+        neighbors[dst].add(src)
+        node_ways[src].add(id_way)
+        node_ways[dst].add(id_way)
+        segment_way.setdefault((min(src, dst), max(src, dst)), id_way)
+
+    junctions = _junction_ids(neighbors, node_ways)
+    visited: Set[Tuple[int, int]] = set()
+    payloads: List[dict] = []
+
+    def _walk(start: int, first: int) -> Optional[List[int]]:
+        key = (min(start, first), max(start, first))
+        if key in visited:
+            return None
+        path = [start, first]
+        visited.add(key)
+        previous, current = start, first
+        while current not in junctions and current != start:
+            following = next(n for n in neighbors[current] if n != previous)
+            visited.add((min(current, following), max(current, following)))
+            path.append(following)
+            previous, current = current, following
+        return path
+
+    def _emit(path: List[int]) -> None:
+        id_way = segment_way[(min(path[0], path[1]), max(path[0], path[1]))]
+        length_m = _path_length(path, coords)
+        if (path[0], path[1]) in directed:
+            payloads.append(
+                {
+                    "id_way": id_way,
+                    "id_src": path[0],
+                    "id_dist": path[-1],
+                    "length_m": length_m,
+                    "geometry": _linestring_wkt(path, coords),
+                }
+            )
+        if (path[1], path[0]) in directed:
+            reverse = path[::-1]
+            payloads.append(
+                {
+                    "id_way": id_way,
+                    "id_src": reverse[0],
+                    "id_dist": reverse[-1],
+                    "length_m": length_m,
+                    "geometry": _linestring_wkt(reverse, coords),
+                }
+            )
+
+    def _contract_from(start: int) -> None:
+        for first in sorted(neighbors[start]):
+            path = _walk(start, first)
+            if path is None:
+                continue
+            if path[-1] == path[0]:
+                # Split closed loops so both halves keep a drawable polyline
+                middle = len(path) // 2
+                _emit(path[: middle + 1])
+                _emit(path[middle:])
+            else:
+                _emit(path)
+
+    for node_id in sorted(junctions):
+        _contract_from(node_id)
+
+    # Rings without any junction (e.g. isolated roundabouts) are left over
+    for node_id in sorted(neighbors):
+        if any(
+            (min(node_id, n), max(node_id, n)) not in visited
+            for n in neighbors[node_id]
+        ):
+            junctions.add(node_id)
+            _contract_from(node_id)
+
+    return payloads
@@ -0,0 +1,54 @@
+"""Assign road points to the admin regions they lie in.
+
+Region graph requests used to send the district polygon to PostGIS and test
+every point of the city against it. Instead, each point and access node gets
+the ids of the regions containing it (``PointRegions``, ``AccessNodeRegions``)
+once per import, so a request becomes an indexed ``id_region = ANY(...)``
+filter. The assignment runs here with an STRtree over all region geometries.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+import shapely
+
+
+def region_geometries(regions) -> Tuple[List[int], List[object]]:
+    """``(osm_ids, geometries)`` of the regions frame, skipping empty shapes."""
+    region_ids = []
+    geometries = []
+    for osm_id, geometry in zip(regions["osm_id"].tolist(), regions["geometry"]):
+        if geometry is None or geometry.is_empty:
+            continue
+        region_ids.append(int(osm_id))
+        geometries.append(geometry)
+    return region_ids, geometries
+
+
+def assign_regions(
+    region_ids: Sequence[int],
+    geometries: Sequence[object],
+    rows: Iterable[Tuple[int, float, float]],
+) -> List[Tuple[int, int]]:
+    """Sorted ``(region_id, row_id)`` pairs for ``(id, longitude, latitude)`` rows.
+
+    A row belongs to every region it intersects, so a point exactly on the
+    border between two sibling districts belongs to both. Requests select the
+    union of the requested regions, and the polygon path (``ST_Within`` against
+    that union) keeps such points too; only a point on the outer boundary of
+    the whole selection is kept here but dropped by the polygon path.
+    """
+    rows = list(rows)
+    if not rows or not geometries:
+        return []
+
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    coords = np.array([(row[1], row[2]) for row in rows], dtype=float)
+    tree = shapely.STRtree(np.asarray(geometries, dtype=object))
+    row_idx, region_idx = tree.query(shapely.points(coords), predicate="intersects")
+
+    regions = np.asarray(region_ids, dtype=np.int64)
+    pairs = set(zip(regions[region_idx].tolist(), ids[row_idx].tolist()))
+    return sorted(pairs)
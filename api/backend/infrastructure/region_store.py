@@ -0,0 +1,89 @@
+"""GeoParquet copy of ``regions.json`` for fast startup.
+
+Parsing the GeoJSON of every admin boundary dominates process start. The
+first start (or ``python -m infrastructure.region_store``) writes a
+``regions.parquet`` next to it. Later starts, including every other worker,
+read the binary copy: WKB geometries and typed columns through a memory-
+mapped file instead of a JSON parse. The copy is rebuilt whenever the
+GeoJSON is newer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+STORE_SUFFIX = ".parquet"
+
+
+def store_path(source: Path) -> Path:
+    return source.with_suffix(STORE_SUFFIX)
+
+
+def _is_fresh(store: Path, source: Path) -> bool:
+    try:
+        store_mtime = store.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+    try:
+        return store_mtime >= source.stat().st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+
+def write_store(regions, store: Path) -> None:
+    """Write ``regions`` atomically so concurrent workers never read a partial file."""
+    store.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=store.parent, prefix=store.name, suffix=".tmp")
+    os.close(fd)
+    try:
+        regions.to_parquet(tmp_name, index=False)
+        os.replace(tmp_name, store)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def load_regions(source: Path, store: Optional[Path] = None):
+    """Regions GeoDataFrame, from the GeoParquet copy when it is up to date."""
+    import geopandas as gpd
+
+    store = store or store_path(source)
+    if _is_fresh(store, source):
+        try:
+            return gpd.read_parquet(store, memory_map=True)
+        except Exception as exc:
+            logger.warning("Ignoring unreadable region store %s: %s", store, exc)
+
+    regions = gpd.read_file(source)
+    try:
+        write_store(regions, store)
+        logger.info("Wrote region store %s", store)
+    except Exception as exc:
+        logger.warning("Failed to write region store %s: %s", store, exc)
+    return regions
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Convert regions.json to GeoParquet")
+    parser.add_argument(
+        "source", type=Path, nargs="?", default=Path("data/regions.json")
+    )
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    import geopandas as gpd
+
+    store = args.output or store_path(args.source)
+    write_store(gpd.read_file(args.source), store)
+    print(store)
+
+
+if __name__ == "__main__":
+    main()
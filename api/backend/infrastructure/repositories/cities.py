@@ -1,6 +1,6 @@
 from typing import Sequence, Optional
 
-from sqlalchemy import update
+from sqlalchemy import select, update
 
 from infrastructure.database import (
     CityAsync,
@@ -10,13 +10,46 @@ from infrastructure.database import (
 )
 
 
+def _with_properties():
+    """Cities joined with their property columns (``NULL`` when missing)."""
+    props = CityPropertyAsync.c
+    return select(
+        CityAsync,
+        props.population,
+        props.population_density,
+        props.time_zone,
+        props.time_created,
+        props.c_latitude,
+        props.c_longitude,
+    ).select_from(
+        CityAsync.outerjoin(CityPropertyAsync, props.id == CityAsync.c.id_property)
+    )
+
+
 class CityRepository:
     """Async helpers for querying cities and their properties."""
 
     async def list(self, page: int, per_page: int) -> Sequence[dict]:
-        """Return paginated cities using a pure SQL approach."""
+        """Return paginated cities with their property columns in one query."""
+        rows = await database.fetch_all(
+            _with_properties()
+            .order_by(CityAsync.c.id)
+            .offset(page * per_page)
+            .limit(per_page)
+        )
+        return rows
+
+    async def list_all(self) -> Sequence[dict]:
+        """Return every city with its property columns."""
+        rows = await database.fetch_all(_with_properties().order_by(CityAsync.c.id))
+        return rows
+
+    async def list_downloaded(self) -> Sequence[dict]:
+        """Return every city whose graph has been imported."""
         rows = await database.fetch_all(
-            CityAsync.select().offset(page * per_page).limit(per_page)
+            CityAsync.select()
+            .where(CityAsync.c.downloaded.is_(True))
+            .order_by(CityAsync.c.id)
         )
         return rows
 
@@ -27,10 +60,10 @@ class CityRepository:
         )
         return row
 
-    async def property_by_city(self, city_prop_id: int) -> Optional[dict]:
-        """Fetch the city property row by identifier."""
+    async def by_id_with_property(self, city_id: int) -> Optional[dict]:
+        """Fetch a city record together with its property columns."""
         row = await database.fetch_one(
-            CityPropertyAsync.select().where(CityPropertyAsync.c.id == city_prop_id)
+            _with_properties().where(CityAsync.c.id == city_id)
         )
         return row
 
@@ -1,9 +1,27 @@
-from typing import Iterable, Sequence
+from typing import Iterable, Optional, Sequence
 
 from sqlalchemy import text
 
 from infrastructure.database import database, engine
 
+# Membership filters used by the ``*_in_regions`` queries: an index lookup on
+# the stored region assignment instead of a point-in-polygon test.
+_POINT_IN_REGIONS = """IN (
+    SELECT r.id_point FROM "PointRegions" r WHERE r.id_region = ANY(:region_ids)
+)"""
+_ACCESS_NODE_IN_REGIONS = """IN (
+    SELECT r.id_access_node FROM "AccessNodeRegions" r
+    WHERE r.id_region = ANY(:region_ids)
+)"""
+# A point of the simplified graph is an endpoint of a contracted edge in
+# either direction; one-way dead ends appear only as ``id_dist``. One pass over
+# the city's edges (``id_city`` index) feeds a hashed semi-join.
+_SIMPLIFIED_ENDPOINT = """IN (
+    SELECT s.id_src FROM "SimplifiedEdges" s WHERE s.id_city = :city_id
+    UNION ALL
+    SELECT s.id_dist FROM "SimplifiedEdges" s WHERE s.id_city = :city_id
+)"""
+
 
 class GraphRepository:
     async def points_in_bbox(
@@ -268,6 +286,76 @@ class GraphRepository:
             },
         )
 
+    async def has_simplified_edges(self, city_id: int) -> bool:
+        row = await database.fetch_one(
+            'SELECT 1 AS present FROM "SimplifiedEdges" WHERE id_city = :city_id LIMIT 1',
+            values={"city_id": city_id},
+        )
+        return row is not None
+
+    async def simplified_points_in_polygon(
+        self, city_id: int, polygon_wkt: str
+    ) -> Sequence[tuple]:
+        """
+        Return intersection points (endpoints of contracted edges) inside the polygon.
+
+        A point counts when it starts or ends a contracted edge, so the far end
+        of a one-way dead end is kept.
+        """
+        q = f"""
+            WITH poly AS (
+                SELECT ST_GeomFromText(:wkt, 4326) AS g
+            )
+            SELECT p.id, p.longitude, p.latitude
+            FROM "Points" p
+            CROSS JOIN poly
+            WHERE p.id {_SIMPLIFIED_ENDPOINT}
+              AND ST_Within(ST_SetSRID(ST_MakePoint(p.longitude, p.latitude), 4326), poly.g)
+            """
+        return await database.fetch_all(
+            q, values={"wkt": polygon_wkt, "city_id": city_id}
+        )
+
+    async def simplified_edges_in_polygon(
+        self,
+        city_id: int,
+        polygon_wkt: str,
+        prop_id_name: int,
+        prop_id_highway: int,
+        highway_types: Iterable[str],
+    ) -> Sequence[tuple]:
+        """
+        Return contracted edges (id, id_way, id_src, id_dist, name, length_m, geometry)
+        whose both endpoints are inside the polygon.
+        """
+        q = """
+            WITH poly AS (
+                SELECT ST_GeomFromText(:wkt, 4326) AS g
+            )
+            SELECT s.id, s.id_way, s.id_src, s.id_dist, wp_n.value AS name,
+                   s.length_m, s.geometry
+            FROM "SimplifiedEdges" s
+            JOIN "WayProperties" wp_h ON wp_h.id_way = s.id_way AND wp_h.id_property = :prop_id_hw
+            LEFT JOIN "WayProperties" wp_n ON wp_n.id_way = s.id_way AND wp_n.id_property = :prop_id_name
+            JOIN "Points" ps ON ps.id = s.id_src
+            JOIN "Points" pd ON pd.id = s.id_dist
+            CROSS JOIN poly
+            WHERE s.id_city = :city_id
+              AND wp_h.value = ANY(:types)
+              AND ST_Within(ST_SetSRID(ST_MakePoint(ps.longitude, ps.latitude), 4326), poly.g)
+              AND ST_Within(ST_SetSRID(ST_MakePoint(pd.longitude, pd.latitude), 4326), poly.g)
+            """
+        return await database.fetch_all(
+            q,
+            values={
+                "wkt": polygon_wkt,
+                "city_id": city_id,
+                "prop_id_name": prop_id_name,
+                "prop_id_hw": prop_id_highway,
+                "types": list(highway_types),
+            },
+        )
+
     async def access_nodes_in_polygon(
         self, city_id: int, polygon_wkt: str
     ) -> Sequence[tuple]:
@@ -325,3 +413,159 @@ class GraphRepository:
                 "city_id": city_id,
             },
         )
+
+    async def region_membership_version(self, city_id: int) -> Optional[str]:
+        """Reference version the city's membership was built from, if it has one."""
+        row = await database.fetch_one(
+            'SELECT reference_version FROM "RegionMembershipVersions" '
+            "WHERE id_city = :city_id",
+            values={"city_id": city_id},
+        )
+        return None if row is None else row["reference_version"]
+
+    async def points_in_regions(
+        self, city_id: int, region_ids: Iterable[int]
+    ) -> Sequence[tuple]:
+        """Same rows as ``points_in_polygon`` for the union of the given regions."""
+        q = f"""
+            SELECT p.id, p.longitude, p.latitude
+            FROM "Points" p
+            JOIN "Edges" e ON e.id_src = p.id
+            JOIN "Ways" w  ON e.id_way = w.id
+            WHERE w.id_city = :city_id
+              AND p.id {_POINT_IN_REGIONS}
+            """
+        return await database.fetch_all(
+            q, values={"region_ids": list(region_ids), "city_id": city_id}
+        )
+
+    async def edges_in_regions(
+        self,
+        city_id: int,
+        region_ids: Iterable[int],
+        prop_id_name: int,
+        prop_id_highway: int,
+        highway_types: Iterable[str],
+    ) -> Sequence[tuple]:
+        """Edges with both endpoints in the given regions (see ``edges_in_polygon``)."""
+        q = f"""
+            WITH named AS (
+                SELECT e.id, e.id_way, e.id_src, e.id_dist, wp_n.value AS value
+                FROM "Edges" e
+                JOIN "WayProperties" wp_n ON wp_n.id_way = e.id_way AND wp_n.id_property = :prop_id_name
+                JOIN "WayProperties" wp_h ON wp_h.id_way = e.id_way AND wp_h.id_property = :prop_id_hw
+                JOIN "Ways" w ON w.id = e.id_way
+                WHERE w.id_city = :city_id
+                  AND wp_h.value = ANY(:types)
+                  AND e.id_src {_POINT_IN_REGIONS}
+                  AND e.id_dist {_POINT_IN_REGIONS}
+            ),
+            unnamed AS (
+                SELECT e.id, e.id_way, e.id_src, e.id_dist, NULL AS value
+                FROM "Edges" e
+                JOIN "Ways" w ON w.id = e.id_way
+                JOIN "WayProperties" wp_h ON wp_h.id_way = e.id_way AND wp_h.id_property = :prop_id_hw
+                LEFT JOIN "WayProperties" wp_n ON wp_n.id_way = e.id_way AND wp_n.id_property = :prop_id_name
+                WHERE w.id_city = :city_id
+                  AND wp_n.value IS NULL
+                  AND wp_h.value = ANY(:types)
+                  AND e.id_src {_POINT_IN_REGIONS}
+                  AND e.id_dist {_POINT_IN_REGIONS}
+            )
+            SELECT id, id_way, id_src, id_dist, value FROM named
+            UNION
+            SELECT id, id_way, id_src, id_dist, value FROM unnamed
+            """
+        return await database.fetch_all(
+            q,
+            values={
+                "region_ids": list(region_ids),
+                "city_id": city_id,
+                "prop_id_name": prop_id_name,
+                "prop_id_hw": prop_id_highway,
+                "types": list(highway_types),
+            },
+        )
+
+    async def simplified_points_in_regions(
+        self, city_id: int, region_ids: Iterable[int]
+    ) -> Sequence[tuple]:
+        q = f"""
+            SELECT p.id, p.longitude, p.latitude
+            FROM "Points" p
+            WHERE p.id {_SIMPLIFIED_ENDPOINT}
+              AND p.id {_POINT_IN_REGIONS}
+            """
+        return await database.fetch_all(
+            q, values={"region_ids": list(region_ids), "city_id": city_id}
+        )
+
+    async def simplified_edges_in_regions(
+        self,
+        city_id: int,
+        region_ids: Iterable[int],
+        prop_id_name: int,
+        prop_id_highway: int,
+        highway_types: Iterable[str],
+    ) -> Sequence[tuple]:
+        q = f"""
+            SELECT s.id, s.id_way, s.id_src, s.id_dist, wp_n.value AS name,
+                   s.length_m, s.geometry
+            FROM "SimplifiedEdges" s
+            JOIN "WayProperties" wp_h ON wp_h.id_way = s.id_way AND wp_h.id_property = :prop_id_hw
+            LEFT JOIN "WayProperties" wp_n ON wp_n.id_way = s.id_way AND wp_n.id_property = :prop_id_name
+            WHERE s.id_city = :city_id
+              AND wp_h.value = ANY(:types)
+              AND s.id_src {_POINT_IN_REGIONS}
+              AND s.id_dist {_POINT_IN_REGIONS}
+            """
+        return await database.fetch_all(
+            q,
+            values={
+                "region_ids": list(region_ids),
+                "city_id": city_id,
+                "prop_id_name": prop_id_name,
+                "prop_id_hw": prop_id_highway,
+                "types": list(highway_types),
+            },
+        )
+
+    async def access_nodes_in_regions(
+        self, city_id: int, region_ids: Iterable[int]
+    ) -> Sequence[tuple]:
+        q = f"""
+            SELECT an.id,
+                   an.node_type,
+                   an.longitude,
+                   an.latitude,
+                   an.source_type,
+                   an.source_id,
+                   an.name
+            FROM "AccessNodes" an
+            WHERE an.id_city = :city_id
+              AND an.id {_ACCESS_NODE_IN_REGIONS}
+        """
+        return await database.fetch_all(
+            q, values={"region_ids": list(region_ids), "city_id": city_id}
+        )
+
+    async def access_edges_in_regions(
+        self, city_id: int, region_ids: Iterable[int]
+    ) -> Sequence[tuple]:
+        q = f"""
+            SELECT ae.id,
+                   ae.id_src,
+                   ae.id_dst,
+                   ae.source_way_id,
+                   ae.road_type,
+                   ae.length_m,
+                   ae.is_building_link,
+                   ae.name
+            FROM "AccessEdges" ae
+            WHERE ae.id_city = :city_id
+              AND ae.id_src {_ACCESS_NODE_IN_REGIONS}
+              AND ae.id_dst {_ACCESS_NODE_IN_REGIONS}
+        """
+        return await database.fetch_all(
+            q, values={"region_ids": list(region_ids), "city_id": city_id}
+        )
@@ -3,7 +3,7 @@ import logging
 import os
 import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence
 
 from sqlalchemy import text, update
 from sqlalchemy.exc import CompileError, IntegrityError
@@ -11,18 +11,38 @@ from sqlalchemy.exc import CompileError, IntegrityError
 from infrastructure.database import (
     AccessEdgeAsync,
     AccessNodeAsync,
+    AccessNodeRegionAsync,
     DATABASE_URL,
     CityAsync,
+    PointRegionAsync,
+    RegionMembershipVersionAsync,
     SessionLocal,
+    SimplifiedEdgeAsync,
     engine,
     metadata,
 )
+from infrastructure.graph_cache import city_data_changed
 from infrastructure.models import City, CityProperty
-from infrastructure.osm.osm_handler import build_access_graph
+from infrastructure.osm.simplify import contract_degree_two_chains
+from infrastructure.region_membership import assign_regions
 
 
 logger = logging.getLogger(__name__)
 
+MEMBERSHIP_INSERT_CHUNK = 50_000
+_MEMBERSHIP_TABLES = (
+    PointRegionAsync,
+    AccessNodeRegionAsync,
+    RegionMembershipVersionAsync,
+)
+
+
+def build_access_graph(osm_file_path: str):
+    """``osm_handler.build_access_graph``; osmium and scipy load on first use."""
+    from infrastructure.osm.osm_handler import build_access_graph as build
+
+    return build(osm_file_path=osm_file_path)
+
 
 class IngestionRepository:
     """Low-level data access helpers for importing OSM-derived city graphs."""
@@ -419,6 +439,167 @@ class IngestionRepository:
                 )
             )
 
+    def populate_simplified_graph(self, *, city_id: int) -> None:
+        """Store the base graph with degree-2 shape nodes contracted away."""
+        metadata.create_all(engine, tables=[SimplifiedEdgeAsync])
+
+        with engine.begin() as conn:
+            edge_rows = conn.execute(
+                text(
+                    """
+                SELECT e.id_way, e.id_src, e.id_dist
+                FROM "Edges" e
+                JOIN "Ways" w ON w.id = e.id_way
+                WHERE w.id_city = :city_id
+                """
+                ),
+                {"city_id": city_id},
+            ).fetchall()
+            point_rows = conn.execute(
+                text(
+                    """
+                SELECT DISTINCT p.id, p.longitude, p.latitude
+                FROM "Points" p
+                JOIN "Edges" e ON e.id_src = p.id OR e.id_dist = p.id
+                JOIN "Ways" w ON w.id = e.id_way
+                WHERE w.id_city = :city_id
+                """
+                ),
+                {"city_id": city_id},
+            ).fetchall()
+
+            coords = {row[0]: (row[1], row[2]) for row in point_rows}
+            payloads = contract_degree_two_chains(
+                ((row[0], row[1], row[2]) for row in edge_rows), coords
+            )
+
+            conn.execute(
+                text('DELETE FROM "SimplifiedEdges" WHERE id_city = :city_id'),
+                {"city_id": city_id},
+            )
+            simplified_rows = [{"id_city": city_id, **payload} for payload in payloads]
+            if simplified_rows:
+                try:
+                    conn.execute(SimplifiedEdgeAsync.insert(), simplified_rows)
+                except IntegrityError:
+                    max_id = conn.execute(
+                        text('SELECT COALESCE(MAX(id), 0) FROM "SimplifiedEdges"')
+                    ).scalar_one()
+                    next_id = int(max_id or 0)
+                    rows_with_ids = []
+                    for payload in simplified_rows:
+                        next_id += 1
+                        rows_with_ids.append({**payload, "id": next_id})
+                    conn.execute(SimplifiedEdgeAsync.insert(), rows_with_ids)
+
+        logger.info(
+            "Simplified graph for city %s: %s directed edges -> %s",
+            city_id,
+            len(edge_rows),
+            len(payloads),
+        )
+
+    def populate_region_membership(
+        self,
+        *,
+        city_id: int,
+        region_ids: Sequence[int],
+        geometries: Sequence[object],
+        only_missing: bool = False,
+        reference_version: str = "",
+    ) -> bool:
+        """Store the regions every point and access node of the city lies in.
+
+        ``reference_version`` identifies the region file the geometries come
+        from and is stored with the assignment. Builds of the same city are
+        serialized with an advisory lock, so with ``only_missing`` a worker
+        that waited on another one returns ``False`` instead of redoing its
+        work; a membership of another reference version counts as missing.
+        """
+        metadata.create_all(engine, tables=_MEMBERSHIP_TABLES)
+
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(
+                    text(
+                        "SELECT pg_advisory_xact_lock("
+                        "hashtext('PointRegions'), :city_id)"
+                    ),
+                    {"city_id": city_id},
+                )
+            if only_missing:
+                stored = conn.execute(
+                    RegionMembershipVersionAsync.select().where(
+                        RegionMembershipVersionAsync.c.id_city == city_id
+                    )
+                ).first()
+                if stored is not None and stored.reference_version == reference_version:
+                    return False
+
+            point_rows = conn.execute(
+                text(
+                    """
+                SELECT DISTINCT p.id, p.longitude, p.latitude
+                FROM "Points" p
+                JOIN "Edges" e ON e.id_src = p.id OR e.id_dist = p.id
+                JOIN "Ways" w ON w.id = e.id_way
+                WHERE w.id_city = :city_id
+                """
+                ),
+                {"city_id": city_id},
+            ).fetchall()
+            node_rows = conn.execute(
+                text(
+                    """
+                SELECT an.id, an.longitude, an.latitude
+                FROM "AccessNodes" an
+                WHERE an.id_city = :city_id
+                """
+                ),
+                {"city_id": city_id},
+            ).fetchall()
+
+            point_pairs = assign_regions(region_ids, geometries, point_rows)
+            node_pairs = assign_regions(region_ids, geometries, node_rows)
+
+            self._delete_region_membership(conn, city_id)
+            for table, key, pairs in (
+                (PointRegionAsync, "id_point", point_pairs),
+                (AccessNodeRegionAsync, "id_access_node", node_pairs),
+            ):
+                for start in range(0, len(pairs), MEMBERSHIP_INSERT_CHUNK):
+                    chunk = pairs[start : start + MEMBERSHIP_INSERT_CHUNK]
+                    conn.execute(
+                        table.insert(),
+                        [
+                            {"id_region": region_id, key: row_id, "id_city": city_id}
+                            for region_id, row_id in chunk
+                        ],
+                    )
+            conn.execute(
+                RegionMembershipVersionAsync.insert(),
+                {"id_city": city_id, "reference_version": reference_version},
+            )
+
+        logger.info(
+            "Region membership for city %s: %s point and %s access node assignments",
+            city_id,
+            len(point_pairs),
+            len(node_pairs),
+        )
+        return True
+
+    def clear_region_membership(self, *, city_id: int) -> None:
+        """Drop the stored membership so it is rebuilt for the new import."""
+        metadata.create_all(engine, tables=_MEMBERSHIP_TABLES)
+        with engine.begin() as conn:
+            self._delete_region_membership(conn, city_id)
+
+    @staticmethod
+    def _delete_region_membership(conn, city_id: int) -> None:
+        for table in _MEMBERSHIP_TABLES:
+            conn.execute(table.delete().where(table.c.id_city == city_id))
+
     def import_city_graph(
         self,
         *,
@@ -438,4 +619,7 @@ class IngestionRepository:
         )
         self.fill_city_graph_from_osm_tables(city_id=city_id)
         self.populate_access_graph(city_id=city_id, file_path=file_path)
+        self.populate_simplified_graph(city_id=city_id)
+        self.clear_region_membership(city_id=city_id)
         self.mark_downloaded(city_id)
+        city_data_changed(city_id)
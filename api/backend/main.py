@@ -4,6 +4,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from uvicorn import run
 
+from app import reference_data
 from app.lifespan import build_lifespan
 from app.routes import build_router
 from infrastructure import logging as logging_config
@@ -11,6 +12,9 @@ from infrastructure.database import engine, metadata
 
 
 logger = logging_config.init()
+if reference_data.preload_requested():
+    # gunicorn master (preload_app): load once, before the workers fork
+    reference_data.preload_reference_data(logger)
 app = FastAPI(lifespan=build_lifespan(logger))
 
 app.add_middleware(
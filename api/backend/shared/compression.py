@@ -0,0 +1,75 @@
+"""Content-coding helpers for precompressed cache payloads (gzip, optional zstd)."""
+
+from __future__ import annotations
+
+import gzip
+import os
+from typing import Optional
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # pragma: no cover - optional compression dependency
+    zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+IDENTITY = "identity"
+
+FILE_SUFFIXES = {GZIP: ".gz", ZSTD: ".zst", IDENTITY: ""}
+
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 6
+
+
+def available_encodings() -> tuple[str, ...]:
+    if zstandard is not None:
+        return (ZSTD, GZIP)
+    return (GZIP,)
+
+
+def cache_encoding() -> str:
+    """Encoding for new cache entries: ``GRAPH_CACHE_ENCODING`` or gzip."""
+    requested = os.environ.get("GRAPH_CACHE_ENCODING", GZIP).strip().lower()
+    if requested in available_encodings() or requested == IDENTITY:
+        return requested
+    return GZIP
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+
+def decompress(data: bytes, encoding: str) -> bytes:
+    if encoding == GZIP:
+        return gzip.decompress(data)
+    if encoding == ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    """Whether an ``Accept-Encoding`` header allows ``encoding`` (q > 0)."""
+    if encoding == IDENTITY:
+        return True
+    wildcard: Optional[bool] = None
+    for part in (accept_encoding or "").split(","):
+        token, *params = [piece.strip() for piece in part.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        token = token.lower()
+        if token == encoding or (encoding == GZIP and token == "x-gzip"):
+            return q > 0
+        if token == "*":
+            wildcard = q > 0
+    return bool(wildcard)
@@ -0,0 +1,37 @@
+"""In-process notifications about changed city data.
+
+Ingestion publishes ``city_changed`` after a city's graph is (re)imported;
+caches subscribe with ``on_city_changed`` to drop what they hold for it.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+CityChangedHandler = Callable[[int, int], None]
+
+_city_changed_handlers: List[CityChangedHandler] = []
+
+
+def on_city_changed(handler: CityChangedHandler) -> CityChangedHandler:
+    """Register ``handler(city_id, version)``; usable as a decorator."""
+    if handler not in _city_changed_handlers:
+        _city_changed_handlers.append(handler)
+    return handler
+
+
+def remove_city_changed_handler(handler: CityChangedHandler) -> None:
+    if handler in _city_changed_handlers:
+        _city_changed_handlers.remove(handler)
+
+
+def city_changed(city_id: int, version: int) -> None:
+    """Notify every subscriber; a failing handler does not stop the others."""
+    for handler in list(_city_changed_handlers):
+        try:
+            handler(city_id, version)
+        except Exception:
+            logger.exception("city_changed handler %r failed for %s", handler, city_id)
@@ -0,0 +1,41 @@
+"""Coalesce concurrent identical async computations into a single run."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run at most one ``fn()`` per key at a time within an event loop.
+
+    Callers that arrive while a computation for the same key is in flight
+    await that computation and receive its result or its exception. A caller
+    being cancelled does not cancel the shared computation for the others.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None or flight.get_loop() is not asyncio.get_running_loop():
+            flight = asyncio.ensure_future(fn())
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(flight)
+
+    def _finish(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # Mark the exception as retrieved when every waiter was cancelled.
+            flight.exception()
@@ -9,6 +9,7 @@ from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.routes import build_router
+from application.city_catalog import city_catalog
 
 
 class DummyLogger:
@@ -33,6 +34,22 @@ class DummyLogger:
         return None
 
 
+@pytest.fixture(autouse=True)
+def graph_cache_dir(tmp_path, monkeypatch):
+    """Point the graph cache (and its version file) at a per-test directory."""
+    directory = tmp_path / "graph-cache"
+    monkeypatch.setenv("GRAPH_CACHE_DIR", str(directory))
+    return directory
+
+
+@pytest.fixture(autouse=True)
+def empty_city_catalog():
+    """Start every test with an empty city catalog."""
+    city_catalog.clear()
+    yield city_catalog
+    city_catalog.clear()
+
+
 @pytest.fixture()
 def api_client(tmp_path, monkeypatch) -> Generator[TestClient, None, None]:
     """FastAPI TestClient with router mounted and state prepared."""
@@ -0,0 +1,121 @@
+"""Tests for the in-memory city catalog."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from application import city_catalog
+from infrastructure.graph_cache import city_data_changed, get_graph_cache
+
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def anyio_backend():
+    return "asyncio"
+
+
+class _CityRepo:
+    def __init__(self, rows):
+        self.rows = {row["id"]: row for row in rows}
+        self.calls = []
+
+    async def list_all(self):
+        self.calls.append("list_all")
+        return list(self.rows.values())
+
+    async def by_id_with_property(self, city_id):
+        self.calls.append(city_id)
+        return self.rows.get(city_id)
+
+
+def _rows():
+    return [
+        {
+            "id": 1,
+            "city_name": "Testopolis",
+            "downloaded": True,
+            "id_property": 10,
+            "population": 5,
+            "population_density": None,
+            "time_zone": "+03",
+            "time_created": "2024",
+            "c_latitude": 60.0,
+            "c_longitude": 30.0,
+        },
+        {
+            "id": 2,
+            "city_name": "Nowhere",
+            "downloaded": False,
+            "id_property": None,
+            "c_latitude": None,
+        },
+    ]
+
+
+async def test_load_indexes_cities_by_id(monkeypatch):
+    repo = _CityRepo(_rows())
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: repo)
+    catalog = city_catalog.CityCatalog()
+
+    await catalog.load()
+    city = await catalog.get(1)
+
+    assert len(catalog) == 2
+    assert city.city_name == "Testopolis" and city.downloaded
+    assert city.property["time_zone"] == "+03"
+    assert catalog.cached(2).property is None
+    assert repo.calls == ["list_all"]
+
+
+async def test_city_changed_event_rereads_the_city(monkeypatch, empty_city_catalog):
+    rows = _rows()
+    repo = _CityRepo(rows)
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: repo)
+    await empty_city_catalog.load()
+
+    repo.rows[2] = {**rows[1], "downloaded": True}
+    city_data_changed(2)
+
+    assert empty_city_catalog.cached(2) is None
+    assert (await empty_city_catalog.get(2)).downloaded is True
+    assert repo.calls == ["list_all", 2]
+
+
+async def test_version_bump_from_another_process_rereads_the_city(
+    monkeypatch, empty_city_catalog
+):
+    rows = _rows()
+    repo = _CityRepo(rows)
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: repo)
+    await empty_city_catalog.load()
+    assert (await empty_city_catalog.get(2)).downloaded is False
+
+    # A worker or CLI import bumps versions.json without an in-process event
+    repo.rows[2] = {**rows[1], "downloaded": True}
+    get_graph_cache().versions.bump(2)
+
+    assert empty_city_catalog.cached(2) is None
+    entry = await empty_city_catalog.get(2)
+    assert entry.downloaded is True
+    assert await empty_city_catalog.get(2) is entry
+    assert repo.calls == ["list_all", 2]
+
+
+def test_admin_levels_are_parsed_once_per_frame(monkeypatch):
+    cities = pd.DataFrame(
+        [
+            {"Город": "Testopolis", "admin_levels": "[8, 9]"},
+            {"Город": "Testopolis", "admin_levels": "[4]"},
+            {"Город": "Broken", "admin_levels": float("nan")},
+        ]
+    )
+    catalog = city_catalog.CityCatalog()
+
+    assert catalog.admin_levels("Testopolis", cities) == [8, 9]
+    monkeypatch.setattr(city_catalog.ast, "literal_eval", None)
+    assert catalog.admin_levels("Testopolis", cities) == [8, 9]
+    with pytest.raises(IndexError):
+        catalog.admin_levels("Broken", cities)
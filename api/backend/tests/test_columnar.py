@@ -0,0 +1,138 @@
+"""Tests for the Arrow IPC / Parquet encodings of the graph payload."""
+
+from __future__ import annotations
+
+import io
+import zipfile
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from application.columnar import (  # noqa: E402
+    graph_to_arrow_ipc,
+    graph_to_parquet_zip,
+    read_arrow_ipc,
+    rows_to_tables,
+)
+from application.converters import graph_to_scheme  # noqa: E402
+
+
+@pytest.fixture()
+def graph():
+    return graph_to_scheme(
+        points=[[1, 30.5, 60.1], [2, 30.6, 60.2]],
+        edges=[[7, 10, 1, 2, "Main"], [8, 11, 2, 1, None]],
+        pprop=[[1, "highway", "traffic_signals"]],
+        wprop=[[10, "name", "Main"]],
+        metrics=[[1, 2, 1.0, 1.0, 0.7, 0.0, 1.0, "rgb(0, 0, 0)"]],
+        access_nodes=[[5, "building", 30.1, 60.1, "building", 99, None]],
+        access_edges=[[6, 5, 1, None, "building_link", 15.5, True, None]],
+    )
+
+
+def test_arrow_stream_round_trips_typed_tables(graph):
+    tables = read_arrow_ipc(graph_to_arrow_ipc(graph))
+
+    assert set(tables) == {
+        "edges_csv",
+        "points_csv",
+        "ways_properties_csv",
+        "points_properties_csv",
+        "metrics_csv",
+        "access_nodes_csv",
+        "access_edges_csv",
+    }
+    points = tables["points_csv"]
+    assert points.schema.field("id").type == pa.int64()
+    assert points.schema.field("longitude").type == pa.float64()
+    assert points.column("latitude").to_pylist() == [60.1, 60.2]
+    edges = tables["edges_csv"]
+    assert edges.column("name").to_pylist() == ["Main", None]
+    access = tables["access_edges_csv"]
+    assert access.schema.field("is_building_link").type == pa.bool_()
+    assert access.column("source_way_id").to_pylist() == [None]
+
+
+def test_parquet_zip_holds_one_file_per_table(graph):
+    archive = zipfile.ZipFile(io.BytesIO(graph_to_parquet_zip(graph)))
+
+    assert "points.parquet" in archive.namelist()
+    table = pq.read_table(io.BytesIO(archive.read("metrics.parquet")))
+    assert table.schema.field("degree").type == pa.int64()
+    assert table.column("color").to_pylist() == ["rgb(0, 0, 0)"]
+
+
+def test_payload_with_mismatched_types_is_rejected(graph):
+    graph.access_nodes_csv = "id,node_type\na1,building\n"
+
+    with pytest.raises(ValueError, match="access_nodes_csv"):
+        graph_to_arrow_ipc(graph)
+
+
+def test_tables_from_rows_match_tables_parsed_from_csv(graph):
+    pieces = dict(
+        points=[[1, 30.5, 60.1], [2, 30.6, 60.2]],
+        edges=[[7, 10, 1, 2, "Main"], [8, 11, 2, 1, None]],
+        pprop=[[1, "highway", "traffic_signals"]],
+        wprop=[[10, "name", "Main"]],
+        metrics=[[1, 2, 1.0, 1.0, 0.7, 0.0, 1.0, "rgb(0, 0, 0)"]],
+        access_nodes=[[5, "building", 30.1, 60.1, "building", 99, None]],
+        access_edges=[[6, 5, 1, None, "building_link", 15.5, True, None]],
+    )
+
+    from_rows = rows_to_tables(**pieces)
+    from_csv = read_arrow_ipc(graph_to_arrow_ipc(graph))
+
+    assert set(from_rows) == set(from_csv)
+    for name, table in from_rows.items():
+        assert table.equals(from_csv[name]), name
+
+
+def test_rows_with_mismatched_types_are_rejected():
+    with pytest.raises(ValueError, match="points_csv"):
+        rows_to_tables(
+            points=[[1, "east", 60.1]], edges=[], pprop=[], wprop=[], metrics=[]
+        )
+
+
+@pytest.fixture()
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_loader_encodes_cached_json_once_and_reuses_the_bytes(
+    tmp_path, monkeypatch
+):
+    from app.graph_payloads import GraphPayloadLoader
+    from application import service_facade
+    from infrastructure.graph_cache import GraphCache
+    from tests.conftest import DummyLogger
+
+    built = []
+
+    async def fake_graph_from_ids(*, city_id, regions_ids, regions, simplified, **_):
+        built.append(regions_ids)
+        return (
+            [[1, 30.5, 60.1]],
+            [[7, 10, 1, 1, "Main"]],
+            [],
+            [],
+            [[1, 2, 1.0, 1.0, 0.7, 0.0, 1.0, "rgb(0, 0, 0)"]],
+            [],
+            [],
+        )
+
+    monkeypatch.setattr(service_facade, "graph_from_ids", fake_graph_from_ids)
+    loader = GraphPayloadLoader(DummyLogger(), GraphCache(tmp_path))
+
+    await loader.load(1, [5], None)
+    first = await loader.load_columnar("arrow", 1, [5], None)
+    second = await loader.load_columnar("arrow", 1, [5], None)
+
+    assert built == [[5]]
+    assert second is first
+    points = read_arrow_ipc(first)["points_csv"]
+    assert points.column("longitude").to_pylist() == [30.5]
@@ -0,0 +1,37 @@
+"""Tests for the cache content-coding helpers."""
+
+from __future__ import annotations
+
+import pytest
+
+from shared import compression
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0", False),
+        ("*;q=0.5", True),
+        ("identity", False),
+        (None, False),
+    ],
+)
+def test_accepts_gzip(header, expected):
+    assert compression.accepts_encoding(header, compression.GZIP) is expected
+
+
+def test_round_trip_is_deterministic():
+    data = b'{"points_csv": "id\\n1\\n"}' * 100
+
+    packed = compression.compress(data, compression.GZIP)
+
+    assert packed == compression.compress(data, compression.GZIP)
+    assert len(packed) < len(data)
+    assert compression.decompress(packed, compression.GZIP) == data
+
+
+def test_unknown_cache_encoding_falls_back_to_gzip(monkeypatch):
+    monkeypatch.setenv("GRAPH_CACHE_ENCODING", "brotli")
+
+    assert compression.cache_encoding() == compression.GZIP
@@ -6,8 +6,16 @@ import csv
 import io
 import zipfile
 
+import pandas as pd
+import pytest
+
 from application.converters import (
+    graph_to_scheme,
     graph_to_zip_archive,
+    iter_csv_chunks,
+    iter_graph_zip,
+    iter_rows_zip,
+    list_to_csv_str,
     merge_edges_csv,
     merge_nodes_csv,
 )
@@ -79,3 +87,76 @@ def test_graph_to_zip_archive_writes_all_files():
         assert "layer" in nodes
         edges = zf.read("edges.csv").decode("utf-8")
         assert "building_link" in edges
+
+
+def test_list_to_csv_str_matches_pandas_output():
+    rows = [
+        [1, 30.123456789, 60.5, "Невский, 1", None, True],
+        [2, -0.1, 1e-07, 'say "hi"', "x", False],
+    ]
+    columns = ["id", "longitude", "latitude", "name", "extra", "flag"]
+
+    expected = pd.DataFrame(rows, columns=columns).to_csv(index=False)
+
+    assert list_to_csv_str(rows, columns) == expected
+
+
+def test_iter_csv_chunks_joins_to_full_payload():
+    rows = [[i, f"street {i}"] for i in range(10)]
+
+    chunks = list(iter_csv_chunks(rows, ["id", "name"], chunk_rows=4))
+
+    assert len(chunks) == 3
+    assert chunks[0].startswith("id,name\n0,street 0\n")
+    assert "".join(chunks) == list_to_csv_str(rows, ["id", "name"])
+    assert list(iter_csv_chunks([], ["id"])) == ["id\n"]
+
+
+def test_iter_graph_zip_streams_members_incrementally():
+    points = "id,longitude,latitude\n" + "".join(
+        f"{i},30.{i},60.{i}\n" for i in range(20000)
+    )
+    graph = GraphBase(
+        edges_csv="id,id_way,source,target,name\n1,5,1,2,Main\n",
+        points_csv=points,
+        ways_properties_csv="id,property,value\n5,name,Main\n",
+        points_properties_csv="",
+        metrics_csv="id,degree\n1,2\n",
+    )
+
+    chunks = list(iter_graph_zip(graph))
+
+    assert len(chunks) > 2
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+        assert zf.testzip() is None
+        nodes = zf.read("nodes.csv").decode("utf-8")
+        assert nodes == merge_nodes_csv(graph.points_csv, None)
+        assert nodes.count("\n") == 20001
+        assert zf.read("points_properties.csv") == b""
+
+
+@pytest.mark.parametrize("simplified", [False, True])
+def test_iter_rows_zip_matches_the_csv_export(simplified):
+    edges = [[1, 5, 1, 2, "Main"], [2, 6, 2, 3, None]]
+    if simplified:
+        edges = [edge + [120.5, "LINESTRING(30 60, 30.1 60)"] for edge in edges]
+    pieces = (
+        [[1, 30.0, 60.0], [2, 30.1, 60.1], [3, 30.2, 60.2]],
+        edges,
+        [[1, "highway", "crossing"]],
+        [[5, "name", "Main"]],
+        [[1, 1, 1, 0, 0.1, 0.2, 0.3, "rgb(0, 0, 255)"]],
+        [["a1", "building", 30.1, 60.1, "building", 10, "Дом, 1"]],
+        [["e1", "a1", 1, None, "building_link", 15.5, True, "Подъезд"]],
+    )
+
+    def _members(chunks):
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zf:
+            return {name: zf.read(name) for name in zf.namelist()}
+
+    from_rows = _members(iter_rows_zip(*pieces))
+    from_csv = _members(
+        iter_graph_zip(graph_to_scheme(*pieces, simplified=simplified))
+    )
+
+    assert from_rows == from_csv
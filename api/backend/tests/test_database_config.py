@@ -7,11 +7,21 @@ import pytest
 
 
 def test_configure_database_second_call_raises():
-    # configure_database already called at import; second call should raise
+    # The lifespan configures the database once; a second call should raise
+    db.ensure_database()
     with pytest.raises(RuntimeError):
         db.configure_database(db.DATABASE_URL, echo=False)
 
 
+def test_deferred_handles_resolve_to_the_configured_objects():
+    url = db.ensure_database()
+
+    assert db.ensure_database() == url
+    assert str(db.engine.url) == url
+    assert db.SessionLocal.kw["bind"] is db._objects["engine"]
+    assert "deferred engine" in repr(db.engine)
+
+
 def test_create_test_database_isolated(tmp_path):
     custom_url = f"sqlite:///{tmp_path}/isolated.db"
     engine, session_factory, test_db = db.create_test_database(custom_url)
@@ -25,3 +35,16 @@ def test_create_test_database_isolated(tmp_path):
             sess.close()
     finally:
         engine.dispose()
+
+
+def test_pool_sizes_split_the_connection_budget(monkeypatch):
+    monkeypatch.delenv("DB_POOL_SIZE", raising=False)
+    monkeypatch.setenv("DB_MAX_CONNECTIONS", "40")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert db.pool_sizes() == (6, db.SYNC_POOL_SIZE)
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "32")
+    assert db.pool_sizes()[0] == 2
+
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    assert db.pool_sizes()[0] == 7
@@ -0,0 +1,61 @@
+"""Tests for the degree distribution summary and power-law fits."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from application.csr_graph import csr_from_arcs
+from application.degree_distribution import (
+    degree_distribution,
+    discrete_power_law_mle,
+    log_ecdf,
+)
+
+
+def _star_with_tail():
+    # Hub 0 linked to 1..4, plus a path 4-5-6; isolated vertex 9
+    undirected = [(0, 1), (0, 2), (0, 3), (0, 4), (4, 5), (5, 6)]
+    arcs = undirected + [(v, u) for u, v in undirected]
+    return csr_from_arcs([0, 1, 2, 3, 4, 5, 6, 9], arcs)
+
+
+def test_histogram_and_ccdf_skip_isolated_vertices():
+    result = degree_distribution(_star_with_tail())
+
+    assert result.n == 7
+    assert result.degrees == [1, 2, 4]
+    assert result.counts == [4, 2, 1]
+    assert result.ccdf == pytest.approx([1.0, 3 / 7, 1 / 7])
+
+
+def test_loglog_fits_match_notebook_regressions():
+    graph = _star_with_tail()
+    sample = graph.out_degree()
+    sample = sample[sample > 0]
+    log_x, log_y = log_ecdf(sample)
+
+    result = degree_distribution(graph)
+
+    assert log_y[0] == pytest.approx(0.0)
+    assert result.loglog_linear == pytest.approx(np.polyfit(log_x, log_y, 1).tolist())
+    assert len(result.loglog_quadratic) == 3
+
+
+def test_power_law_mle_recovers_exponent():
+    rng = np.random.default_rng(7)
+    # Discrete power law with alpha = 2.5 and xmin = 5 (Clauset et al., eq. D.6)
+    u = rng.random(20000)
+    sample = np.floor((5 - 0.5) * (1 - u) ** (-1 / 1.5) + 0.5).astype(int)
+
+    fit = discrete_power_law_mle(sample, xmin=5)
+
+    assert fit.alpha == pytest.approx(2.5, abs=0.1)
+    assert fit.n_tail == len(sample)
+
+
+def test_empty_graph_returns_empty_summary():
+    result = degree_distribution(csr_from_arcs([1, 2], []))
+
+    assert result.n == 0
+    assert result.power_law.alpha is None
@@ -0,0 +1,79 @@
+"""Tests for the street-as-node dual graph builder."""
+
+from __future__ import annotations
+
+from application.dual_graph import build_dual_graph, dual_graph_cache
+from shared import events
+from shared.lru import LruCache
+
+
+def _edge(edge_id, id_way, src, dst, name):
+    return [edge_id, id_way, src, dst, name]
+
+
+def test_streets_sharing_an_intersection_are_adjacent():
+    edges = [
+        _edge(1, 10, 1, 2, "Nevsky"),
+        _edge(2, 11, 2, 3, "Nevsky"),  # same street, different way
+        _edge(3, 20, 2, 4, "Liteyny"),
+        _edge(4, 30, 5, 6, "Isolated"),
+    ]
+
+    dual = build_dual_graph(edges)
+
+    assert dual.nodes["street_name"].tolist() == ["Nevsky", "Liteyny"]
+    assert dual.nodes["index"].tolist() == [0, 1]
+    assert dual.nodes["ways"].tolist() == [2, 1]
+    assert dual.edges.values.tolist() == [[0, 1], [1, 0]]
+
+
+def test_unnamed_ways_become_separate_streets():
+    edges = [
+        _edge(1, 10, 1, 2, None),
+        _edge(2, 11, 2, 3, ""),
+        _edge(3, 12, 3, 4, None),
+    ]
+
+    dual = build_dual_graph(edges)
+
+    assert dual.nodes["id_way"].tolist() == [10, 11, 12]
+    assert dual.nodes["street_name"].isna().all()
+    assert sorted(map(tuple, dual.edges.values.tolist())) == [
+        (0, 1),
+        (1, 0),
+        (1, 2),
+        (2, 1),
+    ]
+    assert dual.to_csr().out_degree().tolist() == [1, 2, 1]
+
+
+def test_csv_payload_matches_notebook_columns():
+    dual = build_dual_graph([_edge(1, 1, 1, 2, "A"), _edge(2, 2, 2, 3, "B")])
+
+    assert dual.nodes_csv().splitlines()[0] == "index,street_name,id_way,ways"
+    assert dual.edges_csv().splitlines() == ["src_index,dest_index", "0,1", "1,0"]
+    assert build_dual_graph([]).n == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = LruCache(max_entries=2)
+    graph = build_dual_graph([])
+    cache.put("a", graph)
+    cache.put("b", graph)
+    cache.get("a")
+    cache.put("c", graph)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is graph
+
+
+def test_city_change_drops_only_that_city_from_the_cache():
+    graph = build_dual_graph([])
+    dual_graph_cache.put((1, 0, "", (10,)), graph)
+    dual_graph_cache.put((2, 0, "", (10,)), graph)
+
+    events.city_changed(1, 1)
+
+    assert dual_graph_cache.get((1, 0, "", (10,))) is None
+    assert dual_graph_cache.get((2, 0, "", (10,))) is graph
+    dual_graph_cache.clear()
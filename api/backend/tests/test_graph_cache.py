@@ -0,0 +1,145 @@
+"""Tests for the two-tier graph payload cache and city data versions."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+
+from infrastructure import graph_cache
+from infrastructure.graph_cache import (
+    CacheEntry,
+    CityDataVersions,
+    GraphCache,
+    city_data_changed,
+)
+from shared import compression, events
+
+
+def _entry(size: int, fill: bytes = b"x") -> CacheEntry:
+    return CacheEntry(fill * size, compression.GZIP)
+
+
+def test_memory_tier_evicts_least_recently_used_by_bytes(tmp_path):
+    cache = GraphCache(tmp_path, memory_bytes=250, disk_bytes=0)
+    cache.put("a", _entry(100))
+    cache.put("b", _entry(100))
+    cache.get("a")
+    cache.put("c", _entry(100))
+
+    assert cache.memory.get("b") is None
+    assert cache.memory.get("a") is not None
+    assert cache.memory.bytes == 200
+
+
+def test_disk_tier_keeps_budget_and_recency_across_restarts(tmp_path):
+    cache = GraphCache(tmp_path, memory_bytes=0, disk_bytes=250)
+    cache.put("old", _entry(100, b"o"))
+    cache.put("new", _entry(100, b"n"))
+    os.utime(tmp_path / "old.json.gz", ns=(1, 1))
+
+    reopened = GraphCache(tmp_path, memory_bytes=0, disk_bytes=250)
+    reopened.put("third", _entry(100, b"t"))
+
+    assert sorted(p.name for p in tmp_path.glob("*.json.gz")) == [
+        "new.json.gz",
+        "third.json.gz",
+    ]
+    assert reopened.get("new").payload == b"n" * 100
+    assert reopened.stats()["disk_bytes"] == 200
+
+
+def test_version_bump_changes_keys_and_purges_city(tmp_path):
+    cache = GraphCache(tmp_path)
+    key = cache.key(7, "regions", "1_2")
+    cache.put(key, _entry(10))
+    cache.put(cache.key(70, "regions", "1"), _entry(10))
+
+    cache.versions.bump(7)
+    cache.invalidate_city(7)
+
+    assert key == "7_v0_regions_1_2"
+    assert cache.key(7, "regions", "1_2") == "7_v1_regions_1_2"
+    assert cache.get(key) is None
+    assert not (tmp_path / f"{key}.json.gz").exists()
+    assert cache.get("70_v0_regions_1") is not None
+
+
+def test_versions_file_is_shared_between_instances(tmp_path):
+    first = CityDataVersions(tmp_path / "versions.json")
+    second = CityDataVersions(tmp_path / "versions.json", check_interval=0)
+
+    assert second.get(3) == 0
+    first.bump(3)
+    first.bump(3)
+
+    assert second.get(3) == 2
+
+
+def test_versions_file_is_checked_at_most_once_per_interval(tmp_path, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(graph_cache.time, "monotonic", lambda: clock[0])
+    first = CityDataVersions(tmp_path / "versions.json")
+    second = CityDataVersions(tmp_path / "versions.json", check_interval=5)
+
+    assert second.get(3) == 0
+    first.bump(3)
+    assert first.get(3) == 1
+    assert second.get(3) == 0
+
+    clock[0] += 5
+    assert second.get(3) == 1
+
+
+def test_disk_budget_is_split_between_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("GRAPH_CACHE_DISK_BYTES", "1000")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+
+    assert GraphCache(tmp_path).disk.max_bytes == 250
+
+
+def test_city_data_changed_bumps_version_and_notifies(graph_cache_dir):
+    seen = []
+
+    def _handler(city_id, version):
+        seen.append((city_id, version))
+
+    events.on_city_changed(_handler)
+    try:
+        cache = graph_cache.get_graph_cache()
+        key = cache.key(5, "regions", "9")
+        cache.put(key, _entry(10))
+
+        assert city_data_changed(5) == 1
+    finally:
+        events.remove_city_changed_handler(_handler)
+
+    assert seen == [(5, 1)]
+    assert cache.get(key) is None
+    assert cache.directory == graph_cache_dir
+
+
+def test_get_async_reads_large_entries_through_mmap(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_cache, "MMAP_THRESHOLD", 64)
+    writer = GraphCache(tmp_path, memory_bytes=0)
+    writer.put("big", _entry(1000, b"b"))
+    writer.put("small", _entry(10, b"s"))
+
+    reader = GraphCache(tmp_path)
+    big = asyncio.run(reader.get_async("big"))
+    small = asyncio.run(reader.get_async("small"))
+
+    assert big.payload == b"b" * 1000
+    assert small.payload == b"s" * 10
+    assert reader.memory.get("big") == big
+    assert asyncio.run(reader.get_async("missing")) is None
+
+
+def test_remember_keeps_entry_off_disk_until_persisted(tmp_path):
+    cache = GraphCache(tmp_path)
+    cache.remember("k", _entry(10))
+
+    assert cache.get("k") is not None
+    assert not (tmp_path / "k.json.gz").exists()
+
+    cache.persist("k", _entry(10))
+    assert (tmp_path / "k.json.gz").exists()
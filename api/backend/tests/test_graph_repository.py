@@ -0,0 +1,91 @@
+"""Run the region graph queries against SQLite."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import bindparam, text
+
+from infrastructure import database as db
+from infrastructure.repositories import graph as graph_repo
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def anyio_backend():
+    return "asyncio"
+
+
+class _SqliteDatabase:
+    """``database.fetch_all`` on SQLite, with ``= ANY(...)`` as an ``IN`` list."""
+
+    def __init__(self, engine) -> None:
+        self.engine = engine
+
+    async def fetch_all(self, query, values):
+        statement = text(query.replace("= ANY(:region_ids)", "IN :region_ids"))
+        if "region_ids" in values:
+            statement = statement.bindparams(bindparam("region_ids", expanding=True))
+        with self.engine.begin() as conn:
+            return conn.execute(statement, values).fetchall()
+
+
+@pytest.fixture()
+def sqlite_graph_db(tmp_path, monkeypatch):
+    engine, _, _ = db.create_test_database(f"sqlite:///{tmp_path}/graph.db", echo=False)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(
+            db.CityPropertyAsync.insert().values(id=1, c_latitude=0.0, c_longitude=0.0)
+        )
+        conn.execute(
+            db.CityAsync.insert().values(
+                id=1, id_property=1, city_name="Demo", downloaded=True
+            )
+        )
+        conn.execute(db.WayAsync.insert(), [{"id": 70, "id_city": 1}])
+        conn.execute(
+            db.PointAsync.insert(),
+            [
+                {"id": node_id, "longitude": 30.0 + node_id * 0.001, "latitude": 60.0}
+                for node_id in (1, 2, 3)
+            ],
+        )
+    monkeypatch.setattr(graph_repo, "database", _SqliteDatabase(engine))
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+async def test_simplified_points_keep_the_end_of_a_one_way_dead_end(
+    sqlite_graph_db,
+):
+    # 3 is reached only by the one-way edge 2 -> 3
+    with sqlite_graph_db.begin() as conn:
+        conn.execute(
+            db.SimplifiedEdgeAsync.insert(),
+            [
+                {
+                    "id": edge_id,
+                    "id_city": 1,
+                    "id_way": 70,
+                    "id_src": src,
+                    "id_dist": dst,
+                    "length_m": 50.0,
+                    "geometry": "LINESTRING EMPTY",
+                }
+                for edge_id, (src, dst) in enumerate([(1, 2), (2, 1), (2, 3)], 1)
+            ],
+        )
+        conn.execute(
+            db.PointRegionAsync.insert(),
+            [
+                {"id_region": 10, "id_point": node_id, "id_city": 1}
+                for node_id in (1, 2, 3)
+            ],
+        )
+
+    rows = await graph_repo.GraphRepository().simplified_points_in_regions(1, [10])
+
+    assert sorted(row[0] for row in rows) == [1, 2, 3]
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import threading
 from types import SimpleNamespace
 
+import anyio
 import pytest
 from shapely.geometry import Polygon
 
-from application import graph_service
+from application import city_catalog, graph_service
 
 
 pytestmark = pytest.mark.anyio
@@ -50,8 +52,23 @@ async def test_calc_metrics_builds_metrics_for_simple_graph():
     assert all(color.startswith("rgb(") for color in colors)
 
 
+async def test_calc_metrics_runs_off_the_event_loop_thread(monkeypatch):
+    threads = []
+    original = graph_service._networkx_metrics
+
+    def _recording(*args):
+        threads.append(threading.get_ident())
+        return original(*args)
+
+    monkeypatch.setattr(graph_service, "_networkx_metrics", _recording)
+
+    await graph_service.calc_metrics([[1, 0.0, 0.0]], [], set())
+
+    assert threads and threads[0] != threading.get_ident()
+
+
 class _CityRepoMissing:
-    async def by_id(self, city_id):  # pragma: no cover - helper
+    async def by_id_with_property(self, city_id):  # pragma: no cover - helper
         return None
 
 
@@ -72,7 +89,7 @@ class _GraphRepoStub:
 
 @pytest.mark.anyio
 async def test_graph_from_poly_returns_none_when_city_missing(monkeypatch):
-    monkeypatch.setattr(graph_service, "CityRepository", lambda: _CityRepoMissing())
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: _CityRepoMissing())
 
     poly = Polygon([(0, 0), (1, 0), (1, 1)])
     result = await graph_service.graph_from_poly(1, poly)
@@ -97,7 +114,7 @@ class _CityRepoSequence:
         self._responses = list(responses)
         self._index = 0
 
-    async def by_id(self, city_id):
+    async def by_id_with_property(self, city_id):
         if self._index >= len(self._responses):  # pragma: no cover - safety
             return self._responses[-1]
         value = self._responses[self._index]
@@ -165,14 +182,14 @@ async def test_graph_from_poly_returns_none_when_import_fails(monkeypatch, tmp_p
     city = _CityRow(city_name="AsyncCity", downloaded=False)
 
     class _CityRepo:
-        async def by_id(self, city_id):
+        async def by_id_with_property(self, city_id):
             return city
 
     loop = _LoopStub(exc=RuntimeError("import"))
     pbf_path = tmp_path / "AsyncCity.pbf"
     pbf_path.write_text("data")
 
-    monkeypatch.setattr(graph_service, "CityRepository", lambda: _CityRepo())
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: _CityRepo())
     monkeypatch.setattr(graph_service, "city_pbf_path", lambda _: pbf_path)
     monkeypatch.setattr(graph_service.asyncio, "get_running_loop", lambda: loop)
     monkeypatch.setattr(graph_service, "add_graph_to_db", lambda *args, **kwargs: None)
@@ -197,7 +214,7 @@ async def test_graph_from_poly_returns_none_when_import_leaves_city_undownloaded
     pbf_path.write_text("data")
 
     monkeypatch.setattr(
-        graph_service, "CityRepository", lambda: _CityRepoSequence(rows)
+        city_catalog, "CityRepository", lambda: _CityRepoSequence(rows)
     )
     monkeypatch.setattr(graph_service, "city_pbf_path", lambda _: pbf_path)
     monkeypatch.setattr(graph_service.asyncio, "get_running_loop", lambda: loop)
@@ -214,10 +231,10 @@ async def test_graph_from_poly_returns_full_payload(monkeypatch):
     downloaded_city = _CityRow(city_name="Ready", downloaded=True)
 
     class _CityRepo:
-        async def by_id(self, city_id):
+        async def by_id_with_property(self, city_id):
             return downloaded_city
 
-    monkeypatch.setattr(graph_service, "CityRepository", lambda: _CityRepo())
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: _CityRepo())
     monkeypatch.setattr(graph_service, "GraphRepository", lambda: _GraphRepoComplete())
 
     async def _fake_metrics(points, edges, oneway_ids):
@@ -247,10 +264,10 @@ async def test_graph_from_poly_handles_missing_pbf(monkeypatch, tmp_path):
     missing_city = _CityRow(city_name="TestCity", downloaded=False)
 
     class _CityRepo:
-        async def by_id(self, city_id):
+        async def by_id_with_property(self, city_id):
             return missing_city
 
-    monkeypatch.setattr(graph_service, "CityRepository", lambda: _CityRepo())
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: _CityRepo())
     monkeypatch.setattr(
         graph_service, "city_pbf_path", lambda name: tmp_path / f"{name}.pbf"
     )
@@ -266,17 +283,201 @@ async def test_graph_from_poly_aborts_without_property_id(monkeypatch):
     downloaded_city = _CityRow(city_name="Test", downloaded=True)
 
     class _CityRepo:
-        async def by_id(self, city_id):
+        async def by_id_with_property(self, city_id):
             return downloaded_city
 
     class _GraphRepo(_GraphRepoStub):
         def __init__(self):
             super().__init__(prop_id_name=None, prop_id_highway=1)
 
-    monkeypatch.setattr(graph_service, "CityRepository", lambda: _CityRepo())
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: _CityRepo())
     monkeypatch.setattr(graph_service, "GraphRepository", lambda: _GraphRepo())
 
     poly = Polygon([(0, 0), (1, 0), (1, 1)])
     result = await graph_service.graph_from_poly(1, poly)
 
     assert result[0] is None
+
+
+@pytest.mark.anyio
+async def test_graph_from_poly_serves_simplified_topology(monkeypatch):
+    downloaded_city = _CityRow(city_name="Ready", downloaded=True)
+    built = []
+
+    class _CityRepo:
+        async def by_id_with_property(self, city_id):
+            return downloaded_city
+
+    class _GraphRepo(_GraphRepoComplete):
+        async def has_simplified_edges(self, city_id):
+            return bool(built)
+
+        async def simplified_points_in_polygon(self, *args, **kwargs):
+            return [SimpleNamespace(id=1, longitude=30.0, latitude=60.0)]
+
+        async def simplified_edges_in_polygon(self, *args, **kwargs):
+            return [
+                SimpleNamespace(
+                    id=8,
+                    id_way=7,
+                    id_src=1,
+                    id_dist=3,
+                    name="Road",
+                    length_m=120.5,
+                    geometry="LINESTRING(30 60, 30.1 60, 30.2 60)",
+                )
+            ]
+
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: _CityRepo())
+    monkeypatch.setattr(graph_service, "GraphRepository", lambda: _GraphRepo())
+    monkeypatch.setattr(graph_service, "add_simplified_graph_to_db", built.append)
+
+    async def _fake_metrics(points, edges, oneway_ids):
+        return []
+
+    monkeypatch.setattr(graph_service, "calc_metrics", _fake_metrics)
+
+    result = await graph_service.graph_from_poly(
+        3, Polygon([(0, 0), (1, 0), (1, 1)]), simplified=True
+    )
+
+    edges = result[1]
+    assert built == [3]
+    assert edges == [
+        [8, 7, 1, 3, "Road", 120.5, "LINESTRING(30 60, 30.1 60, 30.2 60)"]
+    ]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("stored_version", ["regions-v2", "regions-v1", None])
+async def test_graph_from_poly_filters_by_stored_region_membership(
+    monkeypatch, stored_version
+):
+    downloaded_city = _CityRow(city_name="Ready", downloaded=True)
+    calls = []
+
+    class _CityRepo:
+        async def by_id_with_property(self, city_id):
+            return downloaded_city
+
+    class _GraphRepo(_GraphRepoComplete):
+        async def region_membership_version(self, city_id):
+            return stored_version
+
+        async def points_in_polygon(self, *args, **kwargs):
+            calls.append("points_in_polygon")
+            return await super().points_in_polygon(*args, **kwargs)
+
+        async def points_in_regions(self, city_id, region_ids):
+            calls.append(("points_in_regions", region_ids))
+            return [SimpleNamespace(id=1, longitude=30.0, latitude=60.0)]
+
+        async def edges_in_regions(self, **kwargs):
+            calls.append(("edges_in_regions", kwargs["region_ids"]))
+            return await self.edges_in_polygon()
+
+        async def access_nodes_in_regions(self, **kwargs):
+            calls.append(("access_nodes_in_regions", kwargs["region_ids"]))
+            return await self.access_nodes_in_polygon()
+
+        async def access_edges_in_regions(self, **kwargs):
+            return await self.access_edges_in_polygon()
+
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: _CityRepo())
+    monkeypatch.setattr(graph_service, "GraphRepository", lambda: _GraphRepo())
+
+    async def _fake_metrics(points, edges, oneway_ids):
+        return []
+
+    monkeypatch.setattr(graph_service, "calc_metrics", _fake_metrics)
+
+    result = await graph_service.graph_from_poly(
+        3,
+        Polygon([(0, 0), (1, 0), (1, 1)]),
+        region_ids=[12, 11, 12],
+        reference_version="regions-v2",
+    )
+
+    assert result[0] == [[1, 30.0, 60.0]]
+    assert result[5][0][0] == "a1"
+    # A membership built from an older regions.json is not used
+    if stored_version == "regions-v2":
+        assert calls == [
+            ("points_in_regions", [11, 12]),
+            ("edges_in_regions", [11, 12]),
+            ("access_nodes_in_regions", [11, 12]),
+        ]
+    else:
+        assert calls == ["points_in_polygon"]
+
+
+@pytest.mark.anyio
+async def test_graph_from_poly_assigns_membership_after_import(monkeypatch, tmp_path):
+    rows = [
+        _CityRow(city_name="FreshCity", downloaded=False),
+        _CityRow(city_name="FreshCity", downloaded=True),
+    ]
+    repo = _CityRepoSequence(rows)
+    assigned = []
+
+    pbf_path = tmp_path / "FreshCity.pbf"
+    pbf_path.write_text("data")
+
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: repo)
+    monkeypatch.setattr(graph_service, "GraphRepository", lambda: _GraphRepoComplete())
+    monkeypatch.setattr(graph_service, "city_pbf_path", lambda _: pbf_path)
+    monkeypatch.setattr(graph_service, "add_graph_to_db", lambda *args: None)
+    monkeypatch.setattr(
+        graph_service,
+        "add_region_membership_to_db",
+        lambda *args: assigned.append(args) or True,
+    )
+
+    async def _fake_metrics(points, edges, oneway_ids):
+        return []
+
+    monkeypatch.setattr(graph_service, "calc_metrics", _fake_metrics)
+
+    result = await graph_service.graph_from_poly(
+        8, Polygon([(0, 0), (1, 0), (1, 1)]), regions="regions"
+    )
+
+    assert result[0] == [[1, 30.0, 60.0]]
+    assert assigned == [(8, "regions", True, "")]
+
+
+@pytest.mark.anyio
+async def test_outdated_membership_is_reassigned_in_the_background_once(
+    monkeypatch,
+):
+    downloaded_city = _CityRow(city_name="Ready", downloaded=True)
+    assigned = []
+
+    class _CityRepo:
+        async def by_id_with_property(self, city_id):
+            return downloaded_city
+
+    class _GraphRepo(_GraphRepoComplete):
+        async def region_membership_version(self, city_id):
+            return "regions-v1"
+
+    async def _fake_assign(city_id, regions, reference_version):
+        assigned.append((city_id, regions, reference_version))
+
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: _CityRepo())
+    monkeypatch.setattr(graph_service, "GraphRepository", lambda: _GraphRepo())
+    monkeypatch.setattr(graph_service, "_assign_region_membership", _fake_assign)
+    monkeypatch.setattr(graph_service, "_membership_started", set())
+
+    for _ in range(2):
+        points, _, _ = await graph_service.road_network_from_poly(
+            9,
+            Polygon([(0, 0), (1, 0), (1, 1)]),
+            region_ids=[1],
+            regions="regions",
+            reference_version="regions-v2",
+        )
+        assert points == [[1, 30.0, 60.0]]
+
+    await anyio.sleep(0)
+    assert assigned == [(9, "regions", "regions-v2")]
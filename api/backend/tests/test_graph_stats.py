@@ -0,0 +1,78 @@
+"""Tests for the sampled small-world statistics."""
+
+from __future__ import annotations
+
+import math
+
+import networkx as nx
+import pytest
+
+from application import graph_stats
+from application.csr_graph import csr_from_arcs
+from application.graph_stats import (
+    average_shortest_path,
+    local_clustering,
+    small_world_stats,
+)
+
+
+def _symmetric(graph: nx.Graph):
+    arcs = [(u, v) for u, v in graph.edges] + [(v, u) for u, v in graph.edges]
+    return csr_from_arcs(sorted(graph.nodes), arcs)
+
+
+def test_exact_statistics_match_networkx():
+    reference = nx.connected_caveman_graph(3, 4)
+    graph = _symmetric(reference)
+
+    stats = small_world_stats(graph, sample_size=graph.n)
+
+    n = reference.number_of_nodes()
+    mean_degree = 2 * reference.number_of_edges() / n
+    assert stats.n == n
+    assert stats.sampled_sources == n
+    assert stats.mean_degree == pytest.approx(mean_degree)
+    assert stats.avg_shortest_path == pytest.approx(
+        nx.average_shortest_path_length(reference)
+    )
+    assert stats.clustering == pytest.approx(nx.average_clustering(reference))
+    assert stats.l_random == pytest.approx(math.log(n) / math.log(mean_degree))
+    assert stats.c_random == pytest.approx(mean_degree / n)
+
+
+def test_directed_clustering_uses_out_neighbourhood():
+    # 0 -> 1, 0 -> 2 and a single arc 1 -> 2 between the out-neighbours
+    graph = csr_from_arcs([0, 1, 2], [(0, 1), (0, 2), (1, 2)])
+
+    assert local_clustering(graph).tolist() == [0.5, 0.0, 0.0]
+
+
+def test_sampled_path_length_ignores_unreachable_pairs():
+    graph = csr_from_arcs([1, 2, 3, 4], [(1, 2), (2, 1), (3, 4)])
+
+    value, used = average_shortest_path(graph, sample_size=10)
+    sampled, sampled_used = average_shortest_path(graph, sample_size=2, seed=1)
+
+    assert (value, used) == (1.0, 4)
+    assert sampled_used == 2
+    assert sampled in (None, 1.0)
+
+
+def test_batched_sources_give_the_unbatched_result(monkeypatch):
+    reference = nx.connected_caveman_graph(3, 4)
+    graph = _symmetric(reference)
+    expected, _ = average_shortest_path(graph, sample_size=graph.n)
+
+    monkeypatch.setattr(graph_stats, "PATH_BATCH_SIZE", 5)
+    value, used = average_shortest_path(graph, sample_size=graph.n)
+
+    assert used == graph.n
+    assert value == pytest.approx(expected)
+    assert value == pytest.approx(nx.average_shortest_path_length(reference))
+
+
+def test_empty_graph_has_no_statistics():
+    stats = small_world_stats(csr_from_arcs([], []))
+
+    assert stats.n == 0
+    assert stats.avg_shortest_path is None
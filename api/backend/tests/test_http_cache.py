@@ -0,0 +1,31 @@
+"""Tests for ETag helpers."""
+
+from __future__ import annotations
+
+from app import http_cache
+
+
+def test_make_etag_is_stable_and_weak():
+    etag = http_cache.make_etag("1_v0_regions_5", "json")
+
+    assert etag == http_cache.make_etag("1_v0_regions_5", "json")
+    assert etag != http_cache.make_etag("1_v1_regions_5", "json")
+    assert etag.startswith('W/"')
+
+
+def test_etag_matches_uses_weak_comparison():
+    etag = 'W/"abc"'
+
+    assert http_cache.etag_matches('"abc"', etag)
+    assert http_cache.etag_matches('"x", W/"abc"', etag)
+    assert http_cache.etag_matches("*", etag)
+    assert not http_cache.etag_matches('"abd"', etag)
+    assert not http_cache.etag_matches(None, etag)
+
+
+def test_cache_control_reads_max_age(monkeypatch):
+    monkeypatch.setenv("HTTP_CACHE_MAX_AGE", "60")
+    assert http_cache.cache_control() == "public, max-age=60, must-revalidate"
+
+    monkeypatch.setenv("HTTP_CACHE_MAX_AGE", "soon")
+    assert http_cache.cache_control() == "public, max-age=0, must-revalidate"
@@ -0,0 +1,149 @@
+"""Tests for the CSR graph builder and incremental metrics engine."""
+
+from __future__ import annotations
+
+import threading
+
+import networkx as nx
+import pytest
+
+from application import graph_service
+from application.csr_graph import build_csr
+from application.incremental_metrics import IncrementalMetricsEngine
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def _points(*ids):
+    return [[node_id, 30.0, 60.0] for node_id in ids]
+
+
+def _path_edges(way_id, *ids):
+    return [
+        [way_id * 100 + i, way_id, a, b, "Road"]
+        for i, (a, b) in enumerate(zip(ids, ids[1:]))
+    ]
+
+
+def _as_dict(graph, values):
+    return dict(zip(graph.node_ids.tolist(), values.tolist()))
+
+
+def test_build_csr_mirrors_networkx_digraph():
+    points = _points(1, 2, 3)
+    edges = _path_edges(1, 1, 2, 3) + [[9, 2, 3, 4, "One way"]]
+
+    graph = build_csr(points, edges, oneway_ids={2})
+
+    assert graph.node_ids.tolist() == [1, 2, 3, 4]
+    assert graph.arc_set() == {(1, 2), (2, 1), (2, 3), (3, 2), (3, 4)}
+
+
+def test_full_computation_matches_networkx():
+    points = _points(1, 2, 3, 4, 5)
+    edges = _path_edges(1, 1, 2, 3, 4) + _path_edges(2, 2, 5)
+    engine = IncrementalMetricsEngine()
+
+    arrays = engine.compute("city", points, edges, oneway_ids=[])
+
+    G = nx.DiGraph()
+    G.add_nodes_from([1, 2, 3, 4, 5])
+    for edge in edges:
+        G.add_edge(edge[2], edge[3])
+        G.add_edge(edge[3], edge[2])
+    expected_betweenness = nx.betweenness_centrality(G)
+    expected_eigenvector = nx.eigenvector_centrality(G, max_iter=1000)
+
+    betweenness = _as_dict(arrays.graph, arrays.betweenness)
+    eigenvector = _as_dict(arrays.graph, arrays.eigenvector)
+    for node_id in G.nodes:
+        assert betweenness[node_id] == pytest.approx(expected_betweenness[node_id])
+        assert eigenvector[node_id] == pytest.approx(
+            expected_eigenvector[node_id], abs=1e-4
+        )
+    assert _as_dict(arrays.graph, arrays.degree)[2] == G.degree(2)
+
+
+def test_incremental_update_reuses_unaffected_sources():
+    # Two disconnected streets; the edit only touches the second one.
+    points = _points(1, 2, 3, 10, 11, 12)
+    edges = _path_edges(1, 1, 2, 3) + _path_edges(2, 10, 11, 12)
+    engine = IncrementalMetricsEngine(change_threshold=0.5)
+    engine.compute("city", points, edges, oneway_ids=[])
+
+    edited_points = points + _points(13)
+    edited_edges = edges + _path_edges(3, 12, 13)
+    arrays = engine.compute("city", edited_points, edited_edges, oneway_ids=[])
+
+    assert engine.last_run.mode == "incremental"
+    assert engine.last_run.reused_sources == 3
+
+    fresh = IncrementalMetricsEngine().compute(
+        "other", edited_points, edited_edges, oneway_ids=[]
+    )
+    assert _as_dict(arrays.graph, arrays.betweenness) == pytest.approx(
+        _as_dict(fresh.graph, fresh.betweenness)
+    )
+    assert _as_dict(arrays.graph, arrays.eigenvector) == pytest.approx(
+        _as_dict(fresh.graph, fresh.eigenvector), abs=1e-4
+    )
+
+
+def test_large_change_falls_back_to_full_recompute():
+    engine = IncrementalMetricsEngine(change_threshold=0.1)
+    engine.compute("city", _points(1, 2), _path_edges(1, 1, 2), oneway_ids=[])
+
+    engine.compute("city", _points(5, 6, 7), _path_edges(2, 5, 6, 7), oneway_ids=[])
+
+    assert engine.last_run.mode == "full"
+    assert engine.last_run.reused_sources == 0
+
+
+@pytest.mark.anyio
+async def test_calc_metrics_incremental_returns_metric_rows(monkeypatch):
+    monkeypatch.setattr(graph_service, "incremental_engine", IncrementalMetricsEngine())
+    points = _points(1, 2, 3)
+    edges = _path_edges(1, 1, 2, 3)
+
+    rows = await graph_service.calc_metrics_incremental((1, False), points, edges, [])
+
+    assert [row[0] for row in rows] == [1, 2, 3]
+    middle = rows[1]
+    assert middle[1] == 4
+    assert middle[-1] == "rgb(255, 0, 0)"
+    assert await graph_service.calc_metrics_incremental((1, False), [], [], []) == []
+
+
+def test_concurrent_computes_on_one_key_are_serialized():
+    engine = IncrementalMetricsEngine()
+    inside = []
+    overlaps = []
+    original = engine._compute
+
+    def _recording(*args):
+        if inside:
+            overlaps.append(args[0])
+        inside.append(True)
+        try:
+            return original(*args)
+        finally:
+            inside.pop()
+
+    engine._compute = _recording
+    workers = [
+        threading.Thread(
+            target=engine.compute,
+            args=("city", _points(1, 2, 3), _path_edges(1, 1, 2, 3), []),
+        )
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert overlaps == []
+    assert engine.last_run is not None
@@ -5,6 +5,7 @@ from __future__ import annotations
 from typing import List, Tuple
 
 import pytest
+from shapely.geometry import Polygon
 from sqlalchemy import text
 
 from infrastructure import database as db
@@ -144,3 +145,123 @@ def test_populate_access_graph_persists_access_entities(
         ).scalar_one()
     assert node_count == 2
     assert edge_count == 1
+
+
+def test_populate_simplified_graph_contracts_city_edges(sqlite_access_db):
+    repo = ingestion_repo.IngestionRepository()
+
+    with sqlite_access_db.engine.begin() as conn:
+        conn.execute(db.WayAsync.insert(), [{"id": 70, "id_city": 1}])
+        conn.execute(
+            db.PointAsync.insert(),
+            [
+                {"id": node_id, "longitude": 30.0 + node_id * 0.001, "latitude": 60.0}
+                for node_id in (1, 2, 3)
+            ],
+        )
+        conn.execute(
+            db.EdgesAsync.insert(),
+            [
+                {"id_way": 70, "id_src": 1, "id_dist": 2},
+                {"id_way": 70, "id_src": 2, "id_dist": 3},
+                {"id_way": 70, "id_src": 3, "id_dist": 2},
+                {"id_way": 70, "id_src": 2, "id_dist": 1},
+            ],
+        )
+
+    repo.populate_simplified_graph(city_id=1)
+    repo.populate_simplified_graph(city_id=1)
+
+    with sqlite_access_db.engine.begin() as conn:
+        rows = conn.execute(db.SimplifiedEdgeAsync.select()).fetchall()
+
+    assert sorted((row.id_src, row.id_dist) for row in rows) == [(1, 3), (3, 1)]
+    assert all(row.id_city == 1 and row.length_m > 0 for row in rows)
+
+
+def test_populate_region_membership_assigns_points_and_access_nodes(
+    sqlite_access_db,
+):
+    repo = ingestion_repo.IngestionRepository()
+    city = Polygon([(30.0, 59.9), (30.01, 59.9), (30.01, 60.1), (30.0, 60.1)])
+    district = Polygon([(30.0, 59.9), (30.0015, 59.9), (30.0015, 60.1), (30.0, 60.1)])
+
+    with sqlite_access_db.engine.begin() as conn:
+        conn.execute(db.WayAsync.insert(), [{"id": 70, "id_city": 1}])
+        conn.execute(
+            db.PointAsync.insert(),
+            [
+                {"id": node_id, "longitude": 30.0 + node_id * 0.001, "latitude": 60.0}
+                for node_id in (1, 2, 3)
+            ],
+        )
+        conn.execute(
+            db.EdgesAsync.insert(),
+            [
+                {"id_way": 70, "id_src": 1, "id_dist": 2},
+                {"id_way": 70, "id_src": 2, "id_dist": 3},
+            ],
+        )
+        conn.execute(
+            db.AccessNodeAsync.insert(),
+            [
+                {
+                    "id": 9,
+                    "id_city": 1,
+                    "source_type": "node",
+                    "node_type": "driveway",
+                    "longitude": 30.001,
+                    "latitude": 60.0,
+                }
+            ],
+        )
+
+    for _ in range(2):
+        assert repo.populate_region_membership(
+            city_id=1,
+            region_ids=[10, 11],
+            geometries=[city, district],
+            reference_version="regions-v1",
+        )
+    assert not repo.populate_region_membership(
+        city_id=1,
+        region_ids=[10, 11],
+        geometries=[city, district],
+        only_missing=True,
+        reference_version="regions-v1",
+    )
+    assert repo.populate_region_membership(
+        city_id=1,
+        region_ids=[10, 11],
+        geometries=[city, district],
+        only_missing=True,
+        reference_version="regions-v2",
+    )
+
+    with sqlite_access_db.engine.begin() as conn:
+        points = conn.execute(db.PointRegionAsync.select()).fetchall()
+        nodes = conn.execute(db.AccessNodeRegionAsync.select()).fetchall()
+
+    assert sorted((row.id_region, row.id_point) for row in points) == [
+        (10, 1),
+        (10, 2),
+        (10, 3),
+        (11, 1),
+    ]
+    assert sorted((row.id_region, row.id_access_node) for row in nodes) == [
+        (10, 9),
+        (11, 9),
+    ]
+
+    with sqlite_access_db.engine.begin() as conn:
+        version = conn.execute(
+            db.RegionMembershipVersionAsync.select()
+        ).fetchall()
+    assert [(row.id_city, row.reference_version) for row in version] == [
+        (1, "regions-v2")
+    ]
+
+    repo.clear_region_membership(city_id=1)
+    with sqlite_access_db.engine.begin() as conn:
+        count = conn.execute(text('SELECT COUNT(*) FROM "PointRegions"')).scalar_one()
+    assert count == 0
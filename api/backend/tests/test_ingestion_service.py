@@ -126,6 +126,8 @@ def test_repository_import_pipeline_invokes_all_steps(monkeypatch):
     monkeypatch.setattr(repo, "run_osmosis_and_load", _stub("osmosis"))
     monkeypatch.setattr(repo, "fill_city_graph_from_osm_tables", _stub("fill"))
     monkeypatch.setattr(repo, "populate_access_graph", _stub("access"))
+    monkeypatch.setattr(repo, "populate_simplified_graph", _stub("simplified"))
+    monkeypatch.setattr(repo, "clear_region_membership", _stub("membership"))
     monkeypatch.setattr(repo, "mark_downloaded", _stub("mark"))
 
     repo.import_city_graph(
@@ -141,6 +143,8 @@ def test_repository_import_pipeline_invokes_all_steps(monkeypatch):
         "osmosis",
         "fill",
         "access",
+        "simplified",
+        "membership",
         "mark",
     ]
     osmosis_kwargs = calls[1][2]
@@ -0,0 +1,46 @@
+"""Importing the API must not load the ingestion stack or open the database."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+CHECK = """
+import sys
+import app.lifespan
+import app.routes
+from infrastructure import database as db
+
+eager = [m for m in (
+    "osmium",
+    "networkx",
+    "scipy",
+    "geopandas",
+    "databases",
+    "application.ingestion.utils",
+    "infrastructure.osm.osm_handler",
+) if m in sys.modules]
+print(eager, db._DB_INITIALIZED)
+"""
+
+
+def test_app_import_defers_heavy_modules_and_database():
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK],
+        cwd=BACKEND,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip().splitlines()[-1] == "[] False"
+
+
+def test_facade_reexports_ingestion_helpers_on_first_use():
+    from application import service_facade
+    from application.ingestion import utils
+
+    assert service_facade.init_db is utils.init_db
+    assert service_facade.AUTH_FILE_PATH == utils.AUTH_FILE_PATH
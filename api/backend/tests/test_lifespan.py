@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 from fastapi import FastAPI
+import geopandas as gpd
 import pandas as pd
 import pytest
 
 from app import lifespan as lifespan_module
+from app import reference_data
 
 
 class DummyLogger:
@@ -38,11 +40,14 @@ async def test_lifespan_loads_data(monkeypatch, tmp_path):
     cities_file.write_text("city,lat\n", encoding="utf-8")
 
     monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("REGION_MEMBERSHIP", "0")
 
-    loaded_regions = object()
+    loaded_regions = pd.DataFrame(
+        [{"osm_id": 1, "local_name": "Test", "admin_level": 4, "parents": ""}]
+    )
     loaded_cities = pd.DataFrame([{"Город": "Test"}])
-    monkeypatch.setattr(lifespan_module.gpd, "read_file", lambda path: loaded_regions)
-    monkeypatch.setattr(lifespan_module.pd, "read_csv", lambda path: loaded_cities)
+    monkeypatch.setattr(gpd, "read_file", lambda path: loaded_regions)
+    monkeypatch.setattr(reference_data.pd, "read_csv", lambda path: loaded_cities)
 
     connect_called = []
     disconnect_called = []
@@ -85,3 +90,61 @@ async def test_lifespan_missing_regions_file(monkeypatch, tmp_path):
     with pytest.raises(FileNotFoundError):
         async with lifespan(FastAPI()):
             pass
+
+
+@pytest.mark.anyio
+async def test_lifespan_reuses_preloaded_reference_data(monkeypatch, tmp_path):
+    regions_file = tmp_path / "regions.json"
+    cities_file = tmp_path / "cities.csv"
+    regions_file.write_text("{}", encoding="utf-8")
+    cities_file.write_text("city,lat\n", encoding="utf-8")
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("REGION_MEMBERSHIP", "0")
+
+    loaded_regions = pd.DataFrame(
+        [{"osm_id": 1, "local_name": "Test", "admin_level": 4, "parents": ""}]
+    )
+    loaded_cities = pd.DataFrame([{"Город": "Test", "admin_levels": "[4]"}])
+    monkeypatch.setattr(gpd, "read_file", lambda path: loaded_regions)
+    monkeypatch.setattr(reference_data.pd, "read_csv", lambda path: loaded_cities)
+    frozen = []
+    monkeypatch.setattr(reference_data.gc, "freeze", lambda: frozen.append(True))
+    monkeypatch.setattr(reference_data, "_preloaded", None)
+
+    logger = DummyLogger()
+    reference_data.preload_reference_data(logger)
+    assert frozen == [True]
+
+    def fail(path):
+        raise AssertionError("reference data read again after the preload")
+
+    monkeypatch.setattr(reference_data.pd, "read_csv", fail)
+
+    async def noop():
+        return None
+
+    monkeypatch.setattr(lifespan_module.database, "connect", noop)
+    monkeypatch.setattr(lifespan_module.database, "disconnect", noop)
+    monkeypatch.setattr(
+        lifespan_module.service_facade, "init_db", lambda cities_info: None
+    )
+
+    app = FastAPI()
+    async with lifespan_module.build_lifespan(logger)(app):
+        assert app.state.cities_info is loaded_cities
+        assert app.state.regions_df is loaded_regions
+
+
+@pytest.mark.anyio
+async def test_exclusive_job_is_skipped_while_another_worker_runs_it(tmp_path):
+    lock_path = tmp_path / ".locks" / "job.lock"
+    runs = []
+
+    async def job():
+        runs.append(True)
+        return "done"
+
+    with lifespan_module.file_lock(lock_path):
+        assert await lifespan_module._run_exclusive(lock_path, job) is None
+    assert await lifespan_module._run_exclusive(lock_path, job) == "done"
+    assert runs == [True]
@@ -0,0 +1,40 @@
+"""Tests for the precomputed region hierarchy index."""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from application.region_index import parse_parents, region_index
+
+
+def _regions():
+    return pd.DataFrame(
+        {
+            "osm_id": [1, 2, 3, 4, -5],
+            "local_name": ["City", "North", "South", "Block", "City"],
+            "admin_level": [4.0, 8.0, 8.0, 9.0, 6.0],
+            "parents": ["", "[1]", "1", "[1, 2]", None],
+        }
+    )
+
+
+def test_parse_parents_accepts_text_lists_and_missing_values():
+    assert parse_parents("[1, -22,333]") == [1, -22, 333]
+    assert parse_parents([4, 5]) == [4, 5]
+    assert parse_parents(None) == []
+    assert parse_parents(float("nan")) == []
+
+
+def test_index_resolves_children_by_level_and_top_level_name():
+    regions = _regions()
+    index = region_index(regions)
+
+    assert index.child_ids([1], 8) == [2, 3]
+    assert index.child_ids([1], 9) == [4]
+    assert index.child_ids([2, 3], 9) == [4]
+    assert index.child_ids([1], 7) == []
+    assert index.top_level_id("City") == 1
+    assert index.top_level_id("Missing") is None
+    assert index.rows([4, 1]) == [0, 3]
+    assert region_index(regions) is index
+    assert region_index(_regions()) is not index
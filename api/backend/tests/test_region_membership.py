@@ -0,0 +1,82 @@
+"""Tests for the point to admin region assignment."""
+
+from __future__ import annotations
+
+import pandas as pd
+import shapely
+from shapely.geometry import Polygon
+
+from infrastructure.region_membership import assign_regions, region_geometries
+
+
+def _square(x0, y0, size):
+    return Polygon([(x0, y0), (x0 + size, y0), (x0 + size, y0 + size), (x0, y0 + size)])
+
+
+def test_assign_regions_covers_every_admin_level():
+    city = _square(0, 0, 2)
+    west = _square(0, 0, 1)
+    east = _square(1, 0, 1)
+    rows = [
+        (1, 0.5, 0.5),
+        (2, 1.5, 0.5),
+        (3, 1.0, 0.5),  # on the border of both districts
+        (4, 5.0, 5.0),
+    ]
+
+    pairs = assign_regions([10, 11, 12], [city, west, east], rows)
+
+    assert pairs == [
+        (10, 1),
+        (10, 2),
+        (10, 3),
+        (11, 1),
+        (11, 3),
+        (12, 2),
+        (12, 3),
+    ]
+
+
+def test_assign_regions_matches_polygon_union_of_adjacent_regions():
+    west = _square(0, 0, 1)
+    east = _square(1, 0, 1)
+    union = shapely.union_all([west, east])
+    rows = [
+        (1, 0.5, 0.5),
+        (2, 1.5, 0.5),
+        (3, 1.0, 0.5),  # shared border
+        (4, 1.0, 0.0),  # shared border, on the outer edge of the union
+        (5, 2.5, 0.5),
+    ]
+
+    pairs = assign_regions([11, 12], [west, east], rows)
+
+    selected = {row_id for _, row_id in pairs}
+    by_polygon = {
+        row_id
+        for row_id, x, y in rows
+        if shapely.within(shapely.Point(x, y), union)
+    }
+    assert by_polygon == {1, 2, 3}
+    assert selected - by_polygon == {4}
+
+
+def test_assign_regions_drops_duplicate_region_rows():
+    square = _square(0, 0, 1)
+
+    pairs = assign_regions([7, 7], [square, square], [(1, 0.5, 0.5)])
+
+    assert pairs == [(7, 1)]
+    assert assign_regions([7], [square], []) == []
+    assert assign_regions([], [], [(1, 0.5, 0.5)]) == []
+
+
+def test_region_geometries_skips_empty_shapes():
+    regions = pd.DataFrame(
+        {"osm_id": [1, 2, 3], "geometry": [_square(0, 0, 1), None, Polygon()]}
+    )
+
+    region_ids, geometries = region_geometries(regions)
+
+    assert region_ids == [1]
+    assert len(geometries) == 1
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import json
+
 import pandas as pd
 import pytest
+import shapely
 from shapely.geometry import Polygon
 
-from application import region_service
+from application import city_catalog, region_service
+from shared import compression
 
 
 pytestmark = pytest.mark.anyio
@@ -46,7 +50,7 @@ class _CityRepoStub:
         self._city = city
         self.calls = []
 
-    async def by_id(self, city_id):  # type: ignore[override]
+    async def by_id_with_property(self, city_id):  # type: ignore[override]
         self.calls.append(city_id)
         return self._city
 
@@ -72,6 +76,16 @@ def test_list_to_polygon_returns_combined_shape():
     assert polygon.area == pytest.approx(0.5, rel=1e-2)
 
 
+def test_polygon_key_ignores_orientation_start_and_float_noise():
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    rotated = Polygon([(1, 1), (1, 0), (0, 0), (0, 1.00000000004)])
+    other = Polygon([(0, 0), (2, 0), (2, 2), (0, 2)])
+
+    key = region_service.polygon_key(square)
+    assert key == region_service.polygon_key(rotated)
+    assert key != region_service.polygon_key(other)
+
+
 def test_polygons_from_region_returns_union():
     regions = _regions_df()
     union = region_service.polygons_from_region([101, 202], regions)
@@ -79,6 +93,18 @@ def test_polygons_from_region_returns_union():
     assert pytest.approx(union.area, rel=1e-2) == 2.0
 
 
+def test_region_union_is_memoized_by_id_set():
+    regions = _regions_df()
+    union = region_service.region_union([202, 101, 202], regions)
+
+    assert region_service.region_union([101, 202], regions) is union
+    assert region_service.polygons_from_region([101, 202], regions) is union.geometry
+    assert region_service.geometry_wkt(union.geometry) == union.wkt
+    assert union.wkt == union.geometry.wkt
+    assert shapely.from_wkb(union.wkb).equals(union.geometry)
+    assert region_service.region_union([999], regions) is None
+
+
 def test_polygons_from_region_handles_missing():
     regions = _regions_df()
     assert region_service.polygons_from_region([], regions) is None
@@ -88,7 +114,7 @@ async def test_get_regions_builds_region_schemas(monkeypatch):
     regions = _regions_df()
     cities = _cities_df()
     repo = _CityRepoStub({"city_name": "Testopolis"})
-    monkeypatch.setattr(region_service, "CityRepository", lambda: repo)
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: repo)
 
     result = await region_service.get_regions(42, regions, cities)
 
@@ -103,9 +129,79 @@ async def test_get_regions_info_returns_metadata(monkeypatch):
     regions = _regions_df()
     cities = _cities_df()
     repo = _CityRepoStub({"city_name": "Testopolis"})
-    monkeypatch.setattr(region_service, "CityRepository", lambda: repo)
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: repo)
 
     result = await region_service.get_regions_info(7, regions, cities)
 
     assert result is not None
     assert [r.admin_level for r in result] == [8, 8, 9]
+
+
+def test_children_matches_whole_parent_ids_only():
+    regions = _regions_df()
+    regions.loc[1, "parents"] = "[1010, 404]"
+    ids, has_children = region_service.children([101], 9, regions)
+    assert ids == [101]
+    assert has_children is False
+
+    ids, has_children = region_service.children([404], 9, regions)
+    assert ids == [202]
+    assert has_children is True
+
+
+async def test_get_regions_payload_is_memoized_per_city(monkeypatch):
+    regions = _regions_df()
+    cities = _cities_df()
+    repo = _CityRepoStub({"city_name": "Testopolis"})
+    monkeypatch.setattr(city_catalog, "CityRepository", lambda: repo)
+    built = []
+    original = region_service.get_admin_levels
+
+    def _counting(**kwargs):
+        built.append(kwargs["city_name"])
+        return original(**kwargs)
+
+    monkeypatch.setattr(region_service, "get_admin_levels", _counting)
+
+    first = await region_service.get_regions_payload(42, regions, cities)
+    second = await region_service.get_regions_payload(42, regions, cities)
+    data = json.loads(compression.decompress(first.payload, first.encoding))
+
+    assert second is first
+    assert built == ["Testopolis"]
+    assert [region["name"] for region in data] == [
+        "Testopolis",
+        "Testopolis",
+        "District A",
+    ]
+    assert data[-1]["regions"] == [
+        [[2.0, 2.0], [3.0, 2.0], [3.0, 3.0], [2.0, 3.0], [2.0, 2.0]]
+    ]
+
+
+def test_simplification_tolerance_snaps_to_powers_of_two():
+    assert region_service.simplification_tolerance() is None
+    assert region_service.simplification_tolerance(tolerance=0) is None
+    assert region_service.simplification_tolerance(tolerance=0.003) == 2.0**-9
+    assert region_service.simplification_tolerance(zoom=0) == 1.0
+    assert region_service.simplification_tolerance(zoom=10) == 2.0**-10
+    assert region_service.simplification_tolerance(zoom=24) == 2.0**-24
+
+
+def test_simplification_tolerance_has_a_floor_and_a_cap():
+    assert region_service.simplification_tolerance(tolerance=2.0**-30) is None
+    assert region_service.simplification_tolerance(tolerance=5e-324) is None
+    assert region_service.simplification_tolerance(tolerance=1e300) == 1.0
+
+
+def test_simplify_level_keeps_shared_edges_of_a_coverage():
+    wiggly_edge = [(1.0 + 0.001 * (y % 2), y / 10) for y in range(11)]
+    left = Polygon([(0, 0)] + wiggly_edge + [(0, 1)])
+    right = Polygon(wiggly_edge + [(2, 1), (2, 0)])
+
+    simplified = region_service.simplify_level([left, right], 0.01)
+
+    assert len(simplified[0].exterior.coords) < len(left.exterior.coords)
+    assert simplified[0].intersection(simplified[1]).area == pytest.approx(0.0)
+    assert simplified[0].union(simplified[1]).area == pytest.approx(2.0, rel=1e-2)
+    assert region_service.simplify_level([left], None) == [left]
@@ -0,0 +1,59 @@
+"""Tests for the GeoParquet region store."""
+
+from __future__ import annotations
+
+import os
+
+import geopandas as gpd
+from shapely.geometry import Polygon
+
+from infrastructure import region_store
+
+
+def _write_geojson(path):
+    regions = gpd.GeoDataFrame(
+        {
+            "osm_id": [1, 2],
+            "local_name": ["City", "District"],
+            "parents": ["", "[1]"],
+            "admin_level": [4, 8],
+        },
+        geometry=[
+            Polygon([(0, 0), (2, 0), (2, 2), (0, 2)]),
+            Polygon([(0, 0), (1, 0), (1, 1), (0, 1)]),
+        ],
+        crs="EPSG:4326",
+    )
+    regions.to_file(path, driver="GeoJSON")
+
+
+def test_load_regions_converts_once_and_reuses_store(tmp_path, monkeypatch):
+    source = tmp_path / "regions.json"
+    _write_geojson(source)
+
+    first = region_store.load_regions(source)
+    store = region_store.store_path(source)
+    assert store.exists()
+
+    def _no_geojson(path):
+        raise AssertionError("GeoJSON parsed although the store is fresh")
+
+    monkeypatch.setattr(gpd, "read_file", _no_geojson)
+    second = region_store.load_regions(source)
+
+    assert second["osm_id"].tolist() == first["osm_id"].tolist()
+    assert second.geometry.equals(first.geometry)
+    assert second.crs == first.crs
+
+
+def test_load_regions_rebuilds_stale_store(tmp_path):
+    source = tmp_path / "regions.json"
+    _write_geojson(source)
+    store = region_store.store_path(source)
+    region_store.load_regions(source)
+    os.utime(store, ns=(1, 1))
+
+    regions = region_store.load_regions(source)
+
+    assert len(regions) == 2
+    assert store.stat().st_mtime_ns > 1
@@ -2,14 +2,18 @@
 
 from __future__ import annotations
 
-import io
 from typing import List
 
 import pytest
 from fastapi.testclient import TestClient
 
 from application import service_facade
+from application.dual_graph import build_dual_graph
+from application.csr_graph import csr_from_arcs
+from application.degree_distribution import degree_distribution
+from application.graph_stats import small_world_stats
 from domain.schemas import GraphBase
+from infrastructure.graph_cache import CacheEntry, city_data_changed
 
 
 @pytest.fixture()
@@ -46,19 +50,12 @@ def graph_base():
 
 
 def _stub_graph_from_ids(graph_data):
-    async def _inner(*, city_id: int, regions_ids: List[int], regions):  # type: ignore[override]
+    async def _inner(*, city_id: int, regions_ids: List[int], regions, **kwargs):  # type: ignore[override]
         return graph_data
 
     return _inner
 
 
-def _bytes_zip(payload: bytes) -> io.BytesIO:
-    buffer = io.BytesIO()
-    buffer.write(payload)
-    buffer.seek(0)
-    return buffer
-
-
 def test_city_graph_route_returns_graph(
     monkeypatch, api_client: TestClient, graph_components, graph_base
 ):
@@ -100,7 +97,9 @@ def test_city_graph_export_streams_zip(
 
     zip_payload = b"PK\x03\x04"
     monkeypatch.setattr(
-        service_facade, "graph_to_zip", lambda _: _bytes_zip(zip_payload)
+        service_facade,
+        "iter_rows_zip",
+        lambda *pieces: iter([zip_payload[:2], zip_payload[2:]]),
     )
 
     response = api_client.post(
@@ -186,10 +185,11 @@ def test_city_graph_export_handles_zip_errors(
         service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
     )
 
-    def _raise_zip(_):  # pragma: no cover - simple helper
+    def _raise_zip(*pieces):  # pragma: no cover - simple helper
         raise RuntimeError("zip")
+        yield b""
 
-    monkeypatch.setattr(service_facade, "graph_to_zip", _raise_zip)
+    monkeypatch.setattr(service_facade, "iter_rows_zip", _raise_zip)
 
     response = api_client.post(
         "/api/city/graph/region/export/",
@@ -198,3 +198,346 @@ def test_city_graph_export_handles_zip_errors(
     )
 
     assert response.status_code == 500
+
+
+def test_city_dual_graph_route_returns_csv(monkeypatch, api_client: TestClient):
+    dual = build_dual_graph([[1, 10, 1, 2, "A"], [2, 20, 2, 3, "B"]])
+
+    async def _fake_dual(**kwargs):  # type: ignore[override]
+        return dual
+
+    monkeypatch.setattr(service_facade, "dual_graph_from_ids", _fake_dual)
+
+    response = api_client.post(
+        "/api/city/graph/region/reversed/",
+        json=[5],
+        params={"city_id": 1},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["reversed_nodes_csv"].startswith("index,street_name")
+    assert body["reversed_edges_csv"].splitlines()[0] == "src_index,dest_index"
+
+
+def test_city_dual_graph_route_returns_404(monkeypatch, api_client: TestClient):
+    async def _missing(**kwargs):  # type: ignore[override]
+        return None
+
+    monkeypatch.setattr(service_facade, "dual_graph_from_ids", _missing)
+
+    response = api_client.post(
+        "/api/city/graph/region/reversed/", json=[5], params={"city_id": 1}
+    )
+
+    assert response.status_code == 404
+
+
+def test_city_graph_stats_route_returns_summary(monkeypatch, api_client: TestClient):
+    captured = {}
+
+    async def _fake_stats(**kwargs):  # type: ignore[override]
+        captured.update(kwargs)
+        graph = build_dual_graph([[1, 10, 1, 2, "A"], [2, 20, 2, 3, "B"]]).to_csr()
+        return small_world_stats(graph)
+
+    monkeypatch.setattr(service_facade, "graph_stats_from_ids", _fake_stats)
+
+    response = api_client.post(
+        "/api/city/graph/region/stats/",
+        json=[5],
+        params={"city_id": 1, "topology": "primal"},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["topology"] == "primal"
+    assert body["n"] == 2
+    assert body["mean_degree"] == 1.0
+    assert captured["topology"] == "primal"
+
+
+def test_city_graph_degrees_route_returns_fits(monkeypatch, api_client: TestClient):
+    async def _fake_distribution(**kwargs):  # type: ignore[override]
+        arcs = [(0, 1), (1, 0), (1, 2), (2, 1)]
+        return degree_distribution(csr_from_arcs([0, 1, 2], arcs))
+
+    monkeypatch.setattr(
+        service_facade, "degree_distribution_from_ids", _fake_distribution
+    )
+
+    response = api_client.post(
+        "/api/city/graph/region/degrees/", json=[5], params={"city_id": 1}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["degrees"] == [1, 2]
+    assert body["counts"] == [2, 1]
+    assert body["power_law"]["n_tail"] == 3
+    assert len(body["loglog_linear"]) == 2
+    assert body["loglog_quadratic"] is None
+
+
+def test_city_graph_negotiates_arrow_stream(
+    monkeypatch, api_client: TestClient, graph_components, graph_base
+):
+    monkeypatch.setattr(
+        service_facade, "graph_from_ids", _stub_graph_from_ids(graph_components)
+    )
+    monkeypatch.setattr(
+        service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
+    )
+    monkeypatch.setattr(service_facade, "COLUMNAR_AVAILABLE", True)
+    built = []
+    monkeypatch.setattr(
+        service_facade, "rows_to_tables", lambda *pieces, **kw: built.append(pieces)
+    )
+    monkeypatch.setattr(
+        service_facade,
+        "encode_tables",
+        lambda tables, fmt: f"{fmt}:{len(built)}".encode(),
+    )
+
+    response = api_client.post(
+        "/api/city/graph/region/",
+        json=[5],
+        params={"city_id": 1, "use_cache": "false"},
+        headers={
+            "Accept": "application/json;q=0.5, application/vnd.apache.arrow.stream"
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert response.content == b"arrow:1"
+    # Tables come straight from the pipeline rows, not from re-parsed CSV
+    assert built == [graph_components]
+
+
+def test_city_graph_format_requires_pyarrow(monkeypatch, api_client: TestClient):
+    async def _unexpected(**kwargs):  # pragma: no cover - must not be reached
+        raise AssertionError("graph should not be built")
+
+    monkeypatch.setattr(service_facade, "graph_from_ids", _unexpected)
+    monkeypatch.setattr(service_facade, "COLUMNAR_AVAILABLE", False)
+
+    response = api_client.post(
+        "/api/city/graph/region/",
+        json=[5],
+        params={"city_id": 1, "use_cache": "false", "format": "parquet"},
+    )
+
+    assert response.status_code == 406
+
+
+def test_city_graph_serves_precompressed_cache(
+    monkeypatch, api_client: TestClient, graph_components, graph_base
+):
+    calls = []
+
+    async def _graph(**kwargs):  # type: ignore[override]
+        calls.append(kwargs)
+        return graph_components
+
+    monkeypatch.setattr(service_facade, "graph_from_ids", _graph)
+    monkeypatch.setattr(
+        service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
+    )
+    params = {"city_id": 1}
+
+    first = api_client.post("/api/city/graph/region/", json=[5], params=params)
+    cached = api_client.post(
+        "/api/city/graph/region/",
+        json=[5],
+        params=params,
+        headers={"Accept-Encoding": "gzip"},
+    )
+    plain = api_client.post(
+        "/api/city/graph/region/",
+        json=[5],
+        params=params,
+        headers={"Accept-Encoding": "identity"},
+    )
+
+    assert len(calls) == 1
+    assert first.json() == graph_base.model_dump()
+    assert cached.headers["content-encoding"] == "gzip"
+    assert cached.json() == graph_base.model_dump()
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == graph_base.model_dump()
+
+
+def test_city_graph_cache_is_invalidated_by_reimport(
+    monkeypatch, api_client: TestClient, graph_components, graph_base
+):
+    calls = []
+
+    async def _graph(**kwargs):  # type: ignore[override]
+        calls.append(kwargs)
+        return graph_components
+
+    monkeypatch.setattr(service_facade, "graph_from_ids", _graph)
+    monkeypatch.setattr(
+        service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
+    )
+
+    api_client.post("/api/city/graph/region/", json=[5], params={"city_id": 3})
+    api_client.post("/api/city/graph/region/", json=[5], params={"city_id": 3})
+    city_data_changed(3)
+    api_client.post("/api/city/graph/region/", json=[5], params={"city_id": 3})
+
+    assert len(calls) == 2
+
+
+def test_city_graph_bbox_is_cached_by_normalized_polygon(
+    monkeypatch, api_client: TestClient, graph_components, graph_base
+):
+    calls = []
+
+    async def _graph(**kwargs):  # type: ignore[override]
+        calls.append(kwargs)
+        return graph_components
+
+    monkeypatch.setattr(service_facade, "graph_from_poly", _graph)
+    monkeypatch.setattr(
+        service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
+    )
+    square = [[[30.0, 60.0], [30.1, 60.0], [30.1, 60.1], [30.0, 60.1]]]
+    reversed_square = [[[30.0, 60.1], [30.1, 60.1], [30.1, 60.0], [30.0, 60.0]]]
+
+    first = api_client.post("/api/city/graph/bbox/4/", json=square)
+    second = api_client.post("/api/city/graph/bbox/4/", json=reversed_square)
+    city_data_changed(4)
+    third = api_client.post("/api/city/graph/bbox/4/", json=square)
+
+    assert len(calls) == 2
+    for response in (first, second, third):
+        assert response.status_code == 200, response.text
+        assert response.json() == graph_base.model_dump()
+
+
+def test_city_graph_bbox_returns_404(monkeypatch, api_client: TestClient):
+    async def _graph(**kwargs):  # type: ignore[override]
+        return None, None, None, None, None, None, None
+
+    monkeypatch.setattr(service_facade, "graph_from_poly", _graph)
+
+    response = api_client.post(
+        "/api/city/graph/bbox/4/", json=[[[0, 0], [1, 0], [1, 1], [0, 1]]]
+    )
+
+    assert response.status_code == 404
+
+
+def test_city_graph_writes_disk_cache_after_response(
+    monkeypatch, api_client: TestClient, graph_components, graph_base, graph_cache_dir
+):
+    monkeypatch.setattr(
+        service_facade, "graph_from_ids", _stub_graph_from_ids(graph_components)
+    )
+    monkeypatch.setattr(
+        service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
+    )
+
+    response = api_client.post(
+        "/api/city/graph/region/", json=[5, 6], params={"city_id": 8}
+    )
+
+    assert response.status_code == 200, response.text
+    assert (graph_cache_dir / "8_v0_regions_5_6.json.gz").exists()
+
+
+def test_city_graph_answers_304_for_matching_etag(
+    monkeypatch, api_client: TestClient, graph_components, graph_base
+):
+    calls = []
+
+    async def _graph(**kwargs):  # type: ignore[override]
+        calls.append(kwargs)
+        return graph_components
+
+    monkeypatch.setattr(service_facade, "graph_from_ids", _graph)
+    monkeypatch.setattr(
+        service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
+    )
+    params = {"city_id": 9}
+
+    first = api_client.post("/api/city/graph/region/", json=[5], params=params)
+    etag = first.headers["etag"]
+    revalidated = api_client.post(
+        "/api/city/graph/region/",
+        json=[5],
+        params=params,
+        headers={"If-None-Match": etag},
+    )
+    city_data_changed(9)
+    after_reimport = api_client.post(
+        "/api/city/graph/region/",
+        json=[5],
+        params=params,
+        headers={"If-None-Match": etag},
+    )
+
+    assert "must-revalidate" in first.headers["cache-control"]
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.content == b""
+    assert after_reimport.status_code == 200
+    assert after_reimport.headers["etag"] != etag
+    assert len(calls) == 2
+
+
+def test_city_graph_is_rebuilt_when_reference_data_changes(
+    monkeypatch, api_client: TestClient, graph_components, graph_base
+):
+    calls = []
+
+    async def _graph(**kwargs):  # type: ignore[override]
+        calls.append(kwargs)
+        return graph_components
+
+    monkeypatch.setattr(service_facade, "graph_from_ids", _graph)
+    monkeypatch.setattr(
+        service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
+    )
+    params = {"city_id": 9}
+
+    api_client.app.state.data_version = "regions-v1"
+    first = api_client.post("/api/city/graph/region/", json=[5], params=params)
+    api_client.app.state.data_version = "regions-v2"
+    after_replace = api_client.post(
+        "/api/city/graph/region/",
+        json=[5],
+        params=params,
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+
+    assert after_replace.status_code == 200
+    assert after_replace.headers["etag"] != first.headers["etag"]
+    assert len(calls) == 2
+
+
+def test_regions_info_answers_304_without_loading(
+    monkeypatch, api_client: TestClient
+):
+    calls = []
+
+    async def _regions_payload(**kwargs):  # type: ignore[override]
+        calls.append(kwargs)
+        return CacheEntry(b'[{"id":1,"admin_level":9,"name":"District"}]', "identity")
+
+    monkeypatch.setattr(service_facade, "get_regions_payload", _regions_payload)
+
+    first = api_client.get("/api/regions/info/", params={"city_id": 2})
+    second = api_client.get(
+        "/api/regions/info/",
+        params={"city_id": 2},
+        headers={"If-None-Match": f'"unrelated", {first.headers["etag"]}'},
+    )
+
+    assert first.status_code == 200
+    assert first.json() == [{"id": 1, "admin_level": 9, "name": "District"}]
+    assert second.status_code == 304
+    assert len(calls) == 1
+    assert calls[0]["geometry"] is False
@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import threading
+
 import pytest
 
 from application import service_facade
+from shared.lru import LruCache
 from domain.schemas import GraphBase
 
 
@@ -58,7 +61,8 @@ async def test_graph_from_ids_invokes_graph_service(monkeypatch):
         "access_edges",
     )
 
-    async def _fake_graph_from_poly(city_id, polygon):  # type: ignore[override]
+    async def _fake_graph_from_poly(city_id, polygon, simplified=False, region_ids=None, regions=None, reference_version=""):  # type: ignore[override]
+        assert region_ids == [9]
         return expected
 
     monkeypatch.setattr(service_facade, "polygons_from_region", lambda **_: polygon)
@@ -67,3 +71,63 @@ async def test_graph_from_ids_invokes_graph_service(monkeypatch):
     result = await service_facade.graph_from_ids(5, [9], "regions")
 
     assert result == expected
+
+
+async def test_dual_graph_from_ids_builds_once_per_region_set(monkeypatch):
+    calls = []
+
+    async def _fake_network(city_id, polygon, simplified=False, region_ids=None, regions=None, reference_version=""):  # type: ignore[override]
+        calls.append(city_id)
+        return [[1, 0, 0]], [[1, 10, 1, 2, "A"], [2, 20, 2, 3, "B"]], []
+
+    monkeypatch.setattr(service_facade, "dual_graph_cache", LruCache())
+    monkeypatch.setattr(service_facade, "polygons_from_region", lambda **_: object())
+    monkeypatch.setattr(service_facade, "road_network_from_poly", _fake_network)
+
+    first = await service_facade.dual_graph_from_ids(4, [2, 1], "regions")
+    second = await service_facade.dual_graph_from_ids(4, [1, 2], "regions")
+
+    assert first is second
+    assert calls == [4]
+    payload = service_facade.dual_graph_to_scheme(first)
+    assert payload.reversed_edges_csv.splitlines()[1:] == ["0,1", "1,0"]
+
+
+async def test_dual_graph_from_ids_without_cache_neither_reads_nor_stores(monkeypatch):
+    calls = []
+
+    async def _fake_network(city_id, polygon, simplified=False, region_ids=None, regions=None, reference_version=""):  # type: ignore[override]
+        calls.append(city_id)
+        return [[1, 0, 0]], [[1, 10, 1, 2, "A"], [2, 20, 2, 3, "B"]], []
+
+    cache = LruCache()
+    monkeypatch.setattr(service_facade, "dual_graph_cache", cache)
+    monkeypatch.setattr(service_facade, "polygons_from_region", lambda **_: object())
+    monkeypatch.setattr(service_facade, "road_network_from_poly", _fake_network)
+
+    await service_facade.dual_graph_from_ids(4, [1], "regions", use_cache=False)
+    await service_facade.dual_graph_from_ids(4, [1], "regions", use_cache=False)
+
+    assert calls == [4, 4]
+    assert len(cache) == 0
+
+
+async def test_degree_distribution_runs_off_the_event_loop_thread(monkeypatch):
+    threads = []
+
+    async def _fake_csr(**kwargs):
+        return "graph"
+
+    def _fake_distribution(graph, xmin=None):
+        threads.append(threading.get_ident())
+        return (graph, xmin)
+
+    monkeypatch.setattr(service_facade, "csr_graph_from_ids", _fake_csr)
+    monkeypatch.setattr(service_facade, "degree_distribution", _fake_distribution)
+
+    result = await service_facade.degree_distribution_from_ids(
+        4, [1], "regions", xmin=2
+    )
+
+    assert result == ("graph", 2)
+    assert threads and threads[0] != threading.get_ident()
@@ -0,0 +1,59 @@
+"""Tests for degree-2 chain contraction of the base road graph."""
+
+from __future__ import annotations
+
+import pytest
+
+from infrastructure.osm.simplify import contract_degree_two_chains
+
+
+def _coords(*node_ids):
+    return {node_id: (30.0 + node_id * 0.001, 60.0) for node_id in node_ids}
+
+
+def _both_ways(id_way, *node_ids):
+    forward = [(id_way, a, b) for a, b in zip(node_ids, node_ids[1:])]
+    backward = [(id_way, b, a) for a, b in zip(node_ids, node_ids[1:])]
+    return forward + backward
+
+
+def test_contracts_shape_nodes_between_dead_ends():
+    edges = _both_ways(7, 1, 2, 3, 4)
+
+    result = contract_degree_two_chains(edges, _coords(1, 2, 3, 4))
+
+    pairs = {(row["id_src"], row["id_dist"]) for row in result}
+    assert pairs == {(1, 4), (4, 1)}
+    forward = next(row for row in result if row["id_src"] == 1)
+    assert forward["id_way"] == 7
+    assert forward["geometry"].startswith("LINESTRING(30.001 60.0, 30.002 60.0")
+    assert forward["length_m"] == pytest.approx(3 * 55.6, rel=0.01)
+
+
+def test_keeps_nodes_shared_by_different_ways():
+    edges = _both_ways(1, 1, 2, 3) + _both_ways(2, 3, 4, 5)
+
+    result = contract_degree_two_chains(edges, _coords(1, 2, 3, 4, 5))
+
+    pairs = {(row["id_src"], row["id_dist"]) for row in result}
+    assert pairs == {(1, 3), (3, 1), (3, 5), (5, 3)}
+    assert {row["id_way"] for row in result} == {1, 2}
+
+
+def test_oneway_chain_emits_single_direction():
+    edges = [(9, 1, 2), (9, 2, 3)]
+
+    result = contract_degree_two_chains(edges, _coords(1, 2, 3))
+
+    assert [(row["id_src"], row["id_dist"]) for row in result] == [(1, 3)]
+
+
+def test_isolated_ring_is_split_into_two_edges():
+    edges = _both_ways(5, 1, 2, 3, 4, 1)
+
+    result = contract_degree_two_chains(edges, _coords(1, 2, 3, 4))
+
+    assert len(result) == 4
+    assert all(row["id_src"] != row["id_dist"] for row in result)
+    total = sum(row["length_m"] for row in result if row["id_src"] < row["id_dist"])
+    assert total > 0
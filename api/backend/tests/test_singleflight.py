@@ -0,0 +1,143 @@
+"""Tests for request coalescing of identical graph computations."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from shapely.geometry import Polygon
+
+from app.graph_payloads import GraphPayloadLoader, decode_graph_payload
+from application import service_facade
+from domain.schemas import GraphBase
+from infrastructure.graph_cache import GraphCache
+from shared.singleflight import SingleFlight
+from tests.conftest import DummyLogger
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def anyio_backend():
+    return "asyncio"
+
+
+async def test_concurrent_calls_share_one_computation():
+    flights = SingleFlight()
+    calls = []
+    release = asyncio.Event()
+
+    async def compute():
+        calls.append(1)
+        await release.wait()
+        return "result"
+
+    waiters = [asyncio.ensure_future(flights.do("k", compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flights.in_flight("k")
+    release.set()
+
+    assert await asyncio.gather(*waiters) == ["result"] * 5
+    assert len(calls) == 1
+    assert len(flights) == 0
+
+
+async def test_errors_reach_every_waiter_and_are_not_remembered():
+    flights = SingleFlight()
+    attempts = []
+
+    async def failing():
+        attempts.append(1)
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flights.do("k", failing), flights.do("k", failing), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(attempts) == 1
+
+    with pytest.raises(ValueError):
+        await flights.do("k", failing)
+    assert len(attempts) == 2
+
+
+async def test_cancelled_waiter_does_not_cancel_shared_flight():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def compute():
+        await release.wait()
+        return 42
+
+    first = asyncio.ensure_future(flights.do("k", compute))
+    second = asyncio.ensure_future(flights.do("k", compute))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await second == 42
+
+
+async def test_loader_coalesces_concurrent_region_misses(tmp_path, monkeypatch):
+    calls = []
+    release = asyncio.Event()
+    graph_base = GraphBase(
+        edges_csv="id\n1",
+        points_csv="id\n1",
+        ways_properties_csv="id\n",
+        points_properties_csv="id\n",
+        metrics_csv="id\n1",
+        access_nodes_csv="id\n",
+        access_edges_csv="id\n",
+    )
+
+    async def fake_graph_from_ids(**kwargs):
+        calls.append(kwargs["regions_ids"])
+        await release.wait()
+        return [[1]], [[1]], [], [], [], [], []
+
+    monkeypatch.setattr(service_facade, "graph_from_ids", fake_graph_from_ids)
+    monkeypatch.setattr(
+        service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
+    )
+    loader = GraphPayloadLoader(DummyLogger(), GraphCache(tmp_path))
+
+    waiters = [
+        asyncio.ensure_future(loader.load(1, ids, None)) for ids in ([2, 1], [1, 2])
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    first, second = await asyncio.gather(*waiters)
+
+    assert calls == [[2, 1]]
+    assert first.payload == second.payload
+    assert decode_graph_payload(first.payload, first.encoding) == graph_base
+
+
+async def test_loader_coalesces_equivalent_polygons(tmp_path, monkeypatch):
+    calls = []
+    release = asyncio.Event()
+
+    async def fake_graph_from_poly(**kwargs):
+        calls.append(kwargs["polygon"])
+        await release.wait()
+        return None, None, None, None, None, None, None
+
+    monkeypatch.setattr(service_facade, "graph_from_poly", fake_graph_from_poly)
+    loader = GraphPayloadLoader(DummyLogger(), GraphCache(tmp_path))
+    square = Polygon([(30, 60), (31, 60), (31, 61), (30, 61)])
+    reversed_noisy = Polygon([(30, 61), (31, 61.0000000001), (31, 60), (30, 60)])
+
+    waiters = [
+        asyncio.ensure_future(loader.load_polygon(1, polygon))
+        for polygon in (square, reversed_noisy)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, HTTPException) for result in results)
+    assert {result.status_code for result in results} == {404}
+    assert len(calls) == 1
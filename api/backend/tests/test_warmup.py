@@ -0,0 +1,80 @@
+"""Tests for the graph cache warm-up job."""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+from shapely.geometry import Polygon
+
+from app import warmup
+from app.graph_payloads import GraphPayloadLoader
+from application import service_facade
+from domain.schemas import GraphBase
+from infrastructure.graph_cache import GraphCache
+from tests.conftest import DummyLogger
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def anyio_backend():
+    return "asyncio"
+
+
+class _CityRepo:
+    async def list_downloaded(self):
+        return [{"id": 1, "city_name": "Testopolis"}, {"id": 2, "city_name": "Nowhere"}]
+
+
+def _regions_df():
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    return pd.DataFrame(
+        {
+            "osm_id": [101, 202, 303],
+            "local_name": ["Testopolis", "District A", "District B"],
+            "geometry": [square, square, square],
+            "parents": ["[101]", "[101]", "[101]"],
+            "admin_level": [8, 9, 9],
+        }
+    )
+
+
+def _cities_df():
+    return pd.DataFrame([{"Город": "Testopolis", "admin_levels": "[8, 9]"}])
+
+
+async def test_warm_graph_cache_builds_each_district_once(tmp_path, monkeypatch):
+    built = []
+    graph_base = GraphBase(
+        edges_csv="id\n1",
+        points_csv="id\n1",
+        ways_properties_csv="id\n",
+        points_properties_csv="id\n",
+        metrics_csv="id\n1",
+        access_nodes_csv="id\n",
+        access_edges_csv="id\n",
+    )
+
+    async def fake_graph_from_ids(*, city_id, regions_ids, regions, simplified, **_):
+        built.append((city_id, tuple(regions_ids)))
+        if regions_ids == [303]:
+            return [], [], [], [], [], [], []
+        return [[1]], [[1]], [], [], [], [], []
+
+    monkeypatch.setattr(warmup, "CityRepository", _CityRepo)
+    monkeypatch.setattr(service_facade, "graph_from_ids", fake_graph_from_ids)
+    monkeypatch.setattr(
+        service_facade, "graph_to_scheme", lambda *args, **kwargs: graph_base
+    )
+    loader = GraphPayloadLoader(DummyLogger(), GraphCache(tmp_path))
+
+    first = await warmup.warm_graph_cache(
+        loader, _regions_df(), _cities_df(), concurrency=2
+    )
+    second = await warmup.warm_graph_cache(loader, _regions_df(), _cities_df())
+
+    assert sorted(built) == [(1, (101,)), (1, (202,)), (1, (303,)), (1, (303,))]
+    assert (first.cities, first.regions) == (2, 3)
+    assert (first.built, first.skipped, first.failed) == (2, 1, 0)
+    assert (second.built, second.cached, second.skipped) == (0, 2, 1)
+    assert first.cache["disk_entries"] == 2
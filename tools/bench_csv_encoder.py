@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Compare the csv-module graph encoder with the former pandas implementation."""
+
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import pandas as pd
+
+# Allow importing application modules without installing the package
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = ROOT / "api" / "backend"
+if str(BACKEND_PATH) not in sys.path:
+    sys.path.append(str(BACKEND_PATH))
+
+from application.converters import iter_csv_chunks, list_to_csv_str  # noqa: E402
+
+
+def pandas_list_to_csv_str(data, columns):
+    """The encoder ``graph_to_scheme`` used before: DataFrame plus ``to_csv``."""
+    buffer = io.StringIO()
+    df = pd.DataFrame(data, columns=columns)
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue(), df
+
+
+def chunked_csv_str(data, columns):
+    return "".join(iter_csv_chunks(data, columns))
+
+
+def synthetic_tables(
+    points: int, seed: int
+) -> Dict[str, Tuple[List[Sequence], List[str]]]:
+    """Tables shaped like a ``graph_to_scheme`` payload for ``points`` nodes."""
+    rng = random.Random(seed)
+    node_ids = [rng.randrange(10**9, 10**10) for _ in range(points)]
+    edges = []
+    for i in range(points):
+        way_id, name = rng.randrange(10**8), f"Улица {i % 500}"
+        src, dst = node_ids[i], node_ids[(i + 1) % points]
+        edges.append([2 * i, way_id, src, dst, name])
+        edges.append([2 * i + 1, way_id, dst, src, name])
+    return {
+        "points": (
+            [[n, 30 + rng.random(), 59 + rng.random()] for n in node_ids],
+            ["id", "longitude", "latitude"],
+        ),
+        "edges": (edges, ["id", "id_way", "source", "target", "name"]),
+        "ways_properties": (
+            [[e[1], "highway", "residential"] for e in edges[: points // 2]] * 4,
+            ["id", "property", "value"],
+        ),
+        "metrics": (
+            [
+                [
+                    n,
+                    4,
+                    rng.random(),
+                    rng.random(),
+                    rng.random(),
+                    rng.random(),
+                    1 + 10 * rng.random(),
+                    "rgb(12, 0, 243)",
+                ]
+                for n in node_ids
+            ],
+            [
+                "id",
+                "degree",
+                "in_degree",
+                "out_degree",
+                "eigenvector",
+                "betweenness",
+                "radius",
+                "color",
+            ],
+        ),
+    }
+
+
+def measure(func: Callable, tables, repeat: int) -> Tuple[float, int]:
+    def _run():
+        for rows, columns in tables.values():
+            func(rows, columns)
+
+    seconds = min(timeit.repeat(_run, number=1, repeat=repeat))
+    tracemalloc.start()
+    _run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=50_000, help="Nodes per payload")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    tables = synthetic_tables(args.points, args.seed)
+
+    for rows, columns in tables.values():
+        if pandas_list_to_csv_str(rows, columns)[0] != list_to_csv_str(rows, columns):
+            print("Encoders disagree on table with columns", columns, file=sys.stderr)
+            return 1
+
+    rows_total = sum(len(rows) for rows, _ in tables.values())
+    print(f"{rows_total} rows in {len(tables)} tables, best of {args.repeat}")
+    baseline = None
+    for label, func in (
+        ("pandas DataFrame.to_csv", pandas_list_to_csv_str),
+        ("csv.writer", list_to_csv_str),
+        ("csv.writer, chunked", chunked_csv_str),
+    ):
+        seconds, peak = measure(func, tables, args.repeat)
+        baseline = baseline or seconds
+        print(
+            f"{label:<26} {seconds * 1000:9.1f} ms  x{baseline / seconds:4.1f}"
+            f"  peak {peak / 2**20:7.1f} MiB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,7 @@ from __future__ import annotations
 
 import argparse
 import csv
+import gzip
 import io
 import json
 from pathlib import Path
@@ -32,8 +33,19 @@ def _collect_missing_edge_nodes(
     return missing
 
 
+def _read_cache_file(path: Path) -> dict:
+    raw = path.read_bytes()
+    if path.suffix == ".gz":
+        raw = gzip.decompress(raw)
+    elif path.suffix == ".zst":
+        import zstandard  # type: ignore
+
+        raw = zstandard.ZstdDecompressor().decompress(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
 def inspect_cache(path: Path) -> None:
-    data = json.loads(path.read_text(encoding="utf-8"))
+    data = _read_cache_file(path)
 
     points = _read_csv_rows(data.get("points_csv"))
     edges = _read_csv_rows(data.get("edges_csv"))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Profile what importing the API (``main``) costs, using ``python -X importtime``."""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+BACKEND_PATH = ROOT / "api" / "backend"
+
+# Only the code paths that need these should import them
+LAZY_MODULES = (
+    "osmium",
+    "networkx",
+    "scipy",
+    "geopandas",
+    "databases",
+    "application.ingestion.utils",
+    "infrastructure.osm.osm_handler",
+)
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int, int]]:
+    """Module -> (self us, cumulative us, depth) from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(own), int(cumulative), depth)
+    return modules
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="main", help="module to import")
+    parser.add_argument(
+        "--top", type=int, default=15, help="packages to list by cumulative time"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+        cwd=BACKEND_PATH,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    modules = parse_importtime(result.stderr)
+    if result.returncode != 0 or args.module not in modules:
+        print(result.stderr[-2000:], file=sys.stderr)
+        return 1
+
+    total = modules[args.module][1]
+    print(f"import {args.module}: {total / 1000:.0f} ms, {len(modules)} modules")
+    # Top-level packages only, so nested imports are not counted twice
+    roots: List[Tuple[int, str]] = sorted(
+        (
+            (cumulative, name)
+            for name, (_, cumulative, _) in modules.items()
+            if "." not in name
+        ),
+        reverse=True,
+    )
+    for cumulative, name in roots[: args.top]:
+        print(f"{cumulative / 1000:9.1f} ms  {name}")
+
+    loaded = [name for name in LAZY_MODULES if name in modules]
+    if loaded:
+        print("Imported eagerly, expected lazy:", ", ".join(loaded))
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())